@@ -1,5 +1,7 @@
 import argparse
 import logging
+import sys
+from time import sleep
 
 
 parser = argparse.ArgumentParser(description="Control an audio device via CEC.")
@@ -11,19 +13,91 @@ group.add_argument("-standby", action="store_const", const=True,
                    help="Set the audio device to standby", default=False)
 group.add_argument("-event_listener", action="store_const", const=True,
                    help="Listen for events to control the audio device", default=False)
+group.add_argument("-batch", type=str, dest="batch", metavar="SCRIPT",
+                   help="Run the commands in the given script file (- for stdin) in a single session, "
+                        "e.g. \"power_on; wait 2s; select_source; standby at 23:00\"", default=None)
+group.add_argument("-replay", type=str, dest="replay", metavar="TRACE",
+                   help="Replay a journal or JSON-lines capture against a fake audio device", default=None)
 
 parser.add_argument("-event_timeout", type=int, dest="event_timeout",
                     help="Timeout when listening for events in seconds", default=-1)
-parser.add_argument("-comm_type", type=str, choices=["cec"],
-                    help="Type of communication with the audio device (HDMI CEC, IR...)",
+parser.add_argument("-poll_min", type=float, dest="poll_min", metavar="SECONDS",
+                    help="Seconds between polls for events while the session is active", default=0)
+parser.add_argument("-poll_max", type=float, dest="poll_max", metavar="SECONDS",
+                    help="Seconds between polls for events once the session has been inactive for 15 minutes, "
+                         "0 to always poll at -poll_min", default=0)
+parser.add_argument("-low_wakeup", type=float, dest="low_wakeup", metavar="SLACK",
+                    help="Wait for polls and timers in a single loop, delaying them up to the given seconds so "
+                         "they share CPU wakeups. Needs -event_timeout and -poll_min", default=0)
+parser.add_argument("-replay_speed", type=float, dest="replay_speed",
+                    help="Replay speed relative to the trace, 0 for as fast as possible", default=0)
+parser.add_argument("-comm_type", type=str, choices=["cec", "linux_cec"],
+                    help="Type of communication with the audio device: cec through libcec, linux_cec through "
+                         "the CEC framework of the Linux kernel",
                     default="cec")
+parser.add_argument("-cec_device", type=str, dest="cec_device",
+                    help="CEC device node used by linux_cec", default="/dev/cec0")
+parser.add_argument("-cec_worker", dest="cec_worker", action="store_const", const=True,
+                    help="Talk to the CEC adapter from a separate process, restarted if a command hangs",
+                    default=False)
+parser.add_argument("-journal", type=str, dest="journal",
+                    help="Record received events and sent commands in the given binary journal file",
+                    default=None)
+parser.add_argument("-journal_records", type=int, dest="journal_records",
+                    help="Number of records kept in the journal", default=4096)
+parser.add_argument("-state_file", type=str, dest="state_file",
+                    help="Save the session state in the given file and restore it on restart", default=None)
+parser.add_argument("-verify_power", dest="verify_power", action="store_const", const=True,
+                    help="Check the power status of the audio device after every power on and standby, and send "
+                         "the command again if it didn't work", default=False)
+parser.add_argument("-prewarm", type=str, dest="prewarm", metavar="SCORES_FILE",
+                    help="Learn when sessions start and power the audio device on ahead of them, keeping what "
+                         "was learned in the given file", default=None)
+parser.add_argument("-trace_memory", type=int, dest="trace_memory", metavar="FRAMES",
+                    help="Trace memory allocations keeping the given frames, and log where memory grew on "
+                         "SIGUSR1", default=0)
 parser.add_argument("--debug", dest="debug", action="store_const", const=True,
                     help="Enable debugging", default=False)
+parser.add_argument("--log_json", dest="log_json", action="store_const", const=True,
+                    help="Log compact JSON lines instead of text", default=False)
+parser.add_argument("-log_file", type=str, dest="log_file",
+                    help="Append the log to the given file instead of stderr", default=None)
 
 
 def config_logging(arguments):
-    if arguments.debug:
-        logging.basicConfig(level="DEBUG")
+    """
+    Configures logging through a queue, so records are formatted and written by a separate thread.
+
+    :return: Listener to pass to log.stop_logging(), None if logging was left unconfigured.
+    """
+
+    if arguments.debug or arguments.log_json or arguments.log_file:
+        from .log import start_logging
+        return start_logging("DEBUG" if arguments.debug else "INFO", arguments.log_json, arguments.log_file)
+
+    return None
+
+
+def new_controller(arguments):
+    """
+    Creates the device controller for the given -comm_type, in a worker process if -cec_worker is given.
+
+    :return: AudioDeviceController, not initialized.
+    """
+
+    if arguments.comm_type == "linux_cec":
+        from functools import partial
+        from .linux_cec import AudioDeviceControllerLinuxCec
+        factory = partial(AudioDeviceControllerLinuxCec, arguments.cec_device)
+    else:
+        from .core import AudioDeviceControllerCec
+        factory = AudioDeviceControllerCec
+
+    if arguments.cec_worker:
+        from .worker import AudioDeviceControllerProcess
+        return AudioDeviceControllerProcess(factory)
+
+    return factory()
 
 
 def entry():
@@ -31,31 +105,134 @@ def entry():
     # signal.signal(signal.SIGTERM, €€€)
 
     arguments = parser.parse_args()
-    config_logging(arguments)
+    if arguments.low_wakeup > 0 and (arguments.event_timeout <= 0 or arguments.poll_min <= 0):
+        # Timers only run between polls: an unbounded poll would delay them without limit, and polls back to
+        # back would leave no wait to share.
+        parser.error("-low_wakeup needs -event_timeout and -poll_min above 0")
 
+    log_listener = config_logging(arguments)
+
+    try:
+        run(arguments)
+    finally:
+        if log_listener is not None:
+            from .log import stop_logging
+            stop_logging(log_listener)
+
+
+def listen(event_handler, event_timeout, interval, wakeup_loop=None, polls=None):
+    """
+    Polls for events, waiting between polls.
+
+    With a wakeup loop, the timers of the session only run while it waits: a poll delays them up to its
+    timeout, plus the slack of the loop.
+    :param event_handler: events.EventHandler, already entered.
+    :param event_timeout: Seconds a poll can take, -1 for no timeout.
+    :param interval: Function returning the seconds until the next poll.
+    :param wakeup_loop: Optional lowpower.WakeupLoop running the timers of the session.
+    :param polls: Number of polls, None for no limit.
+    :return: None
+    """
+
+    done = 0
+    while polls is None or done < polls:
+        event_handler.listen_for_events(event_timeout)
+        done += 1
+
+        seconds = interval()
+        if wakeup_loop is not None:
+            wakeup_loop.run_for(seconds)
+        elif seconds > 0:
+            sleep(seconds)
+
+
+def run(arguments):
     logging.info("Started")
 
-    from .core import Session, AudioDeviceControllerCec, CecError
+    from .core import Session, CecError
     from .events import EventHandler, EventError, ConfigOptions
+    from .batch import BatchError
 
     try:
         if arguments.power_on:
-            with AudioDeviceControllerCec() as controller:
+            with new_controller(arguments) as controller:
                 controller.power_on()
 
         elif arguments.standby:
-            with AudioDeviceControllerCec() as controller:
+            with new_controller(arguments) as controller:
                 controller.standby()
 
-        else:                           # arguments.event_listener
+        elif arguments.batch is not None:
+            from .batch import parse_script, run_script
+
+            if arguments.batch == "-":
+                steps = parse_script(sys.stdin.read())
+            else:
+                with open(arguments.batch) as script:
+                    steps = parse_script(script.read())
+
+            with new_controller(arguments) as controller:
+                run_script(steps, controller)
+
+        elif arguments.replay is not None:
+            from .replay import load_trace, replay, report
+
             config = ConfigOptions()
-            with EventHandler(Session(AudioDeviceControllerCec()), config) as event_handler:
-                logging.info("Initialization OK, listening for events on " + config.rest_url)
+            config.read_from_file()
+            print(report(replay(load_trace(arguments.replay, config), config, arguments.replay_speed)))
 
-                while True:
-                    event_handler.listen_for_events(arguments.event_timeout)
+        else:                           # arguments.event_listener
+            journal = None
+            if arguments.journal is not None:
+                from .journal import Journal
+                journal = Journal(arguments.journal, arguments.journal_records)
+
+            if arguments.trace_memory > 0:
+                from .memory import MemoryMonitor
+                monitor = MemoryMonitor(arguments.trace_memory)
+                monitor.start()
+                monitor.install()
+
+            predictor = None
+            if arguments.prewarm is not None:
+                from .predictor import UsagePredictor
+                predictor = UsagePredictor(path=arguments.prewarm)
 
-    except (CecError, EventError) as e:
+            config = ConfigOptions()
+            verifier = None
+            if arguments.verify_power:
+                from .verify import PowerVerifier
+                verifier = PowerVerifier()
+
+            poll_scheduler = None
+            if arguments.poll_max > 0:
+                from .polling import PollScheduler
+                poll_scheduler = PollScheduler(arguments.poll_min, arguments.poll_max)
+
+            wakeup_loop = None
+            if arguments.low_wakeup > 0:
+                from .lowpower import WakeupLoop
+                wakeup_loop = WakeupLoop(arguments.low_wakeup)
+
+            session = Session(new_controller(arguments), journal=journal, snapshot_path=arguments.state_file,
+                              predictor=predictor, verifier=verifier,
+                              timer_factory=wakeup_loop.timer if wakeup_loop is not None else None)
+            try:
+                with EventHandler(session, config, journal) as event_handler:
+                    logging.info("Listening for events on " + ", ".join(config.rest_urls))
+
+                    listen(event_handler, arguments.event_timeout,
+                           lambda: (poll_scheduler.interval(session) if poll_scheduler is not None
+                                    else arguments.poll_min),
+                           wakeup_loop)
+            finally:
+                if wakeup_loop is not None:
+                    logging.info(wakeup_loop.report())
+                    wakeup_loop.close()
+                if journal is not None:
+                    journal.close()
+
+    except (CecError, EventError, BatchError) as e:
         logging.critical(e.message)
 
     logging.info("Exiting")
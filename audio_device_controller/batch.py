@@ -0,0 +1,104 @@
+import logging
+import re
+from collections import namedtuple
+from datetime import datetime
+from time import sleep
+
+from .schedule import COMMANDS, parse_time_of_day, seconds_until
+
+
+logger = logging.getLogger(__name__)
+
+_DURATION = re.compile(r"^(\d+(?:\.\d*)?)\s*(ms|s|m|h)?$")
+_UNITS    = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+# A step of a batch: command is one of COMMANDS or "wait". A wait holds the seconds in delay, a command
+# scheduled with "at" holds the (hour, minute, second) in at.
+BatchStep = namedtuple("BatchStep", ["command", "delay", "at"])
+
+
+class BatchError(Exception):
+    """Exception class for errors in batch scripts.
+
+    Attributes:
+        message -- explanation of the error
+    """
+    def __init__(self, message):
+        self.message = message
+
+
+def parse_duration(text):
+    """
+    Parses a duration such as "2s", "500ms", "1.5m", "1h" or "3" (seconds).
+
+    :return: float with the seconds.
+    """
+
+    match = _DURATION.match(text.strip())
+    if match is None:
+        raise BatchError("Invalid duration: " + text)
+
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+def parse_script(text):
+    """
+    Parses a batch script. Steps are separated by ";" or new lines, and "#" starts a comment.
+
+    Steps are "power_on", "select_source", "standby", "wait <duration>" and "<command> at <HH:MM[:SS]>",
+    which waits until the next time the clock shows that time and then runs the command.
+
+    :param text: Script.
+    :return: list of BatchStep.
+    """
+
+    steps = []
+
+    for line in text.splitlines():
+        for statement in line.split("#", 1)[0].split(";"):
+            words = statement.split()
+            if not words:
+                continue
+
+            command = words[0].lower()
+            if command == "wait" and len(words) >= 2:
+                steps.append(BatchStep("wait", parse_duration("".join(words[1:])), None))
+            elif command in COMMANDS and len(words) == 1:
+                steps.append(BatchStep(command, 0, None))
+            elif command in COMMANDS and len(words) == 3 and words[1].lower() == "at":
+                try:
+                    steps.append(BatchStep(command, 0, parse_time_of_day(words[2])))
+                except ValueError as error:
+                    raise BatchError(str(error))
+            else:
+                raise BatchError("Invalid batch step: " + statement.strip())
+
+    return steps
+
+
+def run_script(steps, controller, sleep=sleep, now=None):
+    """
+    Runs the steps of a batch against an already initialized controller.
+
+    :param steps: list of BatchStep, as returned by parse_script().
+    :param controller: AudioDeviceController to run the commands on.
+    :param sleep: Function waiting the given seconds.
+    :param now: Function returning the current datetime, datetime.now if None.
+    :return: None
+    """
+
+    now = now if now is not None else datetime.now
+
+    for step in steps:
+        if step.command == "wait":
+            logger.debug("Batch: waiting %.3f s", step.delay)
+            sleep(step.delay)
+            continue
+
+        if step.at is not None:
+            delay = seconds_until(step.at, now())
+            logger.info("Batch: %s at %02d:%02d:%02d, in %.0f s", step.command, step.at[0], step.at[1],
+                        step.at[2], delay)
+            sleep(delay)
+
+        getattr(controller, step.command)()
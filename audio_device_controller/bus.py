@@ -0,0 +1,120 @@
+import heapq
+import threading
+from itertools import count
+from time import monotonic
+
+
+# Priorities of the commands sent to the bus, lower goes first.
+PRIORITY_POWER = 0          # Power on, active source, standby.
+PRIORITY_QUERY = 1          # Informational queries, e.g. polling a device or getting its OSD name.
+
+PRIORITY_NAMES = {PRIORITY_POWER: "power", PRIORITY_QUERY: "query"}
+
+
+class TokenBucket:
+    """
+    Token bucket: allows bursts of up to burst tokens, refilled at rate tokens per second.
+    """
+
+    def __init__(self, rate, burst, clock=monotonic):
+        self._rate   = float(rate)
+        self._burst  = float(burst)
+        self._tokens = float(burst)
+        self._clock  = clock
+        self._last   = clock()
+
+    def take(self):
+        """
+        Takes a token if there's one available.
+
+        :return: 0 if a token was taken, otherwise the seconds until the next one is available.
+        """
+
+        now = self._clock()
+        self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0
+
+        return (1.0 - self._tokens) / self._rate
+
+
+class BusScheduler:
+    """
+    Paces the commands sent to the CEC bus with a token bucket, so bursts of commands don't collide with the
+    traffic of other devices. When commands have to wait, power commands go before informational queries, and
+    commands of the same priority go in order.
+    """
+
+    def __init__(self, rate=5.0, burst=3, clock=monotonic):
+        """
+        Constructor.
+
+        :param rate: Commands per second sent on average.
+        :param burst: Commands that can be sent back to back after the bus has been idle.
+        :param clock: Function returning the current time in seconds.
+        """
+
+        self._bucket    = TokenBucket(rate, burst, clock)
+        self._clock     = clock
+        self._condition = threading.Condition()
+        self._waiting   = []
+        self._tickets   = count()
+        self._stats     = {}
+
+    @property
+    def queue_depth(self):
+        """
+        :return: Number of commands waiting for the bus.
+        """
+        return len(self._waiting)
+
+    def stats(self):
+        """
+        :return: dict with the queue depth under "queue_depth", and per priority name a dict with the number of
+                 commands "sent", and their "total_wait" and "max_wait" in seconds.
+        """
+
+        with self._condition:
+            ret = {"queue_depth": len(self._waiting)}
+            for priority, (sent, total_wait, max_wait) in self._stats.items():
+                ret[PRIORITY_NAMES.get(priority, str(priority))] = {"sent": sent,
+                                                                     "total_wait": total_wait,
+                                                                     "max_wait": max_wait}
+        return ret
+
+    def run(self, priority, function, *args):
+        """
+        Waits for the turn of the command on the bus and runs it.
+
+        :param priority: PRIORITY_POWER or PRIORITY_QUERY.
+        :param function: Function sending the command.
+        :param args: Arguments of the function.
+        :return: Whatever the function returns.
+        """
+
+        ticket = (priority, next(self._tickets))
+        enqueued_at = self._clock()
+
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+
+            while True:
+                if self._waiting[0] == ticket:
+                    delay = self._bucket.take()
+                    if delay == 0:
+                        heapq.heappop(self._waiting)
+                        break
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+
+            wait = self._clock() - enqueued_at
+            sent, total_wait, max_wait = self._stats.get(priority, (0, 0.0, 0.0))
+            self._stats[priority] = (sent + 1, total_wait + wait, max(max_wait, wait))
+
+            self._condition.notify_all()
+
+        return function(*args)
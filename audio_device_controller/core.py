@@ -1,18 +1,113 @@
-import cec
 import logging
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from time import monotonic
+
+from .transitions import (TransitionLog, lookup, named_transition, ACTIVE, DEV_ON, TIMER_ARMED, FORCED_ON,
+                          EV_ACTIVATE, EV_DEACTIVATE, EV_PLAY, EV_PAUSE, EV_TIMER,
+                          EV_SCHEDULED_STANDBY, EV_SCHEDULED_POWER_ON, EV_PREWARM,
+                          EV_WINDOW_START, EV_WINDOW_END, EV_DEVICE_ON, EV_DEVICE_OFF,
+                          A_CANCEL_TIMER, A_POWER_ON, A_STANDBY, A_ARM_TIMER)
+from .journal import CMD_INITIALIZE, CMD_CLEANUP, CMD_POWER_ON, CMD_STANDBY
+from .snapshot import save_snapshot, load_snapshot
+from .bus import BusScheduler, PRIORITY_POWER, PRIORITY_QUERY
+from .schedule import seconds_until, COMMANDS
+from .hooks import HOOK_BEFORE, HOOK_AFTER
+from . import tracing
+
+
+logger = logging.getLogger(__name__)
+
+# Outcome of a command sent with AudioDeviceController.send(): acked as returned by the command, and the seconds
+# elapsed since it was sent.
+CommandResult = namedtuple("CommandResult", ["command", "acked", "elapsed"])
+
+# Power status of the audio device, as returned by AudioDeviceController.power_status(). None if unknown.
+POWER_ON      = "on"
+POWER_STANDBY = "standby"
+
+# Event dispatched by each action of the daily schedules.
+_SCHEDULED_EVENTS = {"standby":      EV_SCHEDULED_STANDBY,
+                     "power_on":     EV_SCHEDULED_POWER_ON,
+                     "window_start": EV_WINDOW_START,
+                     "window_end":   EV_WINDOW_END}
 
 
 class Session:
     """
     This class holds the state of the player, and invokes commands on the configured device controller
     depending on if the session is active or not, content is being played or paused.
+
+    The transitions are driven by the precomputed table in the transitions module, and the last ones are kept
+    in a ring buffer that can be queried with transitions().
+
+    The state is owned by a single thread (the session owner), which takes messages from a lock-free mailbox
+    and processes them one at a time. The public methods submit a message and wait for it to be processed,
+    so the pause timer and the event ingest thread never touch the state concurrently and no lock is held
+    while the device controller talks to the bus.
     """
 
-    def __init__(self, dev_controller):
-        self._pause_timer    = None
-        self._active         = False
-        self._dev_controller = dev_controller
-        self._dev_on         = False
+    def __init__(self, dev_controller, history_size=256, journal=None, timer_factory=None, snapshot_path=None,
+                 predictor=None, verifier=None, hooks=None):
+        """
+        Constructor.
+
+        :param dev_controller: AudioDeviceController to invoke the commands on.
+        :param history_size: Number of transitions kept for transitions().
+        :param journal: Optional journal.Journal where the commands sent are recorded.
+        :param timer_factory: Callable with the signature of threading.Timer used for the pause timer,
+                              threading.Timer if None.
+        :param snapshot_path: Optional file where the state is saved on every change and on cleanup, and
+                              restored from on initialize.
+        :param predictor: Optional predictor.UsagePredictor learning from the plays, to power the device on
+                          ahead of the sessions it predicts.
+        :param verifier: Optional verify.PowerVerifier. With it, the power status of the device is checked
+                         after every power on and standby, and the command sent again if it didn't work, and
+                         standby is not sent to a device already in standby.
+        :param hooks: Optional hooks.HookRegistry, its hooks are called on every transition without waiting
+                      for them. It's not shut down by cleanup(), that's up to the caller.
+        """
+
+        self._pause_timer      = None
+        self._pause_deadline   = None
+        self._pause_generation = 0
+        self._active           = False
+        self._last_active      = monotonic()
+        self._dev_controller   = dev_controller
+        self._dev_on           = False
+        self._forced_on        = False
+
+        self._mailbox          = deque()
+        self._mailbox_signal   = threading.Event()
+        self._owner            = None
+        self._owner_lock       = threading.Lock()
+        self._metrics          = {}
+        self._transitions      = TransitionLog(history_size)
+        self._journal          = journal
+        self._timer_factory    = timer_factory
+        self._snapshot_path    = snapshot_path
+        self._handlers         = {"initialize": self._on_initialize,
+                                  "cleanup":    self._on_cleanup,
+                                  "active":     self._on_active,
+                                  "play":       self._on_play,
+                                  "pause":      self._on_pause,
+                                  "standby":    self._on_standby,
+                                  "schedule":   self._on_schedule,
+                                  "window":     self._on_window,
+                                  "scheduled":  self._on_scheduled,
+                                  "prewarm":    self._on_prewarm,
+                                  "verify":     self._on_verify}
+        self._schedules        = {}
+        self._predictor        = predictor
+        self._prewarm_timer    = None
+        self._pending_init     = None
+        self._verifier         = verifier
+        self._verify_timer     = None
+        self._verify_attempt   = 0
+        self._verify_round     = 0
+        self._hooks            = hooks
 
     def __enter__(self):
         self.initialize()
@@ -27,19 +122,29 @@ class Session:
              str(self._dev_on), ", timer on: ",
              str(self._pause_timer is not None)])
 
-    def initialize(self):
-        self._dev_controller.initialize()
+    def initialize(self, wait=True):
+        """
+        Initializes the device controller and restores the saved state, if any.
 
-    def cleanup(self):
+        Without waiting, the messages submitted while the initialization is pending are buffered in the
+        mailbox and the public methods return as soon as they are queued, so events can be accepted before
+        the device controller is usable. Their failures are logged.
+        :param wait: Wait for the initialization to finish.
+        :return: None, or the concurrent.futures.Future of the initialization if not waiting.
+        """
 
-        if self._pause_timer is not None:
-            self._pause_timer.cancel()
-            self._pause_timer = None
+        future = self.submit("initialize")
+        if not wait:
+            self._pending_init = future
+            return future
 
-        self._dev_controller.cleanup()
-        self._dev_on = False
+        future.result()
 
-        self._active = False
+    def cleanup(self):
+        try:
+            self.submit("cleanup").result()
+        finally:
+            self._stop_owner()
 
     def active(self, new_active):
         """
@@ -50,16 +155,7 @@ class Session:
         :return: None
         """
 
-        logging.debug("active() - " + str(self))
-
-        if self._active is False and new_active is True:
-            self._dev_controller.power_on()
-            self._dev_on = True
-
-        elif self._active is True and new_active is False:
-            self._send_standby()
-
-        self._active = new_active
+        self._call("active", new_active)
 
     def play(self):
         """
@@ -70,16 +166,7 @@ class Session:
         :return: None
         """
 
-        logging.debug("play() - " + str(self))
-
-        if self._active:
-            if self._pause_timer is not None:
-                self._pause_timer.cancel()
-                self._pause_timer = None
-
-            if self._dev_on is False:
-                self._dev_controller.power_on()
-                self._dev_on = True
+        self._call("play")
 
     def pause(self, seconds):
         """
@@ -91,28 +178,600 @@ class Session:
         :return: None
         """
 
-        logging.debug("pause() - " + str(self))
+        self._call("pause", seconds)
 
-        if self._active:
-            from threading import Timer
-            if self._pause_timer is None:
-                self._pause_timer = Timer(seconds, self._send_standby)
-                self._pause_timer.start()
+    def schedule_daily(self, at, action):
+        """
+        Runs an action every day at the given time, on the same timers as the pause.
 
-    def _send_standby(self):
+        The action respects the state of the session: "standby" doesn't interrupt playback, and "power_on"
+        does nothing if the device is already on.
+        :param at: Time of the day as (hour, minute, second).
+        :param action: "standby" or "power_on".
+        :return: None
         """
-        Callback for the timer started on pause().
+
+        if action not in ("standby", "power_on"):
+            raise ValueError("Unknown scheduled action: " + str(action))
+
+        self._call("schedule", tuple(at), action)
+
+    def schedule_window(self, start, end):
+        """
+        Keeps the device on every day between two times: it's powered on at the start, and neither deactivating
+        the session nor the pause timer put it on standby until the end, when it goes to standby unless playing.
+
+        If the window is already open, the device is powered on right away.
+        :param start: Time of the day as (hour, minute, second).
+        :param end: Time of the day as (hour, minute, second), before start for a window over midnight.
+        :return: None
+        """
+
+        self._call("window", tuple(start), tuple(end))
+
+    def submit(self, message, *args):
+        """
+        Queues a message for the session owner without waiting for it to be processed.
+
+        Messages submitted from the owner itself are processed inline, so handlers can safely submit others.
+        :param message: One of "initialize", "cleanup", "active", "play", "pause", "standby", "schedule",
+                        "window", "scheduled", "prewarm" or "verify".
+        :param args: Arguments of the message.
+        :return: concurrent.futures.Future resolved with the result of the message once processed.
+        """
+
+        future = Future()
+        tracing.mark("enqueue")
+
+        if threading.current_thread() is self._owner:
+            self._process(message, args, future, monotonic())
+        else:
+            self._start_owner()
+            self._mailbox.append((message, args, future, monotonic(), tracing.current()))
+            self._mailbox_signal.set()
+
+        return future
+
+    def transitions(self, last=None):
+        """
+        Last transitions of the session, kept in a fixed-size ring buffer.
+
+        :param last: Only return the last given number of transitions.
+        :return: list of transitions.Transition, oldest first.
+        """
+
+        return self._transitions.entries(last)
+
+    def activity(self):
+        """
+        Activity of the session, read without going through the owner so it never waits for the device.
+
+        :return: (active, seconds until the pause timer fires or None if it's not armed, seconds since the
+                 session was last active)
+        """
+
+        now = monotonic()
+        timer_left = None
+        if self._pause_timer is not None:
+            timer_left = max(0.0, self._pause_deadline - now)
+
+        return self._active, timer_left, 0.0 if self._active else now - self._last_active
+
+    def metrics(self):
+        """
+        Processing metrics per message type, collected by the session owner.
+
+        :return: dict with the mailbox depth under "queue_depth", and per message a dict with
+                 "count", "total_time", "max_time" and "total_wait" (all times in seconds).
+        """
+
+        ret = {"queue_depth": len(self._mailbox)}
+        for message, stats in list(self._metrics.items()):
+            ret[message] = dict(zip(("count", "total_time", "max_time", "total_wait"), stats))
+
+        return ret
+
+    def _call(self, message, *args):
+        """
+        Submits a message and waits for it to be processed, unless the initialization is still pending.
+
+        :return: None
+        """
+
+        future = self.submit(message, *args)
+
+        pending = self._pending_init
+        if pending is not None and not pending.done():
+            logger.debug("Buffering %s until the initialization finishes", message)
+            future.add_done_callback(lambda done: self._log_buffered(message, done))
+            return
+
+        future.result()
+
+    @staticmethod
+    def _log_buffered(message, future):
+        """
+        Logs the failure of a message buffered during the initialization, nobody waits for it.
+
+        :return: None
+        """
+
+        error = future.exception()
+        if error is not None:
+            logger.error("Buffered %s failed: %s", message, getattr(error, "message", error))
+
+    def _start_owner(self):
+        """
+        Starts the owner thread if it is not running yet.
+
+        :return: None
+        """
+
+        if self._owner is None:
+            with self._owner_lock:
+                if self._owner is None:
+                    self._owner = threading.Thread(target=self._run_owner, name="session-owner", daemon=True)
+                    self._owner.start()
+
+    def _stop_owner(self):
+        """
+        Lets the owner thread drain the mailbox and waits for it to finish.
+
+        :return: None
+        """
+
+        with self._owner_lock:
+            owner = self._owner
+            if owner is None or owner is threading.current_thread():
+                return
+
+            self._mailbox.append(None)
+            self._mailbox_signal.set()
+            owner.join()
+            self._owner = None
+
+    def _run_owner(self):
+        """
+        Main loop of the owner thread.
 
         :return: None
         """
 
-        if self._active and self._dev_on:
+        while True:
+            self._mailbox_signal.wait()
+            self._mailbox_signal.clear()
+
+            while self._mailbox:
+                item = self._mailbox.popleft()
+                if item is None:
+                    return
+
+                message, args, future, queued_at, trace = item
+                tracing.activate(trace)         # The trace of the event that led to the message, if any.
+                self._process(message, args, future, queued_at)
+
+    def _process(self, message, args, future, queued_at):
+        """
+        Runs the handler of a message and records how long it waited and took.
+
+        :return: None
+        """
+
+        started_at = monotonic()
+
+        try:
+            future.set_result(self._handlers[message](*args))
+        except Exception as error:
+            future.set_exception(error)
+
+        elapsed = monotonic() - started_at
+        stats = self._metrics.get(message)
+
+        if stats is None:
+            self._metrics[message] = [1, elapsed, elapsed, started_at - queued_at]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3] += started_at - queued_at
+
+    def _on_initialize(self):
+        self._journal_command(CMD_INITIALIZE)
+        self._dev_controller.initialize()
+
+        if self._snapshot_path is not None:
+            self._restore_snapshot()
+
+        if self._predictor is not None:
+            self._arm_prewarm()
+
+    def _on_cleanup(self):
+
+        self._journal_command(CMD_CLEANUP)
+
+        if self._snapshot_path is not None:
+            self._save_snapshot()
+
+        self._cancel_pause_timer()
+
+        for timer in self._schedules.values():
+            timer.cancel()
+        self._schedules.clear()
+
+        if self._prewarm_timer is not None:
+            self._prewarm_timer.cancel()
+            self._prewarm_timer = None
+
+        self._cancel_verify()
+
+        self._dev_controller.cleanup()
+        self._dev_on = False
+
+        self._active = False
+        self._forced_on = False
+
+    def _on_active(self, new_active):
+
+        logger.debug("active(%s) - active: %s, device on: %s, timer on: %s",
+                     new_active, self._active, self._dev_on, self._pause_timer is not None)
+        self._dispatch(EV_ACTIVATE if new_active else EV_DEACTIVATE)
+
+    def _on_play(self):
+
+        logger.debug("play() - active: %s, device on: %s, timer on: %s",
+                     self._active, self._dev_on, self._pause_timer is not None)
+        active = self._active
+        self._dispatch(EV_PLAY)
+
+        # Plays while inactive are on another output, they don't tell when sessions on this device start.
+        if active and self._predictor is not None and self._predictor.observe(datetime.now()):
+            self._arm_prewarm()
+
+    def _on_pause(self, seconds):
+
+        logger.debug("pause(%s) - active: %s, device on: %s, timer on: %s",
+                     seconds, self._active, self._dev_on, self._pause_timer is not None)
+        self._dispatch(EV_PAUSE, seconds)
+
+    def _on_standby(self, generation=None):
+
+        # A timer that fired while its cancellation was queued behind it is stale, ignore it.
+        if generation is not None and generation != self._pause_generation:
+            return
+
+        self._dispatch(EV_TIMER)
+
+    def _on_schedule(self, at, action):
+        self._arm_schedule(at, action, seconds_until(at))
+
+    def _on_window(self, start, end):
+        self._arm_schedule(start, "window_start", seconds_until(start))
+        self._arm_schedule(end, "window_end", seconds_until(end))
+
+        # Within the window the end comes before the next start.
+        if seconds_until(end) < seconds_until(start):
+            logger.info("Within the power on window until %02d:%02d:%02d", *end)
+            self._dispatch(EV_WINDOW_START)
+
+    def _on_scheduled(self, at, action):
+
+        # Ignore schedules cancelled on cleanup while their message was queued.
+        if (at, action) not in self._schedules:
+            return
+
+        delay = seconds_until(at)
+        if delay < 60:
+            delay += 24 * 3600      # The timer fired slightly early, the next one is tomorrow.
+        self._arm_schedule(at, action, delay)
+
+        logger.info("Scheduled %s at %02d:%02d:%02d", action, *at)
+        self._dispatch(_SCHEDULED_EVENTS[action])
+
+    def _on_prewarm(self):
+
+        # Ignore a pre-warm cancelled on cleanup while its message was queued.
+        if self._prewarm_timer is None:
+            return
+
+        logger.info("Pre-warming the audio device for a likely session")
+        self._dispatch(EV_PREWARM, self._predictor.lead + self._predictor.hold)
+
+        # Skip the slot just pre-warmed, in case the timer fired slightly early.
+        self._arm_prewarm(skip=60)
+
+    def _arm_prewarm(self, skip=0):
+        """
+        Starts the timer of the next pre-warm predicted, replacing the previous one.
+
+        :param skip: Seconds from now ignored by the prediction.
+        :return: None
+        """
+
+        if self._prewarm_timer is not None:
+            self._prewarm_timer.cancel()
+            self._prewarm_timer = None
+
+        now = datetime.now()
+        start = self._predictor.next_start(now + timedelta(seconds=skip))
+        if start is None:
+            return
+
+        delay = max(0.0, (start - now).total_seconds() - self._predictor.lead)
+        logger.debug("Next pre-warm in %.0f s, for a session at %s", delay, start)
+
+        self._prewarm_timer = self._new_timer(delay, self.submit, ("prewarm",))
+        self._prewarm_timer.start()
+
+    def _arm_schedule(self, at, action, delay):
+        """
+        Starts the timer of a scheduled action, replacing the previous one.
+
+        :return: None
+        """
+
+        previous = self._schedules.get((at, action))
+        if previous is not None:
+            previous.cancel()
+
+        timer = self._new_timer(delay, self._send_scheduled, (at, action))
+        self._schedules[(at, action)] = timer
+        timer.start()
+
+    def _send_scheduled(self, at, action):
+        """
+        Callback for the timers started by schedule_daily() and schedule_window().
+
+        :return: None
+        """
+
+        self.submit("scheduled", at, action)
+
+    def _new_timer(self, seconds, function, args):
+        """
+        :return: Timer created by the configured factory, not started.
+        """
+
+        timer_factory = self._timer_factory
+        if timer_factory is None:
+            from threading import Timer as timer_factory
+
+        return timer_factory(seconds, function, args=args)
+
+    def _dispatch(self, event, seconds=None):
+        """
+        Looks up the transition for the current state and event, runs its actions and records it.
+
+        :param event: One of the EV_* events in the transitions module.
+        :param seconds: Delay of the pause timer, for EV_PAUSE.
+        :return: None
+        """
+
+        state = ((ACTIVE if self._active else 0) |
+                 (DEV_ON if self._dev_on else 0) |
+                 (TIMER_ARMED if self._pause_timer is not None else 0) |
+                 (FORCED_ON if self._forced_on else 0))
+        next_state, actions = lookup(state, event)
+
+        transition = None
+        if self._hooks is not None:
+            transition = named_transition(monotonic(), state, event, next_state, actions)
+            self._hooks.run(HOOK_BEFORE, transition)
+
+        if actions & A_CANCEL_TIMER:
+            self._cancel_pause_timer()
+        try:
+            if actions & A_POWER_ON:
+                self._send_power(True)
+            if actions & A_STANDBY:
+                self._send_power(False)
+        except CecError as error:
+            # The device keeps its last known power state, so the next transition that needs it sends the
+            # command again. The rest of the transition goes on, the event is not lost.
+            logger.error("Failed to send %s: %s", "power on" if actions & A_POWER_ON else "standby",
+                         error.message)
+            next_state = (next_state & ~DEV_ON) | (state & DEV_ON)
+            if transition is not None:
+                transition = named_transition(transition.time, state, event, next_state, actions)
+        if actions & A_ARM_TIMER:
+            self._arm_pause_timer(seconds)
+
+        now = monotonic()
+        if state & ACTIVE:
+            self._last_active = now
+
+        self._active = bool(next_state & ACTIVE)
+        self._dev_on = bool(next_state & DEV_ON)
+        self._forced_on = bool(next_state & FORCED_ON)
+        self._transitions.record(now, state, event, next_state, actions)
+
+        if self._snapshot_path is not None and next_state != state:
+            self._save_snapshot()
+
+        if transition is not None:
+            self._hooks.run(HOOK_AFTER, transition)
+
+    def _send_power(self, on):
+        """
+        Sends power on or standby to the device controller, and arms its verification if there's a verifier.
+
+        Power on is always sent, since it also selects this device as the source.
+        :param on: True for power on, False for standby.
+        :return: None
+        """
+
+        if not on and self._verifier is not None and self._dev_controller.power_status() == POWER_STANDBY:
+            logger.debug("Audio device already in standby, not sent")
+            self._cancel_verify()
+            return
+
+        self._journal_command(CMD_POWER_ON if on else CMD_STANDBY)
+        tracing.mark("send")
+        if on:
+            self._dev_controller.power_on()
+        else:
             self._dev_controller.standby()
-            self._dev_on = False
+        tracing.mark("ack")
+
+        if self._verifier is not None:
+            self._cancel_verify()
+            self._arm_verify()
+
+    def _on_verify(self, generation):
+
+        # Ignore verifications superseded by a later transition while their message was queued.
+        if generation != self._verify_round:
+            return
+
+        self._verify_timer = None
+        expected = POWER_ON if self._dev_on else POWER_STANDBY
+        try:
+            status = self._dev_controller.power_status()
+        except CecError as error:
+            logger.warning("Failed to query the power status: %s", error.message)
+            status = None
+
+        if status == expected:
+            logger.debug("Audio device %s, verified", status)
+            return
+
+        self._verify_attempt += 1
+        if self._verify_attempt >= self._verifier.attempts:
+            logger.warning("Audio device %s instead of %s, giving up after %d verifications",
+                           status or "not answering", expected, self._verify_attempt)
+            self._adopt_status(status)
+        elif status is None:
+            logger.info("Audio device not answering, verifying again later")
+            self._arm_verify()
+        elif self._verifier.allow_retry():
+            logger.warning("Audio device %s instead of %s, sending again", status, expected)
+            self._journal_command(CMD_POWER_ON if self._dev_on else CMD_STANDBY)
+            try:
+                if self._dev_on:
+                    self._dev_controller.power_on()
+                else:
+                    self._dev_controller.standby()
+            except CecError as error:
+                logger.error("Failed to send again: %s", error.message)
+            self._arm_verify()
+        else:
+            logger.warning("Audio device %s instead of %s, retry budget exhausted", status, expected)
+            self._adopt_status(status)
+
+    def _adopt_status(self, status):
+        """
+        Takes the power status of the device as the state of the session, so the next transition that needs it
+        sends the command again. Recorded as a transition like any other change of the state.
+
+        :return: None
+        """
+
+        if status is None:
+            return
+
+        self._dispatch(EV_DEVICE_ON if status == POWER_ON else EV_DEVICE_OFF)
+
+    def _arm_verify(self):
+        """
+        Starts the timer of the next verification of the power status, backing off with the attempts.
+
+        :return: None
+        """
+
+        self._verify_timer = self._new_timer(self._verifier.delay(self._verify_attempt), self.submit,
+                                             ("verify", self._verify_round))
+        self._verify_timer.start()
+
+    def _cancel_verify(self):
+        """
+        Cancels the pending verification, if any, and starts over the attempts.
+
+        :return: None
+        """
+
+        if self._verify_timer is not None:
+            self._verify_timer.cancel()
+            self._verify_timer = None
+        self._verify_round += 1
+        self._verify_attempt = 0
+
+    def _save_snapshot(self):
+        """
+        Saves the current state, a failure is only logged.
+
+        :return: None
+        """
 
-        if self._pause_timer:
+        remaining = None
+        if self._pause_timer is not None:
+            remaining = self._pause_deadline - monotonic()
+
+        try:
+            save_snapshot(self._snapshot_path, self._active, self._dev_on, remaining)
+        except OSError as error:
+            logger.warning("Could not save session snapshot: %s", error)
+
+    def _restore_snapshot(self):
+        """
+        Restores the state saved by a previous run, re-arming the pause timer with its remaining time.
+
+        :return: None
+        """
+
+        snapshot = load_snapshot(self._snapshot_path)
+        if snapshot is None:
+            return
+
+        self._active = snapshot.active
+        self._dev_on = snapshot.dev_on
+        if snapshot.pause_remaining is not None and (self._active or self._dev_on):
+            self._arm_pause_timer(snapshot.pause_remaining)
+
+        logger.info("Session restored - active: %s, device on: %s, timer on: %s",
+                    self._active, self._dev_on, self._pause_timer is not None)
+
+    def _arm_pause_timer(self, seconds):
+        """
+        Starts the pause timer, which sends the standby after the given seconds.
+
+        :return: None
+        """
+
+        self._pause_generation += 1
+        self._pause_deadline = monotonic() + seconds
+        self._pause_timer = self._new_timer(seconds, self._send_standby, (self._pause_generation,))
+        self._pause_timer.start()
+
+    def _journal_command(self, code):
+        """
+        Records a command sent to the device controller, if there's a journal.
+
+        :return: None
+        """
+
+        if self._journal is not None:
+            self._journal.command(code)
+
+    def _cancel_pause_timer(self):
+        """
+        Cancels the pause timer, if any. Invalidates its standby in case it already fired.
+
+        :return: None
+        """
+
+        if self._pause_timer is not None:
             self._pause_timer.cancel()
             self._pause_timer = None
+            self._pause_generation += 1
+
+    def _send_standby(self, generation=None):
+        """
+        Callback for the timer started on pause().
+
+        :param generation: Generation of the timer that fired, None to force the standby.
+        :return: None
+        """
+
+        self.submit("standby", generation).result()
 
 
 class CecError(Exception):
@@ -128,8 +787,15 @@ class CecError(Exception):
 class AudioDeviceController:
     """
     Base class for device controllers.
+
+    The commands return True if the audio device acknowledged them, False if it didn't and None if it's not
+    known. send() runs them in the background instead, one at a time and in order.
     """
 
+    def __init__(self):
+        self._commands      = None
+        self._commands_lock = threading.Lock()
+
     def __enter__(self):
         """
         Initializes the controller.
@@ -157,7 +823,7 @@ class AudioDeviceController:
         :return: None
         """
 
-        logging.info("Initializing audio device controller...")
+        logger.info("Initializing audio device controller...")
 
     def cleanup(self):
         """
@@ -166,34 +832,96 @@ class AudioDeviceController:
         :return: None
         """
 
-        logging.info("Shutting down audio device controller...")
+        logger.info("Shutting down audio device controller...")
+
+        # Commands sent in the background run before the subclass releases the device.
+        with self._commands_lock:
+            commands, self._commands = self._commands, None
+        if commands is not None:
+            commands.shutdown(wait=True)
+
+    def send(self, command, timeout=None):
+        """
+        Sends a command in the background.
+
+        :param command: "power_on", "select_source" or "standby".
+        :param timeout: Seconds after which the future fails if the command hasn't finished, None to wait
+                        forever. The command itself is not interrupted.
+        :return: concurrent.futures.Future resolved with a CommandResult, or failing with the CecError of the
+                 command or of the timeout.
+        """
+
+        if command not in COMMANDS:
+            raise ValueError("Unknown command: " + str(command))
+
+        with self._commands_lock:
+            if self._commands is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._commands = ThreadPoolExecutor(max_workers=1)
+            commands = self._commands
+
+        future = Future()
+        resolve_lock = threading.Lock()
+        sent_at = monotonic()
+
+        def resolve(method, value):
+            with resolve_lock:
+                if not future.done():
+                    method(value)
+
+        def run():
+            try:
+                acked = getattr(self, command)()
+            except Exception as error:
+                resolve(future.set_exception, error)
+            else:
+                resolve(future.set_result, CommandResult(command, acked, monotonic() - sent_at))
+
+        if timeout is not None:
+            expiry = threading.Timer(timeout, resolve,
+                                     (future.set_exception, CecError(command + " timed out after %.3f s" % timeout)))
+            expiry.daemon = True
+            future.add_done_callback(lambda done: expiry.cancel())
+            expiry.start()
+
+        commands.submit(run)
+        return future
+
+    def power_status(self):
+        """
+        Queries the power status of the audio device.
+
+        :return: POWER_ON, POWER_STANDBY, or None if unknown.
+        """
+
+        return None
 
     def power_on(self):
         """
         Make sure an pending delayed_standby is cancelled.
 
-        :return: None
+        :return: True if acknowledged, False if not, None if unknown.
         """
 
-        logging.info("Sending power on command to audio device...")
+        logger.info("Sending power on command to audio device...")
 
     def select_source(self):
         """
         Sets this device active source in the audio device.
 
-        :return: None
+        :return: True if acknowledged, False if not, None if unknown.
         """
 
-        logging.info("Sending active source to audio device...")
+        logger.info("Sending active source to audio device...")
 
     def standby(self):
         """
         Make sure any pending delayed_standby is cancelled.
 
-        :return: None
+        :return: True if acknowledged, False if not, None if unknown.
         """
 
-        logging.info("Sending standby command to audio device...")
+        logger.info("Sending standby command to audio device...")
 
 
 class AudioDeviceControllerCec(AudioDeviceController):
@@ -201,11 +929,22 @@ class AudioDeviceControllerCec(AudioDeviceController):
     Controller of devices that are cec-compatible.
     """
 
-    def __init__(self):
-        super(AudioDeviceController, self).__init__()
+    def __init__(self, bus=None):
+        """
+        Constructor.
+
+        :param bus: bus.BusScheduler pacing the commands sent, a default one if None.
+        """
+        super().__init__()
 
+        self._cec = None
         self._cec_config = None
         self._cec_lib = None
+        self._bus = bus if bus is not None else BusScheduler()
+
+    @property
+    def bus(self):
+        return self._bus
 
     def initialize(self):
         """
@@ -216,6 +955,9 @@ class AudioDeviceControllerCec(AudioDeviceController):
         """
         super().initialize()
 
+        import cec
+
+        self._cec = cec
         self._cec_config = cec.libcec_configuration()
         self._cec_config.strDeviceName = "audiodevctrl"
         self._cec_config.cActivateSource = 0
@@ -231,8 +973,9 @@ class AudioDeviceControllerCec(AudioDeviceController):
         elif self._cec_lib.Open(adapters[0].strComName) is not True:
             raise CecError("Could not open CEC adapter.")
 
-        if self._cec_lib.PollDevice(cec.CECDEVICE_AUDIOSYSTEM) is True:
-            logging.info("Audio device detected: " + self._cec_lib.GetDeviceOSDName(cec.CECDEVICE_AUDIOSYSTEM))
+        if self._bus.run(PRIORITY_QUERY, self._cec_lib.PollDevice, cec.CECDEVICE_AUDIOSYSTEM) is True:
+            logger.info("Audio device detected: %s",
+                        self._bus.run(PRIORITY_QUERY, self._cec_lib.GetDeviceOSDName, cec.CECDEVICE_AUDIOSYSTEM))
         else:
             raise CecError("cec-client does not find audio device.")
 
@@ -244,6 +987,21 @@ class AudioDeviceControllerCec(AudioDeviceController):
         """
         super().cleanup()
 
+    def power_status(self):
+        """
+        Queries the power status of the audio device. A transition in progress counts as its target status.
+
+        :return: POWER_ON, POWER_STANDBY, or None if unknown.
+        """
+
+        status = self._bus.run(PRIORITY_QUERY, self._cec_lib.GetDevicePowerStatus, self._cec.CECDEVICE_AUDIOSYSTEM)
+
+        if status in (self._cec.CEC_POWER_STATUS_ON, self._cec.CEC_POWER_STATUS_IN_TRANSITION_STANDBY_TO_ON):
+            return POWER_ON
+        if status in (self._cec.CEC_POWER_STATUS_STANDBY, self._cec.CEC_POWER_STATUS_IN_TRANSITION_ON_TO_STANDBY):
+            return POWER_STANDBY
+        return None
+
     def power_on(self):
         """
         Power on the audio device.
@@ -251,12 +1009,12 @@ class AudioDeviceControllerCec(AudioDeviceController):
         Raises:
              CecError -- in case cec-client is unresponsive.
 
-        :return: None
+        :return: True if acknowledged, False if not.
         """
 
         super().power_on()
 
-        self.select_source()
+        return self.select_source()
 
     def select_source(self):
         """
@@ -265,7 +1023,7 @@ class AudioDeviceControllerCec(AudioDeviceController):
         Raises:
              CecError -- in case cec-client is unresponsive.
 
-        :return: None
+        :return: True if acknowledged, False if not.
         """
 
         super().select_source()
@@ -274,7 +1032,7 @@ class AudioDeviceControllerCec(AudioDeviceController):
         # From logical address 4 (player) to 5 (audio)
         # System audio mode request opcode: 0x70
         # Physical address of source to be used: 4.5.0.0
-        self._cec_lib.AudioEnable(True)
+        return bool(self._bus.run(PRIORITY_POWER, self._cec_lib.AudioEnable, True))
 
     def standby(self):
         """
@@ -283,8 +1041,8 @@ class AudioDeviceControllerCec(AudioDeviceController):
         Raises:
             CecError -- in case cec-client is unresponsive.
 
-        :return: None
+        :return: True if acknowledged, False if not.
         """
 
         super().standby()
-        self._cec_lib.StandbyDevices()
+        return bool(self._bus.run(PRIORITY_POWER, self._cec_lib.StandbyDevices))
@@ -0,0 +1,120 @@
+import threading
+from time import monotonic
+
+
+class EndpointPool:
+    """
+    Equivalent REST endpoints, e.g. a media server and its replicas, with a moving average of the latency and
+    of the error rate of each one. Polls go to the healthiest endpoint, and the others are probed every now and
+    then so a recovered or faster one is noticed.
+
+    The score of an endpoint is its average latency plus its error rate times the error penalty. The current
+    endpoint is only left for one with a clearly better score, so similar endpoints don't alternate.
+    """
+
+    def __init__(self, urls, alpha=0.2, error_penalty=10.0, margin=0.8, probe_interval=30.0, clock=monotonic):
+        """
+        Constructor.
+
+        :param urls: Endpoint URLs, in order of preference.
+        :param alpha: Weight of every new measurement in the moving averages, between 0 and 1.
+        :param error_penalty: Seconds of latency an error rate of 1 is worth.
+        :param margin: Ratio of the score of the current endpoint another one must be under to switch to it.
+        :param probe_interval: Seconds without a measurement after which an endpoint is due a probe.
+        :param clock: Function returning the current time in seconds.
+        """
+
+        if not urls:
+            raise ValueError("At least one endpoint is needed")
+
+        self._urls           = list(urls)
+        self._alpha          = alpha
+        self._error_penalty  = error_penalty
+        self._margin         = margin
+        self._probe_interval = probe_interval
+        self._clock          = clock
+        self._lock           = threading.Lock()
+        self._latency        = dict.fromkeys(self._urls)
+        self._error_rate     = dict.fromkeys(self._urls, 0.0)
+        self._measured_at    = dict.fromkeys(self._urls)
+        self._current        = self._urls[0]
+
+    @property
+    def urls(self):
+        return list(self._urls)
+
+    @property
+    def current(self):
+        """
+        Endpoint of the last choose().
+        """
+        return self._current
+
+    def choose(self):
+        """
+        :return: URL of the endpoint the next poll should go to.
+        """
+
+        with self._lock:
+            best = min(self._urls, key=self._score)
+            if self._score(best) < self._score(self._current) * self._margin:
+                self._current = best
+            return self._current
+
+    def ranked(self):
+        """
+        :return: URLs of all the endpoints, healthiest first, for failing over within a poll.
+        """
+
+        with self._lock:
+            return sorted(self._urls, key=lambda url: (url != self._current, self._score(url)))
+
+    def record(self, url, latency, ok):
+        """
+        Records the outcome of a request to an endpoint.
+
+        :param url: URL of the endpoint.
+        :param latency: Seconds the request took.
+        :param ok: False if the request failed.
+        :return: None
+        """
+
+        with self._lock:
+            previous = self._latency[url]
+            if ok:
+                self._latency[url] = latency if previous is None else previous + self._alpha * (latency - previous)
+            self._error_rate[url] += self._alpha * ((0.0 if ok else 1.0) - self._error_rate[url])
+            self._measured_at[url] = self._clock()
+
+    def due_probe(self):
+        """
+        :return: URL of an endpoint other than the current one that wasn't measured for the probe interval,
+                 None if there's none.
+        """
+
+        now = self._clock()
+        with self._lock:
+            for url in self._urls:
+                measured_at = self._measured_at[url]
+                if url != self._current and (measured_at is None or now - measured_at >= self._probe_interval):
+                    return url
+        return None
+
+    def stats(self):
+        """
+        :return: dict per URL with its average "latency" in seconds, None if not measured, and its "error_rate".
+        """
+
+        with self._lock:
+            return {url: {"latency": self._latency[url], "error_rate": self._error_rate[url]}
+                    for url in self._urls}
+
+    def _score(self, url):
+        """
+        :return: Score of an endpoint, lower is better. Endpoints not measured yet go last, in order.
+        """
+
+        latency = self._latency[url]
+        if latency is None:
+            return float("inf") if self._measured_at[url] is not None or url != self._urls[0] else 0.0
+        return latency + self._error_rate[url] * self._error_penalty
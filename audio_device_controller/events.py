@@ -1,4 +1,43 @@
 import logging
+import threading
+from collections import OrderedDict
+from time import monotonic, time
+
+from . import tracing
+from .endpoints import EndpointPool
+from .paths import compile_path, compile_list_path, parse_path, WILDCARD
+from .schedule import parse_time_of_day
+
+
+logger = logging.getLogger(__name__)
+
+
+def _decode_msgpack(content):
+    import msgpack
+    return msgpack.unpackb(content, raw=False)
+
+
+def _decode_cbor(content):
+    import cbor2
+    return cbor2.loads(content)
+
+
+# Decoders of the binary payload formats, by content type and with the module they need. JSON is the default.
+DECODERS = {"application/msgpack":     (_decode_msgpack, "msgpack"),
+            "application/x-msgpack":   (_decode_msgpack, "msgpack"),
+            "application/vnd.msgpack": (_decode_msgpack, "msgpack"),
+            "application/cbor":        (_decode_cbor, "cbor2")}
+
+
+def accepted_content_types():
+    """
+    :return: Value for the Accept header, with the binary formats whose decoder is installed before JSON.
+    """
+
+    from importlib.util import find_spec
+
+    types = [content_type for content_type, (_, module) in sorted(DECODERS.items()) if find_spec(module)]
+    return ", ".join(types + ["application/json;q=0.9"])
 
 
 class EventError(Exception):
@@ -17,26 +56,102 @@ class EventHandler:
     and invoke the appropriate commands on a CecController object
     """
 
-    def __init__(self, session, config):
+    def __init__(self, session, config, journal=None, tracer=None, endpoints=None):
         """
         Constructor.
 
         :param session: SessionHandler to be used to call commands.
         :param config: ConfigOptions holding info on how json events are formed etc.
+        :param journal: Optional journal.Journal where received events are recorded.
+        :param tracer: Optional tracing.Tracer measuring the latency of every event, one with the SLO of the
+                       config is created by __enter__ if None.
+        :param endpoints: Optional endpoints.EndpointPool, one with the endpoints of the config is created by
+                          __enter__ or the first poll if None.
         :return: None
         """
 
         self._session = session
         self._config = config
+        self._journal = journal
+        self._tracer = tracer
+
+        self._accept = None
+        self._http = None
+        self._init = None
+        self._endpoints = endpoints
+        self._prober = None
+
+        # State of the conditional and cursor-based polling, the validators are of the endpoint that sent them.
+        self._validators_url = None
+        self._etag = None
+        self._last_modified = None
+        self._cursor = None
+
+        # Ids of the events recently processed, least recently seen first, and order of the last one.
+        self._seen_ids = OrderedDict()
+        self._last_order = None
 
     def __enter__(self):
-        self._session.initialize()
-        self._config.read_from_file()
+        # The device controller initializes on the session owner while the configuration is read and the
+        # HTTP client is prepared. Events received in the meantime are buffered by the session, and a failed
+        # initialization is raised by the next listen_for_events().
+        self._init = self._session.initialize(wait=False)
+
+        try:
+            self._config.read_from_file()
+            if self._endpoints is None:
+                self._endpoints = EndpointPool(self._config.rest_urls)
+            self._warm_up()
+
+            if self._tracer is None:
+                self._tracer = tracing.Tracer(self._config.slo)
+
+            for at, action in self._config.schedule:
+                self._session.schedule_daily(at, action)
+            for start, end in self._config.power_on_windows:
+                self._session.schedule_window(start, end)
+        except Exception:
+            self._session.cleanup()
+            raise
 
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._session.cleanup()
+        try:
+            self._session.cleanup()
+            if self._tracer is not None and self._tracer.summary():
+                logger.info("%s", self._tracer.report())
+        finally:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+
+    @property
+    def endpoints(self):
+        """
+        endpoints.EndpointPool with the health of the configured endpoints, None until the first poll or __enter__.
+        """
+        return self._endpoints
+
+    @property
+    def tracer(self):
+        """
+        tracing.Tracer measuring the latency of the events, None until __enter__ if none was given.
+        """
+        return self._tracer
+
+    def _warm_up(self):
+        """
+        Imports the HTTP client and creates the connection pool reused by every poll, and works out the
+        Accept header.
+
+        :return: None
+        """
+
+        import requests
+
+        self._http = requests.Session()
+        self._accept = accepted_content_types()
 
     def listen_for_events(self, event_timeout):
         """
@@ -46,60 +161,282 @@ class EventHandler:
         Processes one response at a time. If you want to listen indefinitely you
         must loop outside.
 
+        Requests are conditional on the ETag and Last-Modified of the last response processed, a
+        304 Not Modified response means there are no new events. If a cursor is configured, the id of
+        the last event processed is sent so the endpoint only returns newer ones.
+
+        Raises the error of the initialization started by __enter__, if it failed.
+
+        Besides JSON, responses can be in MessagePack or CBOR if the respective module is installed, the
+        format is chosen by the Content-Type of the response.
+
+        If several endpoints are configured, the poll goes to the healthiest one and fails over to the others,
+        in order of health, if it times out, can't connect or responds with an error. Endpoints not polled are
+        probed in the background every now and then.
+
         :argument event_timeout: Number of seconds for timing when listening. -1 for no timeout.
         :return: None
         """
         import requests
 
+        if self._init is not None and self._init.done():
+            init, self._init = self._init, None
+            init.result()
+
+        if self._accept is None:
+            self._accept = accepted_content_types()
+        if self._endpoints is None:
+            self._endpoints = EndpointPool(self._config.rest_urls)
+
+        self._endpoints.choose()
         try:
-            if event_timeout is -1:
-                response = requests.get(self._config.rest_url)
-            else:
-                response = requests.get(self._config.rest_url, timeout=event_timeout)
-        except requests.exceptions.Timeout:
-            raise EventError("Request to " + self._config.rest_url + " timed out")
+            url, response, received_at = self._poll(self._endpoints.ranked(), event_timeout)
+        finally:
+            self._probe()
 
-        # Evaluate successful response (code=200, json, well formed).
-        if response.status_code is self._config.rest_success_code:
+        if response.status_code == requests.codes.not_modified:
+            logger.debug("%s not modified", url)
+        else:
             try:
-                self.process_json_response(response.json())
+                self.process_json_response(self._decode(response), received_at)
             except EventError as error:
-                raise EventError(self._config.rest_url + " - " + error.message)
-        else:
-            raise EventError("Error: " + self._config.rest_url +
-                             " responded with status code: " + str(response.status_code))
+                raise EventError(url + " - " + error.message)
+
+            self._validators_url = url
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
 
-    def process_json_response(self, json_data):
+    def _poll(self, urls, event_timeout):
+        """
+        Requests the events from the first endpoint that responds successfully, recording the latency and
+        errors of every endpoint tried.
+
+        Raises:
+            EventError -- with the failure of the last endpoint, if none responds successfully.
+
+        :param urls: Endpoints to try, in order.
+        :param event_timeout: Number of seconds for timing when listening. -1 for no timeout.
+        :return: (url, requests.Response, time it was received)
+        """
+        import requests
+
+        failure = None
+        for url in urls:
+            kwargs = {"headers": {"Accept": self._accept}}
+            if event_timeout != -1:
+                kwargs["timeout"] = event_timeout
+            if self._etag is not None and url == self._validators_url:
+                kwargs["headers"]["If-None-Match"] = self._etag
+            if self._last_modified is not None and url == self._validators_url:
+                kwargs["headers"]["If-Modified-Since"] = self._last_modified
+            if self._config.cursor_param and self._cursor is not None:
+                kwargs["params"] = {self._config.cursor_param: self._cursor}
+
+            started = monotonic()
+            try:
+                response = (self._http or requests).get(url, **kwargs)
+            except requests.exceptions.Timeout:
+                failure = EventError("Request to " + url + " timed out")
+            except requests.exceptions.ConnectionError as error:
+                failure = EventError("Request to " + url + " failed: " + str(error))
+            else:
+                received_at = time()
+
+                # Evaluate successful response (code=200, json, well formed).
+                if (response.status_code == requests.codes.not_modified or
+                        response.status_code is self._config.rest_success_code):
+                    self._endpoints.record(url, monotonic() - started, True)
+                    return url, response, received_at
+
+                failure = EventError("Error: " + url + " responded with status code: " + str(response.status_code))
+
+            self._endpoints.record(url, monotonic() - started, False)
+            if url != urls[-1]:
+                logger.warning("%s, failing over", failure.message)
+
+        raise failure
+
+    def _probe(self):
+        """
+        Probes in the background an endpoint due a measurement, unless a probe is already running.
+
+        :return: None
+        """
+
+        if self._prober is not None and self._prober.is_alive():
+            return
+
+        url = self._endpoints.due_probe()
+        if url is not None:
+            self._prober = threading.Thread(target=self._run_probe, args=(url,), name="endpoint-probe", daemon=True)
+            self._prober.start()
+
+    def _run_probe(self, url, timeout=5.0):
+        """
+        Requests the events from an endpoint only to measure it, the response is discarded.
+
+        :return: None
+        """
+        import requests
+
+        started = monotonic()
+        try:
+            response = requests.get(url, headers={"Accept": self._accept}, timeout=timeout)
+            ok = response.status_code in (requests.codes.not_modified, self._config.rest_success_code)
+        except requests.exceptions.RequestException:
+            ok = False
+
+        self._endpoints.record(url, monotonic() - started, ok)
+        logger.debug("Probed %s: %s", url, "ok" if ok else "failed")
+
+    @staticmethod
+    def _decode(response):
+        """
+        Decodes the body of a response according to its Content-Type.
+
+        :param response: requests.Response
+        :return: Decoded response, in the same structure as json.
+        """
+
+        content_type = response.headers.get("Content-Type", "")
+        decoder = None
+        if isinstance(content_type, str):
+            decoder = DECODERS.get(content_type.split(";")[0].strip().lower())
+
+        if decoder is None:
+            return response.json()
+
+        decode, module = decoder
+        try:
+            return decode(response.content)
+        except ImportError:
+            raise EventError("Response in " + content_type + ", but " + module + " is not installed")
+        except Exception as error:
+            raise EventError("Response malformed, " + content_type + ": " + str(error))
+
+    def process_json_response(self, json_data, received_at=None):
         """
         Parses the received json as specified in the config,
         and calls for further process in case of playback events.
 
+        If there's a tracer, every playback event gets a trace, started at the server timestamp of the event
+        if the config has a timestamp field.
+
+        Events already processed, by their id field, or older than the last one processed, by their order
+        field, are skipped if the config has those fields.
+
         :param json_data: Received response in json format.
+        :param received_at: Time the response was received, now if None.
         :return: None
         """
 
-        logging.debug("Event received:\n---------" + str(json_data) + "\n---------")
+        decoded_at = time()
+        received_at = received_at if received_at is not None else decoded_at
+
+        logger.debug("Event received:\n---------%s\n---------", json_data)
+
+        cursor = self._cursor
 
         try:
-            if self._config.events in json_data:
-                for event in json_data[self._config.events]:
-                    if self._config.pb_notif in event.keys():
-                        self._process_single_playback_event(event)
-            else:
-                raise EventError("Response malformed, block " + self._config.events + " not found.")
+            events = self._config.events_accessor(json_data)
+        except (KeyError, IndexError):
+            raise EventError("Response malformed, block " + self._config.events + " not found.")
         except TypeError:
             raise EventError("Response malformed, TypeError")
 
-    def _process_single_playback_event(self, event):
+        for event in events:
+            if self._config.cursor_field and isinstance(event, dict) and self._config.cursor_field in event:
+                cursor = event[self._config.cursor_field]
+
+            if self._is_repeated(event):
+                continue
+
+            try:
+                n_type = self._config.pb_notif_accessor(event)
+            except (KeyError, IndexError, TypeError):
+                pass
+            else:
+                if self._tracer is None:
+                    self._process_single_playback_event(n_type)
+                else:
+                    self._trace_playback_event(event, n_type, received_at, decoded_at)
+
+        self._cursor = cursor
+
+    def _is_repeated(self, event):
         """
-        Processes the given playback event and triggers the respective command. Expects the
-        following structure: {str: int}.
+        Checks whether an event was already processed, by its id, or is older than the last one processed, by
+        its order. Events without the fields are never repeated.
 
-        :param event: type of event to process
+        :param event: Event in the response.
+        :return: True if the event must be skipped.
+        """
+
+        event_id = None
+        if self._config.event_id_accessor is not None:
+            try:
+                event_id = self._config.event_id_accessor(event)
+                if event_id in self._seen_ids:
+                    self._seen_ids.move_to_end(event_id)
+                    logger.debug("Skipping duplicate event %s", event_id)
+                    return True
+            except (KeyError, IndexError, TypeError):
+                event_id = None
+
+        if self._config.event_order_accessor is not None:
+            try:
+                order = self._config.event_order_accessor(event)
+                if self._last_order is not None and order < self._last_order:
+                    logger.debug("Skipping stale event, %s older than %s", order, self._last_order)
+                    return True
+                self._last_order = order
+            except (KeyError, IndexError, TypeError):
+                pass
+
+        if event_id is not None:
+            self._seen_ids[event_id] = None
+            if len(self._seen_ids) > self._config.dedup_size:
+                self._seen_ids.popitem(last=False)
+
+        return False
+
+    def _trace_playback_event(self, event, n_type, received_at, decoded_at):
+        """
+        Processes a playback event with its trace active, so the session marks the stages it goes through.
+
+        :return: None
+        """
+
+        server_time = None
+        if self._config.timestamp_accessor is not None:
+            try:
+                server_time = float(self._config.timestamp_accessor(event))
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass
+
+        trace = self._tracer.start(received_at, server_time)
+        trace.mark("decode", decoded_at)
+
+        previous = tracing.activate(trace)
+        try:
+            self._process_single_playback_event(n_type)
+        finally:
+            tracing.activate(previous)
+
+        self._tracer.finish(trace)
+
+    def _process_single_playback_event(self, n_type):
+        """
+        Processes the given playback event and triggers the respective command.
+
+        :param n_type: type of event to process, the value found at the pb_notif path.
         :return: None
         """
 
-        n_type = event[self._config.pb_notif]
+        if self._journal is not None:
+            self._journal.event(n_type)
+
+        tracing.mark("dispatch")
 
         if n_type is self._config.pb_notif_active_device:
             self._session.active(True)
@@ -110,7 +447,7 @@ class EventHandler:
         elif n_type is self._config.pb_notif_stop or n_type is self._config.pb_notif_pause:
             self._session.pause(self._config.power_off_delay_mins * 60)
         else:
-            logging.debug("Type of playback event not recognised.")
+            logger.debug("Type of playback event not recognised: %s", n_type)
 
 
 class ConfigOptions:
@@ -120,24 +457,118 @@ class ConfigOptions:
 
     def __init__(self):
         self._rest_url                 = ""
+        self._rest_urls                = []
         self._rest_success_code        = 200  # Standard HTTP success response code
         self._events                   = ""
         self._pb_notif                 = ""
+        self._events_accessor          = compile_list_path("")
+        self._pb_notif_accessor        = compile_path("")
         self._pb_notif_stop            = -1
         self._pb_notif_play            = -1
         self._pb_notif_pause           = -1
         self._pb_notif_active_device   = -1
         self._pb_notif_inactive_device = -1
         self._power_off_delay_mins     = 10
+        self._cursor_param             = ""
+        self._cursor_field             = ""
+        self._schedule                 = []
+        self._power_on_windows         = []
+        self._timestamp_field          = ""
+        self._timestamp_accessor       = None
+        self._slo                      = {}
+        self._event_id_field           = ""
+        self._event_order_field        = ""
+        self._event_id_accessor        = None
+        self._event_order_accessor     = None
+        self._dedup_size               = 1024
 
     @property
     def rest_url(self):
+        """
+        Preferred endpoint.
+        """
         return self._rest_url
 
+    @property
+    def rest_urls(self):
+        """
+        Equivalent endpoints, in order of preference: rest_url and then the ones in rest_url_fallback.
+        """
+        return self._rest_urls
+
     @property
     def rest_success_code(self):
         return self._rest_success_code
 
+    @property
+    def cursor_param(self):
+        return self._cursor_param
+
+    @property
+    def cursor_field(self):
+        return self._cursor_field
+
+    @property
+    def schedule(self):
+        """
+        Daily actions, list of ((hour, minute, second), "standby").
+        """
+        return self._schedule
+
+    @property
+    def power_on_windows(self):
+        """
+        Daily windows when the device is kept on, list of ((hour, minute, second), (hour, minute, second)).
+        """
+        return self._power_on_windows
+
+    @property
+    def timestamp_field(self):
+        return self._timestamp_field
+
+    @property
+    def timestamp_accessor(self):
+        """
+        Compiled timestamp_field path, returns the time the media server emitted an event. None if not set.
+        """
+        return self._timestamp_accessor
+
+    @property
+    def slo(self):
+        """
+        Latency thresholds, dict with the maximum seconds per tracing segment.
+        """
+        return self._slo
+
+    @property
+    def event_id_field(self):
+        return self._event_id_field
+
+    @property
+    def event_order_field(self):
+        return self._event_order_field
+
+    @property
+    def event_id_accessor(self):
+        """
+        Compiled event_id_field path, returns the id of an event. None if not set.
+        """
+        return self._event_id_accessor
+
+    @property
+    def event_order_accessor(self):
+        """
+        Compiled event_order_field path, returns the sequence number or timestamp of an event. None if not set.
+        """
+        return self._event_order_accessor
+
+    @property
+    def dedup_size(self):
+        """
+        Number of recent event ids remembered to skip duplicates.
+        """
+        return self._dedup_size
+
     @property
     def events(self):
         return self._events
@@ -146,6 +577,20 @@ class ConfigOptions:
     def pb_notif(self):
         return self._pb_notif
 
+    @property
+    def events_accessor(self):
+        """
+        Compiled events path, returns the list of events in a response.
+        """
+        return self._events_accessor
+
+    @property
+    def pb_notif_accessor(self):
+        """
+        Compiled pb_notif path, returns the notification type of an event.
+        """
+        return self._pb_notif_accessor
+
     @property
     def pb_notif_stop(self):
         return self._pb_notif_stop
@@ -186,11 +631,15 @@ class ConfigOptions:
                         os.path.join(os.curdir, "config.ini")]
 
         read_files = config.read(config_files)
-        logging.debug("File(s) config.ini found at:" + ", ".join(read_files))
+        logger.debug("File(s) config.ini found at: %s", ", ".join(read_files))
 
         # Check that the parser could read at least one file, and then extract the data.
         if len(read_files) > 0:
             self._rest_url                 = config.get("EventServer", "rest_url", fallback="")
+            self._rest_urls                = ([self._rest_url] if self._rest_url else []) + self._read_urls(
+                config.get("EventServer", "rest_url_fallback", fallback=""))
+            self._cursor_param             = config.get("EventServer", "cursor_param", fallback="")
+            self._cursor_field             = config.get("EventServer", "cursor_field", fallback="")
             self._events                   = config.get("MediaFormat", "events", fallback="")
             self._pb_notif                 = config.get("MediaFormat", "pb_notif", fallback="")
             self._pb_notif_stop            = config.getint("MediaFormat", "pb_notif_stop", fallback=-1)
@@ -200,10 +649,101 @@ class ConfigOptions:
             self._pb_notif_inactive_device = config.getint("MediaFormat", "pb_notif_inactive_device", fallback=-1)
             self._power_off_delay_mins     = config.getint("DeviceControl", "power_off_delay_mins", fallback=10)
 
-            logging.info(self)
+            self._schedule                 = self._read_schedule(
+                config.get("Schedule", "standby_at", fallback=""))
+            self._power_on_windows         = self._read_windows(
+                config.get("Schedule", "power_on_window", fallback=""))
+
+            self._timestamp_field          = config.get("Tracing", "timestamp_field", fallback="")
+            self._slo                      = self._read_slo(config.get("Tracing", "slo_ms", fallback=""))
+
+            self._event_id_field           = config.get("Deduplication", "id_field", fallback="")
+            self._event_order_field        = config.get("Deduplication", "order_field", fallback="")
+            self._dedup_size               = config.getint("Deduplication", "size", fallback=1024)
+
+            # Paths are compiled once here, so no string is parsed when processing events.
+            if WILDCARD in parse_path(self._pb_notif):
+                raise ValueError("pb_notif can't have wildcards: " + self._pb_notif)
+            self._events_accessor          = compile_list_path(self._events)
+            self._pb_notif_accessor        = compile_path(self._pb_notif)
+            self._timestamp_accessor       = (compile_path(self._timestamp_field) if self._timestamp_field
+                                              else None)
+            self._event_id_accessor        = (compile_path(self._event_id_field) if self._event_id_field
+                                              else None)
+            self._event_order_accessor     = (compile_path(self._event_order_field) if self._event_order_field
+                                              else None)
+
+            logger.info("%s", self)
         else:
             raise ValueError("Failed to open config.ini")
 
+    @staticmethod
+    def _read_urls(urls):
+        """
+        :param urls: URLs separated by whitespace or new lines, which can't appear in a URL unescaped.
+        :return: list of URLs.
+        """
+
+        return urls.split()
+
+    @staticmethod
+    def _read_schedule(standby_at):
+        """
+        Parses the scheduled standbys, a comma-separated list.
+
+        :param standby_at: Times of the day for a standby, e.g. "23:00, 01:30".
+        :return: list of ((hour, minute, second), "standby")
+        """
+
+        try:
+            return [(parse_time_of_day(at), "standby")
+                    for at in filter(None, (item.strip() for item in standby_at.split(",")))]
+        except ValueError as error:
+            raise ValueError("[Schedule] " + str(error))
+
+    @staticmethod
+    def _read_windows(power_on_windows):
+        """
+        Parses the power on windows, a comma-separated list of start-end.
+
+        :param power_on_windows: Windows when the device is kept on, e.g. "18:00-22:00".
+        :return: list of ((hour, minute, second), (hour, minute, second))
+        """
+
+        windows = []
+        for window in filter(None, (item.strip() for item in power_on_windows.split(","))):
+            start, separator, end = window.partition("-")
+            try:
+                if not separator:
+                    raise ValueError("Invalid power on window: " + window)
+                windows.append((parse_time_of_day(start), parse_time_of_day(end)))
+            except ValueError as error:
+                raise ValueError("[Schedule] " + str(error))
+
+        return windows
+
+    @staticmethod
+    def _read_slo(slo_ms):
+        """
+        Parses the latency thresholds, a comma-separated list of segment=milliseconds.
+
+        :param slo_ms: e.g. "total=500, ack=250".
+        :return: dict with the maximum seconds per segment.
+        """
+
+        slo = {}
+        for item in filter(None, (item.strip() for item in slo_ms.split(","))):
+            segment, _, milliseconds = item.partition("=")
+            segment = segment.strip()
+            if segment not in tracing.SEGMENTS:
+                raise ValueError("[Tracing] Unknown segment in slo_ms: " + segment)
+            try:
+                slo[segment] = float(milliseconds) / 1000
+            except ValueError:
+                raise ValueError("[Tracing] Invalid threshold in slo_ms: " + item)
+
+        return slo
+
     def __str__(self):  # pragma: no cover
         """
         Returns a string with the current configuration.
@@ -212,7 +752,8 @@ class ConfigOptions:
 
         ret = "".join(
             ["Configuration options\n=======================",
-             "\nURL:                 ", self.rest_url,
+             "\nURL:                 ", ", ".join(self.rest_urls),
+             "\nCursor param/field:  ", self.cursor_param, "/", self.cursor_field,
              "\nEvents:              ", self.events,
              "\nPB notification:     ", self.pb_notif,
              "\nPB stop:             ", str(self.pb_notif_stop),
@@ -220,6 +761,15 @@ class ConfigOptions:
              "\nPB pause:            ", str(self.pb_notif_pause),
              "\nPB active device:    ", str(self.pb_notif_active_device),
              "\nPB inactive device:  ", str(self.pb_notif_inactive_device),
-             "\nPB power off delay:  ", str(self.power_off_delay_mins)])
+             "\nPB power off delay:  ", str(self.power_off_delay_mins),
+             "\nSchedule:            ", ", ".join("%s at %02d:%02d:%02d" % ((action,) + at)
+                                                  for at, action in self.schedule),
+             "\nPower on windows:    ", ", ".join("%02d:%02d:%02d-%02d:%02d:%02d" % (start + end)
+                                                  for start, end in self.power_on_windows),
+             "\nTimestamp field:     ", self.timestamp_field,
+             "\nEvent id/order:      ", self.event_id_field, "/", self.event_order_field,
+             " (", str(self.dedup_size), " ids)",
+             "\nSLO (ms):            ", ", ".join("%s=%.0f" % (segment, seconds * 1000)
+                                                  for segment, seconds in sorted(self.slo.items()))])
 
         return ret
@@ -0,0 +1,200 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+
+logger = logging.getLogger(__name__)
+
+HOOK_BEFORE = "before"
+HOOK_AFTER  = "after"
+
+
+class HookRegistry:
+    """
+    Callbacks run on the transitions of a session, e.g. to notify a lighting system or log to a database.
+
+    A hook is called with the transitions.Transition. A HOOK_BEFORE call is submitted before the commands of
+    the transition are sent and a HOOK_AFTER one once they were, but the session doesn't wait for either: a
+    "before" hook may run while or after the commands are sent, only the order of the calls of a hook is kept.
+
+    Hooks never delay the session: they run on a bounded thread pool, a hook only runs on one thread at a time
+    with its calls queued in order, and a hook that fails only logs its error. A hook running over its timeout
+    is reported, and while it keeps running its calls queue up to a backlog and the ones over it are skipped,
+    so a hung hook holds one thread of the pool at most.
+
+    The registry belongs to its creator, who must call shutdown() once the sessions using it are cleaned up.
+    """
+
+    def __init__(self, workers=2, timeout=5.0, backlog=16, clock=monotonic):
+        """
+        Constructor.
+
+        :param workers: Threads of the pool running the hooks.
+        :param timeout: Default seconds a hook can take.
+        :param backlog: Calls of a hook that can wait for the previous one to finish.
+        :param clock: Function returning the current time in seconds.
+        """
+
+        self._workers  = workers
+        self._timeout  = timeout
+        self._backlog  = backlog
+        self._clock    = clock
+        self._lock     = threading.Lock()
+        self._hooks    = []
+        self._executor = None
+
+    def register(self, when, callback, event=None, timeout=None, name=None):
+        """
+        Registers a hook.
+
+        :param when: HOOK_BEFORE to submit the calls before the commands of the transition are sent, HOOK_AFTER
+                     to submit them after. Neither waits for the hook.
+        :param callback: Function called with the transitions.Transition.
+        :param event: Only call it on the transitions of this event, e.g. "play", on all of them if None.
+        :param timeout: Seconds the hook can take, the default of the registry if None.
+        :param name: Name of the hook in the logs and stats, the name of the callback if None.
+        :return: Hook, to unregister it.
+        """
+
+        if when not in (HOOK_BEFORE, HOOK_AFTER):
+            raise ValueError("Invalid hook moment: " + str(when))
+
+        hook = Hook(when, callback, event, timeout if timeout is not None else self._timeout,
+                    name if name is not None else getattr(callback, "__name__", repr(callback)))
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+        return hook
+
+    def unregister(self, hook):
+        """
+        Unregisters a hook. Its calls already queued still run.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._hooks = [registered for registered in self._hooks if registered is not hook]
+
+    def run(self, when, transition):
+        """
+        Queues the calls of the hooks of a transition, without waiting for them.
+
+        :param when: HOOK_BEFORE or HOOK_AFTER.
+        :param transition: transitions.Transition.
+        :return: None
+        """
+
+        hooks = self._hooks
+        if not hooks:
+            return
+
+        with self._lock:
+            self._check_timeouts()
+
+            for hook in hooks:
+                if hook.when != when or (hook.event is not None and hook.event != transition.event):
+                    continue
+
+                if len(hook.queue) >= self._backlog:
+                    hook.skipped += 1
+                    logger.warning("Hook %s is behind, skipping its call on %s", hook.name, transition.event)
+                    continue
+
+                hook.queue.append(transition)
+                if not hook.busy:
+                    hook.busy = True
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(self._workers)
+                    self._executor.submit(self._drain, hook)
+
+    def stats(self):
+        """
+        :return: dict per hook name with its number of "calls", "failures", "timeouts" and "skipped" calls.
+        """
+
+        with self._lock:
+            self._check_timeouts()
+            return {hook.name: {"calls": hook.calls, "failures": hook.failures, "timeouts": hook.timeouts,
+                                "skipped": hook.skipped} for hook in self._hooks}
+
+    def shutdown(self, wait=True):
+        """
+        Stops the pool, running the queued calls first if waiting.
+
+        :return: None
+        """
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait)
+
+    def _drain(self, hook):
+        """
+        Runs the queued calls of a hook, in order, on a thread of the pool.
+
+        :return: None
+        """
+
+        while True:
+            with self._lock:
+                if not hook.queue:
+                    hook.busy = False
+                    hook.started = None
+                    return
+                transition = hook.queue.popleft()
+                hook.started = self._clock()
+                hook.late = False
+                hook.calls += 1
+
+            try:
+                hook.callback(transition)
+            except Exception:
+                hook.failures += 1
+                logger.exception("Hook %s failed on %s", hook.name, transition.event)
+
+            with self._lock:
+                elapsed = self._clock() - hook.started
+                if elapsed > hook.timeout and not hook.late:
+                    hook.timeouts += 1
+                    logger.warning("Hook %s took %.1f s on %s, over its timeout of %.1f s", hook.name, elapsed,
+                                   transition.event, hook.timeout)
+
+    def _check_timeouts(self):
+        """
+        Reports the hooks running over their timeout. Must hold the lock.
+
+        :return: None
+        """
+
+        now = self._clock()
+        for hook in self._hooks:
+            if hook.started is not None and not hook.late and now - hook.started > hook.timeout:
+                hook.late = True
+                hook.timeouts += 1
+                logger.warning("Hook %s running for over its timeout of %.1f s", hook.name, hook.timeout)
+
+
+class Hook:
+    """
+    Hook registered in a HookRegistry, with its queued calls and its counters.
+    """
+
+    def __init__(self, when, callback, event, timeout, name):
+        self.when     = when
+        self.callback = callback
+        self.event    = event
+        self.timeout  = timeout
+        self.name     = name
+        self.queue    = deque()
+        self.busy     = False
+        self.started  = None
+        self.late     = False
+        self.calls    = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped  = 0
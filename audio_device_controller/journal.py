@@ -0,0 +1,183 @@
+import logging
+import mmap
+import os
+import struct
+from collections import namedtuple
+from itertools import count
+from time import monotonic, time
+
+
+# Kinds of record.
+KIND_EVENT   = 1
+KIND_COMMAND = 2
+
+# Codes of the KIND_COMMAND records.
+CMD_INITIALIZE    = 1
+CMD_CLEANUP       = 2
+CMD_POWER_ON      = 3
+CMD_SELECT_SOURCE = 4
+CMD_STANDBY       = 5
+
+COMMAND_NAMES = {CMD_INITIALIZE:    "initialize",
+                 CMD_CLEANUP:       "cleanup",
+                 CMD_POWER_ON:      "power_on",
+                 CMD_SELECT_SOURCE: "select_source",
+                 CMD_STANDBY:       "standby"}
+
+_MAGIC   = b"ADCJ"
+_VERSION = 1
+
+# Header: magic, version, record size, capacity, wall clock and monotonic time when the file was opened.
+_HEADER      = struct.Struct("<4sHHIdd")
+_HEADER_SIZE = 64
+
+# Record: sequence number (0 for empty slots), monotonic time, kind, code, argument.
+_RECORD      = struct.Struct("<QdBBxxi")
+_BODY        = struct.Struct("<dBBxxi")
+_SEQ         = struct.Struct("<Q")
+
+logger = logging.getLogger(__name__)
+
+JournalRecord = namedtuple("JournalRecord", ["seq", "time", "kind", "code", "arg"])
+
+
+class Journal:
+    """
+    Append-only binary journal of received events and sent commands.
+
+    Backed by a fixed-size file mapped in memory and used as a circular buffer, so recording is a memory
+    write: no syscall is made and nothing is forced to disk. The mapping is shared, so the records survive a
+    crash of the process and can be read afterwards with Journal.read().
+    """
+
+    def __init__(self, path, capacity=4096):
+        """
+        Constructor. Opens the journal, resuming an existing one if it has the same capacity.
+
+        :param path: File backing the journal.
+        :param capacity: Number of records kept.
+        """
+
+        self._path     = path
+        self._capacity = capacity
+        self._size     = _HEADER_SIZE + capacity * _RECORD.size
+
+        last_seq = 0
+        if os.path.exists(path) and os.path.getsize(path) == self._size:
+            header, records = Journal._read_file(path)
+            if header is not None and header[3] == capacity:
+                last_seq = max([record.seq for record in records] or [0])
+
+        self._file = open(path, "r+b" if last_seq else "w+b")
+        self._file.truncate(self._size)
+        self._map = mmap.mmap(self._file.fileno(), self._size)
+
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, _RECORD.size, capacity, time(), monotonic())
+        self._seq = count(last_seq + 1)
+
+        logger.info("Journal at %s, %d records", path, capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def close(self):
+        """
+        Unmaps the journal. Pending pages are written back by the kernel at its own pace.
+
+        :return: None
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def record(self, kind, code, arg=0):
+        """
+        Appends a record, overwriting the oldest one if the journal is full. Safe to call from several threads.
+
+        :param kind: KIND_EVENT or KIND_COMMAND.
+        :param code: Code of the command, 0 for events.
+        :param arg: Integer argument, e.g. the notification type of an event.
+        :return: None
+        """
+
+        seq = next(self._seq)
+        offset = _HEADER_SIZE + (seq % self._capacity) * _RECORD.size
+
+        # The sequence number goes last, a record torn by a crash keeps the previous one or stays empty.
+        _SEQ.pack_into(self._map, offset, 0)
+        _BODY.pack_into(self._map, offset + _SEQ.size, monotonic(), kind, code,
+                        (arg + 0x80000000) % 0x100000000 - 0x80000000)
+        _SEQ.pack_into(self._map, offset, seq)
+
+    def event(self, notification):
+        """
+        Records a received playback event.
+
+        :param notification: Notification type of the event.
+        :return: None
+        """
+
+        self.record(KIND_EVENT, 0, notification if isinstance(notification, int) else -1)
+
+    def command(self, code):
+        """
+        Records a command sent to the device controller.
+
+        :param code: One of the CMD_* codes.
+        :return: None
+        """
+
+        self.record(KIND_COMMAND, code)
+
+    @staticmethod
+    def read(path):
+        """
+        Reads the records of a journal, which can still be in use by another process.
+
+        :param path: File backing the journal.
+        :return: list of JournalRecord, oldest first.
+        """
+
+        header, records = Journal._read_file(path)
+        if header is None:
+            raise ValueError(path + " is not a journal")
+
+        return records
+
+    @staticmethod
+    def _read_file(path):
+        """
+        :return: (header, records) of the given journal, header is None if the file is not a journal.
+        """
+
+        with open(path, "rb") as journal_file:
+            data = journal_file.read()
+
+        if len(data) < _HEADER_SIZE:
+            return None, []
+
+        header = _HEADER.unpack_from(data, 0)
+        if header[0] != _MAGIC or header[1] != _VERSION or header[2] != _RECORD.size:
+            return None, []
+
+        records = []
+        for offset in range(_HEADER_SIZE, len(data) - _RECORD.size + 1, _RECORD.size):
+            record = JournalRecord(*_RECORD.unpack_from(data, offset))
+            if record.seq:
+                records.append(record)
+
+        records.sort()
+        return header, records
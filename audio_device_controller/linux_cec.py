@@ -0,0 +1,258 @@
+import logging
+import os
+import struct
+
+from .bus import BusScheduler, PRIORITY_POWER, PRIORITY_QUERY
+from .core import AudioDeviceController, CecError, POWER_ON, POWER_STANDBY
+
+
+logger = logging.getLogger(__name__)
+
+# Structures of the Linux CEC API, see linux/cec.h.
+_CAPS      = struct.Struct("<32s32sIII")                    # struct cec_caps
+_LOG_ADDRS = struct.Struct("<4sHBBII15s4s4s4s48sx")         # struct cec_log_addrs
+_MSG       = struct.Struct("<QQIIII16sBBBBBBBx")            # struct cec_msg
+_U16       = struct.Struct("<H")
+_U32       = struct.Struct("<I")
+
+_IOC_WRITE = 1
+_IOC_READ  = 2
+
+
+def _ioc(direction, number, size):
+    return (direction << 30) | (size << 16) | (ord("a") << 8) | number
+
+
+CEC_ADAP_G_CAPS      = _ioc(_IOC_READ | _IOC_WRITE, 0, _CAPS.size)
+CEC_ADAP_G_PHYS_ADDR = _ioc(_IOC_READ, 1, _U16.size)
+CEC_ADAP_G_LOG_ADDRS = _ioc(_IOC_READ, 3, _LOG_ADDRS.size)
+CEC_ADAP_S_LOG_ADDRS = _ioc(_IOC_READ | _IOC_WRITE, 4, _LOG_ADDRS.size)
+CEC_TRANSMIT         = _ioc(_IOC_READ | _IOC_WRITE, 5, _MSG.size)
+CEC_S_MODE           = _ioc(_IOC_WRITE, 9, _U32.size)
+
+CEC_CAP_TRANSMIT              = 1 << 2
+CEC_MODE_INITIATOR            = 1
+CEC_TX_STATUS_OK              = 1
+CEC_RX_STATUS_OK              = 1
+CEC_LOG_ADDR_INVALID          = 0xff
+CEC_LOG_ADDR_TYPE_PLAYBACK    = 3
+CEC_OP_PRIM_DEVTYPE_PLAYBACK  = 4
+CEC_OP_ALL_DEVTYPE_PLAYBACK   = 0x10
+CEC_OP_CEC_VERSION_1_4        = 5
+CEC_VENDOR_ID_NONE            = 0xffffffff
+CEC_PHYS_ADDR_INVALID         = 0xffff
+
+# Logical addresses and opcodes of the messages sent.
+ADDR_AUDIOSYSTEM                = 5
+ADDR_BROADCAST                  = 15
+OP_STANDBY                      = 0x36
+OP_GIVE_OSD_NAME                = 0x46
+OP_SET_OSD_NAME                 = 0x47
+OP_SYSTEM_AUDIO_MODE_REQUEST    = 0x70
+OP_GIVE_DEVICE_POWER_STATUS     = 0x8f
+OP_REPORT_POWER_STATUS          = 0x90
+
+# Operand of Report Power Status: on, standby, in transition standby to on, in transition on to standby.
+_POWER_STATUS = {0: POWER_ON, 1: POWER_STANDBY, 2: POWER_ON, 3: POWER_STANDBY}
+
+
+class AudioDeviceControllerLinuxCec(AudioDeviceController):
+    """
+    Controller of cec-compatible devices through the CEC framework of the Linux kernel (/dev/cecN), without
+    libcec. Commands are transmitted with blocking ioctls, so each returns once the audio device acknowledged it.
+    """
+
+    def __init__(self, device="/dev/cec0", bus=None, ioctl=None, open_device=None, close_device=None):
+        """
+        Constructor.
+
+        :param device: CEC device node of the adapter.
+        :param bus: bus.BusScheduler pacing the commands sent, a default one if None.
+        :param ioctl: Function with the signature of fcntl.ioctl, fcntl.ioctl if None.
+        :param open_device: Function opening the device node and returning its fd, os.open if None.
+        :param close_device: Function closing the fd, os.close if None.
+        """
+        super().__init__()
+
+        self._device       = device
+        self._bus          = bus if bus is not None else BusScheduler()
+        self._ioctl        = ioctl
+        self._open_device  = open_device if open_device is not None else lambda path: os.open(path, os.O_RDWR)
+        self._close_device = close_device if close_device is not None else os.close
+        self._fd           = None
+        self._log_addr     = CEC_LOG_ADDR_INVALID
+        self._phys_addr    = CEC_PHYS_ADDR_INVALID
+
+    @property
+    def bus(self):
+        return self._bus
+
+    def initialize(self):
+        """
+        Opens the CEC device, claims a playback logical address and checks that there's an audio device.
+
+        Raises:
+            CecError -- if the device can't be opened, can't transmit or doesn't find the audio device.
+        """
+        super().initialize()
+
+        if self._ioctl is None:
+            from fcntl import ioctl
+            self._ioctl = ioctl
+
+        try:
+            self._fd = self._open_device(self._device)
+        except OSError as error:
+            raise CecError("Could not open CEC device " + self._device + ": " + str(error))
+
+        driver, name, _, capabilities, _ = _CAPS.unpack(self._call(CEC_ADAP_G_CAPS, _CAPS.size))
+        if not capabilities & CEC_CAP_TRANSMIT:
+            raise CecError("CEC device " + self._device + " can't transmit.")
+        logger.debug("CEC adapter %s (%s)", _text(name), _text(driver))
+
+        self._call(CEC_S_MODE, _U32.pack(CEC_MODE_INITIATOR))
+        self._log_addr = self._claim_log_addr()
+        self._phys_addr = _U16.unpack(self._call(CEC_ADAP_G_PHYS_ADDR, _U16.size))[0]
+
+        tx_status, _ = self._transmit(PRIORITY_QUERY, ADDR_AUDIOSYSTEM, b"")
+        if not tx_status & CEC_TX_STATUS_OK:
+            raise CecError("CEC device does not find audio device.")
+
+        tx_status, reply = self._transmit(PRIORITY_QUERY, ADDR_AUDIOSYSTEM, bytes([OP_GIVE_OSD_NAME]),
+                                          OP_SET_OSD_NAME)
+        logger.info("Audio device detected: %s", _text(reply[2:]) if reply else "(no name)")
+
+    def cleanup(self):
+        """
+        Closes the CEC device. The logical address is kept by the kernel for the next run.
+
+        :return: None
+        """
+        super().cleanup()
+
+        if self._fd is not None:
+            self._close_device(self._fd)
+            self._fd = None
+
+    def power_status(self):
+        """
+        Queries the power status of the audio device. A transition in progress counts as its target status.
+
+        :return: POWER_ON, POWER_STANDBY, or None if unknown.
+        """
+
+        _, reply = self._transmit(PRIORITY_QUERY, ADDR_AUDIOSYSTEM, bytes([OP_GIVE_DEVICE_POWER_STATUS]),
+                                  OP_REPORT_POWER_STATUS)
+        if reply is None or len(reply) < 3:
+            return None
+
+        return _POWER_STATUS.get(reply[2])
+
+    def power_on(self):
+        """
+        Power on the audio device.
+
+        Raises:
+             CecError -- in case the CEC device fails.
+
+        :return: True if acknowledged, False if not.
+        """
+
+        super().power_on()
+
+        return self.select_source()
+
+    def select_source(self):
+        """
+        Sets the active source in the audio device as this device, with a System Audio Mode Request holding
+        the physical address of this device.
+
+        Raises:
+             CecError -- in case the CEC device fails.
+
+        :return: True if acknowledged, False if not.
+        """
+
+        super().select_source()
+
+        tx_status, _ = self._transmit(PRIORITY_POWER, ADDR_AUDIOSYSTEM, bytes(
+            [OP_SYSTEM_AUDIO_MODE_REQUEST, self._phys_addr >> 8, self._phys_addr & 0xff]))
+        return bool(tx_status & CEC_TX_STATUS_OK)
+
+    def standby(self):
+        """
+        Put the audio device on standby, broadcasting the Standby message as libcec does.
+
+        Raises:
+            CecError -- in case the CEC device fails.
+
+        :return: True if sent, broadcasts are not acknowledged.
+        """
+
+        super().standby()
+        tx_status, _ = self._transmit(PRIORITY_POWER, ADDR_BROADCAST, bytes([OP_STANDBY]))
+        return bool(tx_status & CEC_TX_STATUS_OK)
+
+    def _claim_log_addr(self):
+        """
+        Claims a playback logical address, unless the adapter already has one configured.
+
+        :return: The logical address.
+        """
+
+        log_addrs = _LOG_ADDRS.unpack(self._call(CEC_ADAP_G_LOG_ADDRS, _LOG_ADDRS.size))
+        if log_addrs[3] == 0:
+            request = _LOG_ADDRS.pack(b"", 0, CEC_OP_CEC_VERSION_1_4, 1, CEC_VENDOR_ID_NONE, 0, b"audiodevctrl",
+                                      bytes([CEC_OP_PRIM_DEVTYPE_PLAYBACK]), bytes([CEC_LOG_ADDR_TYPE_PLAYBACK]),
+                                      bytes([CEC_OP_ALL_DEVTYPE_PLAYBACK]), b"")
+            log_addrs = _LOG_ADDRS.unpack(self._call(CEC_ADAP_S_LOG_ADDRS, request))
+
+        log_addr = log_addrs[0][0]
+        if log_addr == CEC_LOG_ADDR_INVALID:
+            raise CecError("CEC device " + self._device + " could not claim a logical address.")
+
+        return log_addr
+
+    def _transmit(self, priority, destination, payload, reply=0):
+        """
+        Transmits a message and waits for its acknowledgement, and for the reply if one is expected.
+
+        :param priority: Priority on the bus, PRIORITY_POWER or PRIORITY_QUERY.
+        :param destination: Logical address of the destination.
+        :param payload: Opcode and operands, empty for a poll.
+        :param reply: Opcode of the reply to wait for, 0 for none.
+        :return: (tx_status, reply message or None)
+        """
+
+        message = bytes([(self._log_addr << 4) | destination]) + payload
+        request = _MSG.pack(0, 0, len(message), 1000 if reply else 0, 0, 0, message, reply, 0, 0, 0, 0, 0, 0)
+
+        fields = _MSG.unpack(self._bus.run(priority, self._call, CEC_TRANSMIT, request))
+        length, data, rx_status, tx_status = fields[2], fields[6], fields[8], fields[9]
+
+        if not tx_status & CEC_TX_STATUS_OK and destination != ADDR_BROADCAST:
+            logger.warning("CEC message %s not acknowledged, status 0x%02x", message.hex(), tx_status)
+
+        return tx_status, data[:length] if reply and rx_status & CEC_RX_STATUS_OK else None
+
+    def _call(self, request, argument):
+        """
+        Runs an ioctl on the CEC device.
+
+        :param request: Request code.
+        :param argument: bytes passed in, or the size of the result for requests that only read.
+        :return: bytes with the argument as updated by the kernel.
+        """
+
+        buffer = bytearray(argument)
+
+        try:
+            self._ioctl(self._fd, request, buffer)
+        except OSError as error:
+            raise CecError("CEC device " + self._device + " failed: " + str(error))
+
+        return bytes(buffer)
+
+
+def _text(data):
+    return data.split(b"\0", 1)[0].decode("ascii", "replace")
@@ -0,0 +1,86 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+
+# Attributes every LogRecord has. Any other attribute comes from the "extra" argument of the logging call.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the formatting of the message to the listener thread.
+
+    Only records of enabled levels reach the handler, and their arguments are kept untouched, so the logging
+    call on the event path costs the creation of the record and a queue put. Arguments must therefore not be
+    modified after the logging call, pass immutable values.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats records as compact JSON objects, one per line, with the values given in "extra" as fields.
+    """
+
+    def format(self, record):
+        entry = {"t": round(record.created, 3),
+                 "lvl": record.levelname,
+                 "log": record.name,
+                 "msg": record.getMessage()}
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+def start_logging(level, json_lines=False, filename=None):
+    """
+    Sends the log records of the root logger through a queue to a listener thread, which formats and writes
+    them.
+
+    :param level: Level of the root logger, e.g. "DEBUG".
+    :param json_lines: Write compact JSON lines instead of text.
+    :param filename: File to append to, stderr if None.
+    :return: logging.handlers.QueueListener, to be passed to stop_logging().
+    """
+
+    handler = logging.FileHandler(filename) if filename else logging.StreamHandler()
+    if json_lines:
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    # SimpleQueue is reentrant, so a record logged by a signal handler interrupting a put() can't deadlock.
+    records = queue.SimpleQueue() if hasattr(queue, "SimpleQueue") else queue.Queue()
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.queue_handler = DeferredQueueHandler(records)
+
+    root = logging.getLogger()
+    root.addHandler(listener.queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    return listener
+
+
+def stop_logging(listener):
+    """
+    Writes the pending records and stops the listener started by start_logging().
+
+    :return: None
+    """
+
+    logging.getLogger().removeHandler(listener.queue_handler)
+    listener.stop()
+
+    for handler in listener.handlers:
+        handler.close()
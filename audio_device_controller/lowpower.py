@@ -0,0 +1,188 @@
+import heapq
+import logging
+import math
+import os
+import selectors
+import threading
+from itertools import count
+from time import monotonic
+
+
+logger = logging.getLogger(__name__)
+
+
+class WakeupLoop:
+    """
+    Loop of the event listener for low-power hosts, where every wakeup of the CPU costs energy.
+
+    The waits between polls and the timers of the session all happen in a single select. Deadlines are rounded
+    up to a grid of the given slack, so timers and polls that fall close together are served by the same wakeup
+    instead of one each. Timers run on the thread of the loop, between polls.
+    """
+
+    def __init__(self, slack=1.0, clock=monotonic):
+        """
+        Constructor.
+
+        :param slack: Seconds a timer or a poll can be delayed to share a wakeup, 0 for exact deadlines.
+        :param clock: Function returning the current time in seconds.
+        """
+
+        self._slack    = slack
+        self._clock    = clock
+        self._lock     = threading.Lock()
+        self._timers   = []
+        self._seq      = count()
+        self._waiting  = None
+        self._wakeups  = 0
+        self._fired    = 0
+        self._started  = clock()
+        self._selector = selectors.DefaultSelector()
+
+        # Self-pipe, written to when a timer is started with a deadline before the one of the current select.
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        os.set_blocking(self._wake_write, False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+
+    def timer(self, interval, function, args=None, kwargs=None):
+        """
+        Factory with the signature of threading.Timer, to be passed to Session as timer_factory.
+
+        :return: LoopTimer, to be started.
+        """
+
+        return LoopTimer(self, interval, function, args or (), kwargs or {})
+
+    def run_for(self, seconds):
+        """
+        Waits the given seconds, rounded up to the slack, running the timers that come due meanwhile.
+
+        :param seconds: Seconds to wait, 0 only runs the timers already due.
+        :return: None
+        """
+
+        until = self._deadline(seconds) if seconds > 0 else self._clock()
+
+        while True:
+            self._fire_due()
+
+            now = self._clock()
+            if now >= until:
+                return
+
+            with self._lock:
+                while self._timers and self._timers[0][3].cancelled:
+                    heapq.heappop(self._timers)
+                self._waiting = min(until, self._timers[0][0]) if self._timers else until
+                timeout = self._waiting - now
+
+            if self._selector.select(timeout):
+                try:
+                    os.read(self._wake_read, 512)
+                except BlockingIOError:
+                    pass
+
+            with self._lock:
+                self._waiting = None
+                self._wakeups += 1
+
+    def stats(self):
+        """
+        :return: dict with the "wakeups" of the loop, the "timers" fired, the "elapsed" seconds since it was
+                 created and the "wakeups_per_second".
+        """
+
+        elapsed = self._clock() - self._started
+        return {"wakeups": self._wakeups, "timers": self._fired, "elapsed": elapsed,
+                "wakeups_per_second": self._wakeups / elapsed if elapsed > 0 else 0.0}
+
+    def report(self):
+        """
+        :return: str with the wakeups per second since the loop was created.
+        """
+
+        stats = self.stats()
+        return "Wakeups: %d in %.0f s, %.3f per second, %d timers fired" % (
+            stats["wakeups"], stats["elapsed"], stats["wakeups_per_second"], stats["timers"])
+
+    def close(self):
+        """
+        Releases the selector and the self-pipe. Pending timers are dropped.
+
+        :return: None
+        """
+
+        self._selector.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        self._timers = []
+
+    def _deadline(self, seconds):
+        """
+        :return: Time in the given seconds, rounded up to the slack grid.
+        """
+
+        deadline = self._clock() + seconds
+        if self._slack > 0:
+            deadline = math.ceil(deadline / self._slack) * self._slack
+        return deadline
+
+    def _schedule(self, timer):
+        exact = self._clock() + timer.interval
+        deadline = self._deadline(timer.interval)
+
+        # Timers sharing a deadline fire in the order of their exact deadlines.
+        with self._lock:
+            heapq.heappush(self._timers, (deadline, exact, next(self._seq), timer))
+            wake = self._waiting is not None and deadline < self._waiting
+
+        if wake:
+            try:
+                os.write(self._wake_write, b"\0")
+            except BlockingIOError:
+                pass                            # The pipe is full, so the loop is waking up anyway.
+
+    def _fire_due(self):
+        """
+        Runs the timers whose deadline has passed, outside the lock as they may start other timers.
+
+        :return: None
+        """
+
+        now = self._clock()
+        while True:
+            with self._lock:
+                if not self._timers or self._timers[0][0] > now:
+                    return
+                timer = heapq.heappop(self._timers)[3]
+
+            if not timer.cancelled:
+                self._fired += 1
+                try:
+                    timer.fire()
+                except Exception:
+                    logger.exception("Timer failed")
+
+
+class LoopTimer:
+    """
+    Timer run by a WakeupLoop, same interface as threading.Timer.
+    """
+
+    def __init__(self, loop, interval, function, args, kwargs):
+        self.interval   = interval
+        self.cancelled  = False
+        self._loop      = loop
+        self._function  = function
+        self._args      = args
+        self._kwargs    = kwargs
+
+    def start(self):
+        self._loop._schedule(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        self._function(*self._args, **self._kwargs)
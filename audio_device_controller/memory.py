@@ -0,0 +1,145 @@
+import logging
+import threading
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by tracemalloc itself and by the import machinery are not of interest.
+_IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"))
+
+
+class MemoryMonitor:
+    """
+    Tracks the memory allocated by the process with tracemalloc, and reports where it grew since it was started
+    and since the last report. The report can be requested at runtime with a signal, and is taken and logged
+    by a reporter thread, as neither snapshots nor logging are safe in a signal handler.
+    """
+
+    def __init__(self, frames=1, top=10):
+        """
+        Constructor.
+
+        :param frames: Frames of the traceback kept for every allocation, more frames cost more memory.
+        :param top: Number of locations listed in a report.
+        """
+
+        self._frames   = frames
+        self._top      = top
+        self._baseline = None
+        self._last     = None
+        self._started  = False
+        self._reporter = None
+        self._request  = threading.Event()
+
+    def start(self):
+        """
+        Starts tracing, if it's not already, and takes the baseline snapshot.
+
+        :return: None
+        """
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._started = True
+
+        self._baseline = self._last = self._take()
+
+    def stop(self):
+        """
+        Stops tracing if it was started by this monitor.
+
+        :return: None
+        """
+
+        reporter, self._reporter = self._reporter, None
+        if reporter is not None:
+            self._request.set()
+            reporter.join()
+
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+        self._baseline = self._last = None
+
+    @staticmethod
+    def traced():
+        """
+        :return: (current, peak) size in bytes of the memory traced.
+        """
+
+        return tracemalloc.get_traced_memory()
+
+    def growth(self):
+        """
+        :return: Bytes allocated since start() and not released yet, not counting tracemalloc itself.
+        """
+
+        return sum(stat.size_diff for stat in self._take().compare_to(self._baseline, "filename"))
+
+    def report(self):
+        """
+        Takes a snapshot and compares it with the baseline and the previous report.
+
+        :return: str with the traced memory and the locations that grew the most.
+        """
+
+        snapshot = self._take()
+        since_start = snapshot.compare_to(self._baseline, "lineno")
+        since_last = snapshot.compare_to(self._last, "lineno")
+        self._last = snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = ["Traced memory: %.1f KiB, peak %.1f KiB, %+.1f KiB since start, %+.1f KiB since last report" % (
+            current / 1024, peak / 1024, sum(stat.size_diff for stat in since_start) / 1024,
+            sum(stat.size_diff for stat in since_last) / 1024)]
+
+        for title, stats in (("Top growth since start:", since_start), ("Top growth since last report:", since_last)):
+            lines.append(title)
+            for stat in sorted(stats, key=lambda stat: stat.size_diff, reverse=True)[:self._top]:
+                if stat.size_diff > 0:
+                    lines.append("  " + str(stat))
+
+        return "\n".join(lines)
+
+    def install(self, signum=None):
+        """
+        Logs a report every time the process receives the signal. The handler only wakes up the reporter
+        thread, which takes the report and logs it.
+
+        :param signum: Signal number, SIGUSR1 if None. Must be called from the main thread, after start().
+        :return: The previous handler of the signal.
+        """
+
+        import signal
+
+        if signum is None:
+            signum = signal.SIGUSR1
+
+        if self._reporter is None:
+            self._reporter = threading.Thread(target=self._run_reporter, name="memory-reporter", daemon=True)
+            self._reporter.start()
+
+        return signal.signal(signum, lambda signum, frame: self._request.set())
+
+    def _run_reporter(self):
+        """
+        Main loop of the reporter thread, until stop().
+
+        :return: None
+        """
+
+        while True:
+            self._request.wait()
+            self._request.clear()
+
+            if self._reporter is None:
+                return
+            logger.info("%s", self.report())
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
@@ -0,0 +1,185 @@
+from operator import itemgetter
+
+
+# Step of a path that matches every element of a list.
+WILDCARD = object()
+
+
+def parse_path(expression):
+    """
+    Splits a path expression in steps.
+
+    Keys are separated by dots and indexes go between brackets, [*] matching every element of a list:
+    "data.items[*].playback". A backslash escapes the next character, so keys can hold dots or brackets.
+    An expression without any of these characters is a single key, as is.
+
+    :param expression: Path expression.
+    :return: list of steps, each a str key, an int index or WILDCARD.
+    """
+
+    steps = []
+    key = []
+    index = None
+    escaped = False
+    pending = True          # A key is expected after a dot, or at the start.
+
+    for char in expression:
+        if escaped:
+            (key if index is None else index).append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif index is not None:
+            if char == "]":
+                token = "".join(index).strip()
+                if token == "*":
+                    steps.append(WILDCARD)
+                else:
+                    try:
+                        steps.append(int(token))
+                    except ValueError:
+                        raise ValueError("Invalid index [" + token + "] in path " + expression)
+                index = None
+            else:
+                index.append(char)
+        elif char == ".":
+            if pending or key:
+                steps.append("".join(key))
+            key = []
+            pending = True
+        elif char == "[":
+            if key:
+                steps.append("".join(key))
+            key = []
+            pending = False
+            index = []
+        else:
+            key.append(char)
+
+    if index is not None or escaped:
+        raise ValueError("Unterminated path " + expression)
+    if pending or key:
+        steps.append("".join(key))
+
+    return steps
+
+
+def _single(steps):
+    """
+    :return: function returning the value at the given steps, without wildcards.
+    """
+
+    if len(steps) == 1:
+        return itemgetter(steps[0])
+    elif len(steps) == 2:
+        first, second = steps
+        return lambda data: data[first][second]
+    elif len(steps) == 3:
+        first, second, third = steps
+        return lambda data: data[first][second][third]
+
+    def getter(data):
+        for step in steps:
+            data = data[step]
+        return data
+
+    return getter
+
+
+def _multiple(steps):
+    """
+    :return: function returning the list of values at the given steps, which have a wildcard.
+    """
+
+    split = steps.index(WILDCARD)
+    prefix = _single(steps[:split]) if split else None
+    rest = steps[split + 1:]
+
+    if not rest:
+        if prefix is None:
+            return list
+        return lambda data: list(prefix(data))
+
+    if WILDCARD in rest:
+        inner = _multiple(rest)
+    else:
+        getter = _single(rest)
+
+        def inner(item):
+            return [getter(item)]
+
+    def getter_all(data):
+        ret = []
+        for item in (prefix(data) if prefix is not None else data):
+            try:
+                ret.extend(inner(item))
+            except (KeyError, IndexError, TypeError):
+                pass            # Elements of the list that don't have the rest of the path are skipped.
+        return ret
+
+    return getter_all
+
+
+def compile_path(expression):
+    """
+    Compiles a path expression into an accessor function, so nothing is parsed when it's applied.
+
+    :param expression: Path expression, see parse_path().
+    :return: function(data) returning the value at the path, or the list of values if it has wildcards.
+             Raises KeyError, IndexError or TypeError if the path is not found.
+    """
+
+    steps = parse_path(expression)
+    return _multiple(steps) if WILDCARD in steps else _single(steps)
+
+
+def compile_list_path(expression):
+    """
+    Compiles a path expression pointing to a list, returning its elements. [*] is implied at the end.
+
+    :param expression: Path expression, see parse_path().
+    :return: function(data) returning the list of elements.
+    """
+
+    steps = parse_path(expression)
+    if steps[-1] is not WILDCARD:
+        steps.append(WILDCARD)
+
+    return _multiple(steps)
+
+
+def build_document(expression, value):
+    """
+    Builds the smallest document in which the given path holds the value. Indexes and wildcards become
+    single-element lists.
+
+    :param expression: Path expression, see parse_path().
+    :param value: Value at the path.
+    :return: The document.
+    """
+
+    return _build(parse_path(expression), value)
+
+
+def build_list_document(expression, element):
+    """
+    Builds the smallest document in which the list at the given path holds the element, the inverse of
+    compile_list_path().
+
+    :param expression: Path expression, see parse_path().
+    :param element: Only element of the list.
+    :return: The document.
+    """
+
+    steps = parse_path(expression)
+    if steps[-1] is not WILDCARD:
+        steps.append(WILDCARD)
+
+    return _build(steps, element)
+
+
+def _build(steps, value):
+    for step in reversed(steps):
+        value = {step: value} if isinstance(step, str) else [value]
+
+    return value
@@ -0,0 +1,51 @@
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """
+    Works out how long the event listener waits between polls from the activity of the session: polls back to
+    back at the minimum interval while the session is active or its pause timer is about to fire, so a play
+    cancels the standby in time, and slows down to the maximum interval as the session stays inactive.
+    """
+
+    def __init__(self, min_interval=0.0, max_interval=30.0, idle_after=900.0, timer_window=60.0):
+        """
+        Constructor.
+
+        :param min_interval: Seconds between polls while the session is active.
+        :param max_interval: Seconds between polls once the session has been inactive for idle_after.
+        :param idle_after: Seconds of inactivity over which the interval grows from the minimum to the maximum.
+        :param timer_window: Seconds before the pause timer fires in which polls are at the minimum interval.
+        """
+
+        if max_interval < min_interval:
+            raise ValueError("The maximum poll interval is under the minimum")
+
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._idle_after   = idle_after
+        self._timer_window = timer_window
+
+    def interval(self, session):
+        """
+        :param session: core.Session whose activity drives the polls.
+        :return: Seconds to wait before the next poll.
+        """
+
+        active, timer_left, idle = session.activity()
+
+        if active or (timer_left is not None and timer_left <= self._timer_window):
+            interval = self._min_interval
+        else:
+            ramp = min(1.0, idle / self._idle_after) if self._idle_after > 0 else 1.0
+            interval = self._min_interval + (self._max_interval - self._min_interval) * ramp
+
+            # Don't sleep past the moment the pause timer gets close.
+            if timer_left is not None:
+                interval = max(self._min_interval, min(interval, timer_left - self._timer_window))
+
+        logger.debug("Next poll in %.1f s", interval)
+        return interval
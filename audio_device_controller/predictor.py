@@ -0,0 +1,165 @@
+import logging
+import os
+import struct
+from array import array
+from datetime import timedelta
+
+
+_MAGIC  = b"ADCP"
+_HEADER = struct.Struct("<4sHH")
+
+logger = logging.getLogger(__name__)
+
+
+class UsagePredictor:
+    """
+    Learns when listening sessions usually start, per weekday and time slot, to power the audio device on
+    before the next one.
+
+    Every slot of the week keeps a score: each week a session starts in the slot adds 1, and the score decays
+    by the given factor every week. The likelihood of a slot is its score scaled to 1 for a session every week,
+    so old habits fade out and new ones are picked up in a few weeks.
+    """
+
+    def __init__(self, slot_minutes=15, threshold=0.5, decay=0.8, lead=120, hold=900, session_gap=1800,
+                 path=None):
+        """
+        Constructor.
+
+        :param slot_minutes: Length of the time slots, a divisor of a day.
+        :param threshold: Minimum likelihood, between 0 and 1, of a slot to power the device on before it.
+        :param decay: Weekly decay of the scores.
+        :param lead: Seconds before the start of a likely slot to power the device on.
+        :param hold: Seconds the device is kept on waiting for the session, then it's put on standby.
+        :param session_gap: Seconds without playing after which a play starts a new session.
+        :param path: Optional file where the scores are saved on every session start, and loaded from.
+        """
+
+        if (24 * 60) % slot_minutes:
+            raise ValueError("slot_minutes must divide a day: " + str(slot_minutes))
+
+        self.lead          = lead
+        self.hold          = hold
+        self._slot_minutes = slot_minutes
+        self._slots_day    = 24 * 60 // slot_minutes
+        self._threshold    = threshold
+        self._decay        = decay
+        self._session_gap  = timedelta(seconds=session_gap)
+        self._path         = path
+        self._scores       = array("d", bytes(8 * 7 * self._slots_day))
+        self._weeks        = array("d", bytes(8 * 7 * self._slots_day))
+        self._last_play    = None
+
+        if path is not None:
+            self._load()
+
+    def observe(self, when):
+        """
+        Learns from a play. Only the first play of a session counts, the ones that follow within the session
+        gap are its continuation.
+
+        :param when: datetime of the play.
+        :return: True if the play started a session.
+        """
+
+        last_play, self._last_play = self._last_play, when
+        if last_play is not None and timedelta(0) <= when - last_play < self._session_gap:
+            return False
+
+        slot = self._slot(when)
+        week = self._week(when)
+        self._scores[slot] = self._score(slot, week) + 1
+        self._weeks[slot] = week
+
+        logger.debug("Session start learned at slot %d, likelihood %.2f", slot, self.likelihood(when))
+
+        if self._path is not None:
+            self._save()
+
+        return True
+
+    def likelihood(self, when):
+        """
+        :return: Likelihood, between 0 and 1, of a session starting in the slot of the given datetime.
+        """
+
+        # Only the weeks missed since the last session in the slot decay it.
+        slot = self._slot(when)
+        return min(1.0, self._score(slot, self._week(when) - 1) * (1 - self._decay))
+
+    def next_start(self, now):
+        """
+        Finds the next slot in which a session likely starts, far enough to power the device on before it.
+
+        :param now: Current datetime.
+        :return: datetime of the start of the slot, or None if there is no likely slot within a week.
+        """
+
+        start = now.replace(minute=now.minute - now.minute % self._slot_minutes, second=0, microsecond=0)
+        step = timedelta(minutes=self._slot_minutes)
+        end = now + timedelta(days=7, seconds=self.lead)
+
+        while start <= end:
+            if (start - now).total_seconds() >= self.lead and self.likelihood(start) >= self._threshold:
+                return start
+            start += step
+
+        return None
+
+    def _slot(self, when):
+        return when.weekday() * self._slots_day + (when.hour * 60 + when.minute) // self._slot_minutes
+
+    @staticmethod
+    def _week(when):
+        return float(when.toordinal() // 7)
+
+    def _score(self, slot, week):
+        """
+        :return: Score of the slot decayed to the given week.
+        """
+
+        score = self._scores[slot]
+        if score:
+            score *= self._decay ** max(0.0, week - self._weeks[slot])
+        return score
+
+    def _save(self):
+        """
+        Writes the scores, replacing the previous file atomically. A failure is only logged.
+
+        :return: None
+        """
+
+        temp_path = self._path + ".tmp"
+        try:
+            with open(temp_path, "wb") as scores_file:
+                scores_file.write(_HEADER.pack(_MAGIC, self._slot_minutes, len(self._scores)))
+                self._scores.tofile(scores_file)
+                self._weeks.tofile(scores_file)
+            os.replace(temp_path, self._path)
+        except OSError as error:
+            logger.warning("Could not save usage scores: %s", error)
+
+    def _load(self):
+        """
+        Reads the scores saved by a previous run, if they were learned with the same slots.
+
+        :return: None
+        """
+
+        try:
+            with open(self._path, "rb") as scores_file:
+                data = scores_file.read()
+        except OSError:
+            return
+
+        expected = _HEADER.size + 2 * self._scores.itemsize * len(self._scores)
+        if len(data) != expected or _HEADER.unpack_from(data) != (_MAGIC, self._slot_minutes, len(self._scores)):
+            logger.warning("Ignoring usage scores in %s, invalid or learned with other slots", self._path)
+            return
+
+        values = array("d", data[_HEADER.size:])
+        self._scores = values[:len(self._scores)]
+        self._weeks = values[len(self._scores):]
+
+        logger.info("Usage scores loaded from %s", self._path)
@@ -0,0 +1,219 @@
+import heapq
+import json
+import logging
+from collections import namedtuple
+from time import monotonic, sleep
+
+from .core import AudioDeviceController, Session
+from .events import EventHandler, EventError
+
+
+logger = logging.getLogger(__name__)
+
+ReplayResult = namedtuple("ReplayResult", ["commands", "responses", "errors", "elapsed", "throughput"])
+
+
+class VirtualClock:
+    """
+    Clock of a replay. Time only moves forward when the replay advances it, firing the timers due.
+    """
+
+    def __init__(self, start=0.0):
+        self._now    = start
+        self._timers = []
+        self._seq    = 0
+
+    @property
+    def now(self):
+        return self._now
+
+    def timer(self, interval, function, args=None, kwargs=None):
+        """
+        Factory with the signature of threading.Timer, to be passed to Session as timer_factory.
+
+        :return: VirtualTimer, to be started.
+        """
+
+        return VirtualTimer(self, interval, function, args or (), kwargs or {})
+
+    def advance(self, until):
+        """
+        Moves the clock forward, firing in order the timers due until the given time.
+
+        :param until: Time to move to. float("inf") fires all the pending timers.
+        :return: None
+        """
+
+        while self._timers and self._timers[0][0] <= until:
+            deadline, _, timer = heapq.heappop(self._timers)
+            self._now = max(self._now, deadline)
+            timer.fire()
+
+        if until != float("inf"):
+            self._now = max(self._now, until)
+
+    def _schedule(self, timer):
+        self._seq += 1
+        heapq.heappush(self._timers, (self._now + timer.interval, self._seq, timer))
+
+
+class VirtualTimer:
+    """
+    Timer driven by a VirtualClock, same interface as threading.Timer.
+    """
+
+    def __init__(self, clock, interval, function, args, kwargs):
+        self.interval   = interval
+        self._clock     = clock
+        self._function  = function
+        self._args      = args
+        self._kwargs    = kwargs
+        self._cancelled = False
+
+    def start(self):
+        self._clock._schedule(self)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def fire(self):
+        if not self._cancelled:
+            self._cancelled = True
+            self._function(*self._args, **self._kwargs)
+
+
+class FakeController(AudioDeviceController):
+    """
+    Device controller that records the commands it receives, with the time of the given clock.
+    """
+
+    def __init__(self, clock):
+        super().__init__()
+
+        self._clock   = clock
+        self.commands = []
+
+    def initialize(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+    def power_on(self):
+        self.commands.append((self._clock.now, "power_on"))
+        return self.select_source()
+
+    def select_source(self):
+        self.commands.append((self._clock.now, "select_source"))
+        return True
+
+    def standby(self):
+        self.commands.append((self._clock.now, "standby"))
+        return True
+
+
+def load_trace(path, config):
+    """
+    Loads a trace of responses, from a journal or a JSON-lines capture.
+
+    Each line of a capture is either {"time": <seconds>, "response": <response>} or a bare response, which
+    is taken as received at the same time as the previous one. The events of a journal are turned into
+    single-event responses in the format given by the config.
+
+    :param path: File with the trace.
+    :param config: ConfigOptions with the format of the responses.
+    :return: list of (time, response), time in seconds relative to the first response.
+    """
+
+    from .journal import Journal, KIND_EVENT
+    from .paths import build_document, build_list_document
+
+    try:
+        records = Journal.read(path)
+    except ValueError:
+        records = None
+
+    trace = []
+    if records is not None:
+        for record in records:
+            if record.kind == KIND_EVENT:
+                event = build_document(config.pb_notif, record.arg)
+                trace.append((record.time, build_list_document(config.events, event)))
+    else:
+        time = 0.0
+        with open(path) as capture:
+            for line in capture:
+                if not line.strip():
+                    continue
+
+                entry = json.loads(line)
+                if isinstance(entry, dict) and "response" in entry:
+                    time = float(entry.get("time", time))
+                    entry = entry["response"]
+                trace.append((time, entry))
+
+    if trace:
+        start = trace[0][0]
+        trace = [(time - start, response) for time, response in trace]
+
+    return trace
+
+
+def replay(trace, config, speed=0):
+    """
+    Drives a trace through an EventHandler and a Session controlling a FakeController.
+
+    Pause timers run on the time of the trace, so the resulting commands are the same at any speed.
+
+    :param trace: list of (time, response), as returned by load_trace().
+    :param config: ConfigOptions with the format of the responses.
+    :param speed: Replay speed relative to the trace, e.g. 10 for ten times faster. 0 for as fast as possible.
+    :return: ReplayResult with the commands sent as (time, command), the number of responses and errors, the
+             elapsed wall time and the throughput in responses per second.
+    """
+
+    clock = VirtualClock()
+    controller = FakeController(clock)
+    session = Session(controller, timer_factory=clock.timer)
+    ev_handler = EventHandler(session, config)
+
+    errors = 0
+    started_at = monotonic()
+
+    session.initialize()
+    try:
+        for time, response in trace:
+            if speed > 0:
+                wait = started_at + time / speed - monotonic()
+                if wait > 0:
+                    sleep(wait)
+
+            clock.advance(time)
+
+            try:
+                ev_handler.process_json_response(response)
+            except EventError as error:
+                errors += 1
+                logger.debug("Replay: %s", error.message)
+
+        # Let the pending pause timers expire.
+        clock.advance(float("inf"))
+    finally:
+        session.cleanup()
+
+    elapsed = monotonic() - started_at
+    throughput = len(trace) / elapsed if elapsed > 0 else float("inf")
+
+    return ReplayResult(controller.commands, len(trace), errors, elapsed, throughput)
+
+
+def report(result):
+    """
+    :return: str with the commands and throughput of a replay.
+    """
+
+    lines = ["%10.3f  %s" % command for command in result.commands]
+    lines.append("%d responses (%d errors), %d commands in %.3f s, %.1f responses/s" %
+                 (result.responses, result.errors, len(result.commands), result.elapsed, result.throughput))
+
+    return "\n".join(lines)
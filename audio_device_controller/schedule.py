@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+
+# Commands of the controller that can be scheduled or used in a batch.
+COMMANDS = ("power_on", "select_source", "standby")
+
+
+def parse_time_of_day(text):
+    """
+    Parses a time of the day such as "23:00" or "07:30:15".
+
+    Raises:
+        ValueError -- if the text is not a valid time of the day.
+
+    :return: (hour, minute, second)
+    """
+
+    try:
+        parts = [int(part) for part in text.strip().split(":")]
+    except ValueError:
+        parts = []
+
+    if len(parts) not in (2, 3):
+        raise ValueError("Invalid time of day: " + text)
+
+    parts += [0] * (3 - len(parts))
+    if not (0 <= parts[0] < 24 and 0 <= parts[1] < 60 and 0 <= parts[2] < 60):
+        raise ValueError("Invalid time of day: " + text)
+
+    return tuple(parts)
+
+
+def seconds_until(at, now=None):
+    """
+    Seconds until the next time the clock shows the given time of the day.
+
+    :param at: (hour, minute, second)
+    :param now: Current datetime, datetime.now() if None.
+    :return: float with the seconds, 0 included, less than a day.
+    """
+
+    now = now if now is not None else datetime.now()
+    target = now.replace(hour=at[0], minute=at[1], second=at[2], microsecond=0)
+    if target < now:
+        target += timedelta(days=1)
+
+    return (target - now).total_seconds()
@@ -0,0 +1,64 @@
+import logging
+import os
+import struct
+from collections import namedtuple
+from time import time
+
+
+_MAGIC  = b"ADCS"
+_FORMAT = struct.Struct("<4sBBdd")
+
+logger = logging.getLogger(__name__)
+
+SessionSnapshot = namedtuple("SessionSnapshot", ["active", "dev_on", "pause_remaining", "saved_at"])
+
+
+def save_snapshot(path, active, dev_on, pause_remaining):
+    """
+    Writes the state of a session, replacing the previous snapshot atomically.
+
+    :param path: File holding the snapshot.
+    :param active: Whether the session is active.
+    :param dev_on: Whether the audio device is on.
+    :param pause_remaining: Seconds until the pause timer expires, None if there's no timer.
+    :return: None
+    """
+
+    data = _FORMAT.pack(_MAGIC, bool(active), bool(dev_on),
+                        -1.0 if pause_remaining is None else max(pause_remaining, 0.0), time())
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path):
+    """
+    Reads the state of a session, with the remaining pause time updated to the time elapsed since it was saved.
+
+    :param path: File holding the snapshot.
+    :return: SessionSnapshot, or None if there is no valid snapshot.
+    """
+
+    try:
+        with open(path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+    except OSError:
+        return None
+
+    if len(data) != _FORMAT.size:
+        logger.warning("Ignoring invalid session snapshot %s", path)
+        return None
+
+    magic, active, dev_on, pause_remaining, saved_at = _FORMAT.unpack(data)
+    if magic != _MAGIC:
+        logger.warning("Ignoring invalid session snapshot %s", path)
+        return None
+
+    if pause_remaining < 0:
+        pause_remaining = None
+    else:
+        pause_remaining = max(pause_remaining - max(time() - saved_at, 0.0), 0.0)
+
+    return SessionSnapshot(bool(active), bool(dev_on), pause_remaining, saved_at)
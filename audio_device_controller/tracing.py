@@ -0,0 +1,198 @@
+import logging
+import threading
+from collections import deque
+from itertools import count
+from math import ceil
+from time import time
+
+
+logger = logging.getLogger(__name__)
+
+# Stages of an event, in order. "server" is the time the media server emitted it, when the event carries it.
+# An event that doesn't end up in a command to the device stops at "dispatch" or "enqueue".
+STAGES = ("server", "receive", "decode", "dispatch", "enqueue", "send", "ack")
+
+# Segments measured, named after the stage they end in, plus "total" from the first stage to the last:
+#   receive:  server -> response received (media server and network)
+#   decode:   response received -> decoded
+#   dispatch: decoded -> event type resolved
+#   enqueue:  dispatched -> queued for the session owner
+#   send:     queued -> command sent to the device controller (mailbox wait and state machine)
+#   ack:      sent -> device controller returned (bus pacing and the device)
+SEGMENTS = STAGES[1:] + ("total",)
+
+_local = threading.local()
+
+
+def current():
+    """
+    :return: Trace of the event being processed by the current thread, or None.
+    """
+
+    return getattr(_local, "trace", None)
+
+
+def activate(trace):
+    """
+    Sets the trace of the event being processed by the current thread.
+
+    :param trace: Trace, or None.
+    :return: The previous trace, to be activated again when done.
+    """
+
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    return previous
+
+
+def mark(stage):
+    """
+    Marks a stage in the trace of the current thread, if there's one.
+
+    :return: None
+    """
+
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.marks.append((stage, time()))
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile.
+
+    :param ordered: Sorted list of values, not empty.
+    :param fraction: Percentile between 0 and 1.
+    :return: The value.
+    """
+
+    return ordered[max(0, min(len(ordered), ceil(fraction * len(ordered))) - 1)]
+
+
+class Trace:
+    """
+    Timestamps of the stages of an event, in seconds since the epoch.
+    """
+
+    __slots__ = ("id", "marks")
+
+    def __init__(self, trace_id):
+        self.id = trace_id
+        self.marks = []
+
+    def mark(self, stage, at=None):
+        self.marks.append((stage, time() if at is None else at))
+
+    def segments(self):
+        """
+        :return: list of (segment, seconds), in order and ending with "total".
+        """
+
+        ret = []
+        for (_, previous), (stage, at) in zip(self.marks, self.marks[1:]):
+            ret.append((stage, at - previous))
+
+        if self.marks:
+            ret.append(("total", self.marks[-1][1] - self.marks[0][1]))
+
+        return ret
+
+
+class Tracer:
+    """
+    Gives a trace to every event and keeps the durations of the last traces per segment, for percentiles and
+    SLO alerts.
+    """
+
+    def __init__(self, slo=None, capacity=1024):
+        """
+        Constructor.
+
+        :param slo: dict with the maximum seconds per segment, a warning is logged for each trace over them.
+        :param capacity: Number of durations kept per segment.
+        """
+
+        self._slo        = dict(slo or {})
+        self._capacity   = capacity
+        self._ids        = count(1)
+        self._lock       = threading.Lock()
+        self._samples    = {}
+        self._violations = {}
+
+    def start(self, received_at, server_time=None):
+        """
+        Starts the trace of an event.
+
+        :param received_at: Time the response holding the event was received.
+        :param server_time: Time the media server emitted the event, if known.
+        :return: Trace
+        """
+
+        trace = Trace(next(self._ids))
+        if server_time is not None:
+            trace.mark("server", server_time)
+        trace.mark("receive", received_at)
+
+        return trace
+
+    def finish(self, trace):
+        """
+        Records the durations of a trace and logs the segments over their SLO.
+
+        :return: None
+        """
+
+        segments = trace.segments()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Trace %d: %s", trace.id, " ".join("%s=%.1fms" % (name, seconds * 1000)
+                                                            for name, seconds in segments))
+
+        with self._lock:
+            for name, seconds in segments:
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self._capacity)
+                samples.append(seconds)
+
+                threshold = self._slo.get(name)
+                if threshold is not None and seconds > threshold:
+                    self._violations[name] = self._violations.get(name, 0) + 1
+                    logger.warning("Trace %d: %s took %.1f ms, over the SLO of %.1f ms", trace.id, name,
+                                   seconds * 1000, threshold * 1000)
+
+    def summary(self):
+        """
+        :return: dict per segment with the "count" of durations kept, their "p50", "p90", "p99" and "max" in
+                 seconds, and the number of "slo_violations".
+        """
+
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            violations = dict(self._violations)
+
+        ret = {}
+        for name, ordered in samples.items():
+            ret[name] = {"count": len(ordered),
+                         "p50": percentile(ordered, 0.5),
+                         "p90": percentile(ordered, 0.9),
+                         "p99": percentile(ordered, 0.99),
+                         "max": ordered[-1],
+                         "slo_violations": violations.get(name, 0)}
+
+        return ret
+
+    def report(self):
+        """
+        :return: str with the summary, one line per segment in the order of the stages.
+        """
+
+        summary = self.summary()
+        lines = ["Latency (ms)     count     p50     p90     p99     max  over SLO"]
+        for name in SEGMENTS:
+            if name in summary:
+                entry = summary[name]
+                lines.append("%-12s %9d %7.1f %7.1f %7.1f %7.1f %9d" % (
+                    name, entry["count"], entry["p50"] * 1000, entry["p90"] * 1000, entry["p99"] * 1000,
+                    entry["max"] * 1000, entry["slo_violations"]))
+
+        return "\n".join(lines)
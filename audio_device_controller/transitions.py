@@ -0,0 +1,239 @@
+from array import array
+from collections import namedtuple
+
+
+# State bits: the session state is the combination of the four flags below, 16 states in total. FORCED_ON is
+# set within a power on window, where the device is kept on.
+ACTIVE      = 1
+DEV_ON      = 2
+TIMER_ARMED = 4
+FORCED_ON   = 8
+
+N_STATES = 16
+
+# Events the session reacts to.
+EV_ACTIVATE   = 0
+EV_DEACTIVATE = 1
+EV_PLAY       = 2
+EV_PAUSE      = 3
+EV_TIMER      = 4
+EV_SCHEDULED_STANDBY  = 5
+EV_SCHEDULED_POWER_ON = 6
+EV_PREWARM            = 7
+EV_WINDOW_START       = 8
+EV_WINDOW_END         = 9
+EV_DEVICE_ON          = 10
+EV_DEVICE_OFF         = 11
+
+EVENT_NAMES = ("activate", "deactivate", "play", "pause", "timer", "scheduled_standby", "scheduled_power_on",
+               "prewarm", "window_start", "window_end", "device_on", "device_off")
+N_EVENTS    = len(EVENT_NAMES)
+
+# Actions to execute on a transition, as bits. Executed in this order.
+A_CANCEL_TIMER = 1
+A_POWER_ON     = 2
+A_STANDBY      = 4
+A_ARM_TIMER    = 8
+
+ACTION_NAMES = ((A_CANCEL_TIMER, "cancel_timer"),
+                (A_POWER_ON,     "power_on"),
+                (A_STANDBY,      "standby"),
+                (A_ARM_TIMER,    "arm_timer"))
+
+
+def _transition(state, event):
+    """
+    Rules of the session. Only used to build the transition table.
+
+    :param state: Combination of ACTIVE, DEV_ON, TIMER_ARMED and FORCED_ON.
+    :param event: One of the EV_* events.
+    :return: (next state, actions)
+    """
+
+    actions = 0
+
+    if event == EV_ACTIVATE:
+        if not state & ACTIVE:
+            if not state & DEV_ON:
+                actions |= A_POWER_ON
+            if state & TIMER_ARMED:
+                # Pre-warmed, the session has come.
+                actions |= A_CANCEL_TIMER
+                state &= ~TIMER_ARMED
+            state |= ACTIVE | DEV_ON
+
+    elif event == EV_DEACTIVATE or event == EV_TIMER:
+        # A timer while inactive is the one of a pre-warm. Within a power on window the device stays on.
+        if state & DEV_ON and state & (ACTIVE | TIMER_ARMED) and not state & FORCED_ON:
+            actions |= A_STANDBY
+            state &= ~DEV_ON
+        if state & TIMER_ARMED:
+            actions |= A_CANCEL_TIMER
+            state &= ~TIMER_ARMED
+        if event == EV_DEACTIVATE:
+            state &= ~ACTIVE
+
+    elif event == EV_PLAY:
+        if state & ACTIVE:
+            if state & TIMER_ARMED:
+                actions |= A_CANCEL_TIMER
+                state &= ~TIMER_ARMED
+            if not state & DEV_ON:
+                actions |= A_POWER_ON
+                state |= DEV_ON
+
+    elif event == EV_PAUSE:
+        if state & ACTIVE and not state & TIMER_ARMED:
+            actions |= A_ARM_TIMER
+            state |= TIMER_ARMED
+
+    elif event == EV_SCHEDULED_STANDBY or event == EV_WINDOW_END:
+        # Never interrupts playback, a paused session goes to standby right away. Not within a power on window.
+        if event == EV_WINDOW_END:
+            state &= ~FORCED_ON
+        playing = state & ACTIVE and not state & TIMER_ARMED
+        if state & DEV_ON and not playing and not state & FORCED_ON:
+            actions |= A_STANDBY
+            state &= ~DEV_ON
+            if state & TIMER_ARMED:
+                actions |= A_CANCEL_TIMER
+                state &= ~TIMER_ARMED
+
+    elif event == EV_SCHEDULED_POWER_ON or event == EV_WINDOW_START:
+        if event == EV_WINDOW_START:
+            state |= FORCED_ON
+        if not state & DEV_ON:
+            actions |= A_POWER_ON
+            state |= DEV_ON
+
+    elif event == EV_PREWARM:
+        # Powers on ahead of a likely session, and puts the device back on standby if it doesn't come.
+        if not state & (ACTIVE | DEV_ON):
+            actions |= A_POWER_ON | A_ARM_TIMER
+            state |= DEV_ON | TIMER_ARMED
+
+    elif event == EV_DEVICE_ON or event == EV_DEVICE_OFF:
+        # Power status reported by the device, taken as is so the next transition that needs it sends the
+        # command again.
+        if event == EV_DEVICE_ON:
+            state |= DEV_ON
+        else:
+            state &= ~DEV_ON
+
+    return state, actions
+
+
+def _build_table():
+    """
+    Precomputes the transitions of every state on every event.
+
+    :return: tuple indexed by state * N_EVENTS + event, holding (next state, actions).
+    """
+
+    return tuple(_transition(state, event) for state in range(N_STATES) for event in range(N_EVENTS))
+
+
+TRANSITIONS = _build_table()
+
+
+def lookup(state, event):
+    """
+    :return: (next state, actions) for the given state and event.
+    """
+
+    return TRANSITIONS[state * N_EVENTS + event]
+
+
+def state_name(state):
+    """
+    :return: Human readable name of a state, e.g. "active|dev_on".
+    """
+
+    names = [name for bit, name in ((ACTIVE, "active"), (DEV_ON, "dev_on"), (TIMER_ARMED, "timer"),
+                                    (FORCED_ON, "forced_on")) if state & bit]
+    return "|".join(names) if names else "inactive"
+
+
+def action_names(actions):
+    """
+    :return: List with the names of the given action bits, in execution order.
+    """
+
+    return [name for bit, name in ACTION_NAMES if actions & bit]
+
+
+Transition = namedtuple("Transition", ["time", "source", "event", "target", "actions"])
+
+
+def named_transition(time, source, event, target, actions):
+    """
+    :return: Transition with the names of the given codes.
+    """
+
+    return Transition(time, state_name(source), EVENT_NAMES[event], state_name(target), action_names(actions))
+
+
+class TransitionLog:
+    """
+    Fixed-size ring buffer with the last transitions of a session.
+
+    All the storage is allocated upfront, recording a transition only overwrites the oldest slot.
+    """
+
+    def __init__(self, capacity=256):
+        self._capacity = capacity
+        self._count    = 0
+        self._times    = array("d", [0.0]) * capacity
+        self._sources  = array("B", [0]) * capacity
+        self._events   = array("B", [0]) * capacity
+        self._targets  = array("B", [0]) * capacity
+        self._actions  = array("B", [0]) * capacity
+
+    def __len__(self):
+        return min(self._count, self._capacity)
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def total(self):
+        """
+        :return: Number of transitions recorded since creation, including the overwritten ones.
+        """
+        return self._count
+
+    def record(self, time, source, event, target, actions):
+        """
+        Records a transition, overwriting the oldest one if the buffer is full.
+
+        :return: None
+        """
+
+        index = self._count % self._capacity
+        self._times[index]   = time
+        self._sources[index] = source
+        self._events[index]  = event
+        self._targets[index] = target
+        self._actions[index] = actions
+        self._count += 1
+
+    def entries(self, last=None):
+        """
+        Returns the recorded transitions, oldest first.
+
+        :param last: Only return the last given number of transitions.
+        :return: list of Transition, with names instead of codes.
+        """
+
+        size = len(self)
+        if last is not None:
+            size = min(size, last)
+
+        ret = []
+        for i in range(self._count - size, self._count):
+            index = i % self._capacity
+            ret.append(named_transition(self._times[index], self._sources[index], self._events[index],
+                                        self._targets[index], self._actions[index]))
+
+        return ret
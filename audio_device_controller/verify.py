@@ -0,0 +1,48 @@
+from time import monotonic
+
+from .bus import TokenBucket
+
+
+class PowerVerifier:
+    """
+    Policy of the verification of the power transitions of a session.
+
+    Some time after a power on or a standby, the power status of the audio device is queried. If it's not the
+    expected one, the command is sent again, as long as the retry budget allows it: a token bucket of the given
+    retries per window, shared by all the transitions. If the audio device doesn't answer, the query is retried
+    later, backing off exponentially.
+    """
+
+    def __init__(self, delay=3.0, retries=3, window=600.0, attempts=4, max_delay=60.0, clock=monotonic):
+        """
+        Constructor.
+
+        :param delay: Seconds after a command before its verification, time for the audio device to switch.
+        :param retries: Commands that can be sent again per window.
+        :param window: Seconds of the window of the retry budget.
+        :param attempts: Maximum verifications of a transition.
+        :param max_delay: Maximum seconds between verifications when backing off.
+        :param clock: Function returning the current time in seconds.
+        """
+
+        self.attempts   = attempts
+        self._delay     = delay
+        self._max_delay = max_delay
+        self._budget    = TokenBucket(retries / window, retries, clock)
+
+    def delay(self, attempt):
+        """
+        :param attempt: Verifications of the transition already done, 0 for the first one.
+        :return: Seconds until the next verification.
+        """
+
+        return min(self._max_delay, self._delay * 2 ** attempt)
+
+    def allow_retry(self):
+        """
+        Takes a retry from the budget, if there's one left.
+
+        :return: True if the command can be sent again.
+        """
+
+        return self._budget.take() == 0
@@ -0,0 +1,265 @@
+import logging
+import struct
+import threading
+
+from .core import AudioDeviceController, CecError, POWER_ON, POWER_STANDBY
+
+
+logger = logging.getLogger(__name__)
+
+# Protocol over the pipe. A request is (sequence, operation), a response is (sequence, status, value) followed
+# by the error message if the status is not OK.
+_REQUEST  = struct.Struct("<IB")
+_RESPONSE = struct.Struct("<IBb")
+
+OP_INITIALIZE    = 0
+OP_CLEANUP       = 1
+OP_POWER_ON      = 2
+OP_SELECT_SOURCE = 3
+OP_STANDBY       = 4
+OP_POWER_STATUS  = 5
+
+_OPERATIONS = ("initialize", "cleanup", "power_on", "select_source", "standby", "power_status")
+
+STATUS_OK        = 0
+STATUS_CEC_ERROR = 1
+STATUS_ERROR     = 2
+
+# Values of the commands (True, False, None) and of power_status() (POWER_ON, POWER_STANDBY, None), as bytes.
+_ENCODE = {True: 1, False: 0, None: -1, POWER_ON: 1, POWER_STANDBY: 0}
+_DECODE_ACK = {1: True, 0: False, -1: None}
+_DECODE_POWER = {1: POWER_ON, 0: POWER_STANDBY, -1: None}
+
+
+def serve(connection, factory):
+    """
+    Main loop of the worker process: runs the requests received on the connection against the controller.
+
+    :param connection: multiprocessing.Connection to the parent.
+    :param factory: Callable creating the controller, e.g. AudioDeviceControllerCec.
+    :return: None
+    """
+
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)       # The parent decides when the worker ends.
+
+    controller = factory()
+
+    while True:
+        try:
+            sequence, operation = _REQUEST.unpack(connection.recv_bytes())
+        except EOFError:
+            return
+
+        message = b""
+        try:
+            value, status = _ENCODE.get(getattr(controller, _OPERATIONS[operation])(), -1), STATUS_OK
+        except CecError as error:
+            value, status, message = -1, STATUS_CEC_ERROR, str(error.message).encode("utf-8")
+        except Exception as error:
+            value, status, message = -1, STATUS_ERROR, repr(error).encode("utf-8")
+
+        connection.send_bytes(_RESPONSE.pack(sequence, status, value) + message)
+
+        if operation == OP_CLEANUP:
+            return
+
+
+class AudioDeviceControllerProcess(AudioDeviceController):
+    """
+    Runs a device controller in a child process, so a stuck libcec call can't freeze the caller.
+
+    Every command has a deadline: if the child doesn't answer in time, it's killed and the command fails with a
+    CecError. The next command starts a new child and initializes its controller again before running.
+    """
+
+    def __init__(self, factory, deadline=5.0, init_deadline=30.0, context="spawn"):
+        """
+        Constructor.
+
+        :param factory: Picklable callable creating the controller in the child, e.g. AudioDeviceControllerCec
+                        or functools.partial(AudioDeviceControllerLinuxCec, "/dev/cec1").
+        :param deadline: Seconds a command can take.
+        :param init_deadline: Seconds the initialization of the controller can take.
+        :param context: multiprocessing start method.
+        """
+        super().__init__()
+
+        self._factory       = factory
+        self._deadline      = deadline
+        self._init_deadline = init_deadline
+        self._context       = context
+        self._lock          = threading.Lock()
+        self._process       = None
+        self._connection    = None
+        self._sequence      = 0
+        self._initialized   = False
+        self._restarts      = 0
+
+    @property
+    def restarts(self):
+        """
+        Number of times the child was restarted after hanging or dying.
+        """
+        return self._restarts
+
+    def initialize(self):
+        """
+        Starts the child and initializes the controller in it.
+
+        Raises:
+            CecError -- if the controller fails to initialize, or doesn't in time.
+        """
+        super().initialize()
+
+        with self._lock:
+            self._request(OP_INITIALIZE)
+            self._initialized = True
+
+    def cleanup(self):
+        """
+        Cleans up the controller in the child, and waits for it to end.
+
+        :return: None
+        """
+        super().cleanup()
+
+        with self._lock:
+            self._initialized = False
+            if self._process is None:
+                return
+
+            try:
+                self._request(OP_CLEANUP)
+            except CecError as error:
+                logger.warning("%s", error.message)
+            finally:
+                self._stop(kill=False)
+
+    def power_status(self):
+        with self._lock:
+            return _DECODE_POWER[self._request(OP_POWER_STATUS)]
+
+    def power_on(self):
+        super().power_on()
+        with self._lock:
+            return _DECODE_ACK[self._request(OP_POWER_ON)]
+
+    def select_source(self):
+        super().select_source()
+        with self._lock:
+            return _DECODE_ACK[self._request(OP_SELECT_SOURCE)]
+
+    def standby(self):
+        super().standby()
+        with self._lock:
+            return _DECODE_ACK[self._request(OP_STANDBY)]
+
+    def _request(self, operation):
+        """
+        Runs an operation in the child, starting it first if needed. Must hold the lock.
+
+        :return: Value returned by the operation, encoded.
+        """
+
+        if self._process is None:
+            self._start()
+
+        self._sequence = (self._sequence + 1) & 0xffffffff
+        deadline = self._init_deadline if operation == OP_INITIALIZE else self._deadline
+
+        try:
+            self._connection.send_bytes(_REQUEST.pack(self._sequence, operation))
+            if not self._connection.poll(deadline):
+                self._restart()
+                raise CecError("CEC worker did not complete " + _OPERATIONS[operation] + " in %.1f s, restarted"
+                               % deadline)
+
+            response = self._connection.recv_bytes()
+        except (EOFError, OSError):
+            self._restart()
+            raise CecError("CEC worker died during " + _OPERATIONS[operation] + ", restarted")
+
+        sequence, status, value = _RESPONSE.unpack_from(response)
+        if sequence != self._sequence:
+            self._restart()
+            raise CecError("CEC worker out of sync, restarted")
+
+        if status != STATUS_OK:
+            raise CecError(response[_RESPONSE.size:].decode("utf-8", "replace"))
+
+        return value
+
+    def _start(self):
+        """
+        Starts the child and, if the controller was initialized, initializes it again in the new child.
+
+        :return: None
+        """
+
+        import multiprocessing
+
+        context = multiprocessing.get_context(self._context)
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(target=serve, args=(child_connection, self._factory),
+                                        name="cec-worker", daemon=True)
+        self._process.start()
+        child_connection.close()
+
+        logger.debug("CEC worker started, pid %d", self._process.pid)
+
+        if self._initialized:
+            try:
+                self._request(OP_INITIALIZE)
+            except CecError:
+                if self._process is not None:
+                    self._stop(kill=True)
+                raise
+
+    def _restart(self):
+        """
+        Kills the child, the next request starts a new one.
+
+        :return: None
+        """
+
+        logger.warning("Restarting the CEC worker")
+        self._restarts += 1
+        self._stop(kill=True)
+
+    def _stop(self, kill):
+        """
+        Ends the child, killing it if asked or if it doesn't end by itself. Never waits more than two deadlines:
+        a child that outlives SIGKILL, e.g. stuck in the kernel, is logged and abandoned.
+
+        :return: None
+        """
+
+        process, self._process = self._process, None
+        connection, self._connection = self._connection, None
+
+        if kill:
+            _kill(process)
+        process.join(self._deadline)
+        if process.is_alive():
+            _kill(process)
+            process.join(self._deadline)
+            if process.is_alive():
+                logger.error("CEC worker %d did not end, abandoning it", process.pid)
+
+        connection.close()
+
+
+def _kill(process):
+    """
+    Sends SIGKILL to a process, Process.kill() only exists since Python 3.7.
+
+    :return: None
+    """
+
+    if hasattr(process, "kill"):
+        process.kill()
+    elif process.is_alive():
+        import os
+        import signal
+        os.kill(process.pid, signal.SIGKILL)
@@ -28,6 +28,10 @@ setup(
     },
     test_suite="nose.collector",
     requires=required,
+    extras_require={
+        "msgpack": ["msgpack>=0.5.2"],
+        "cbor": ["cbor2"],
+    },
     setup_requires=["nose>=1.0"],
     classifiers=["Development Status :: 3 - Alpha",
                  "Programming Language :: Python 3.3",
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import call, Mock
+
+
+class BatchTest(unittest.TestCase):
+    """
+    Unit tests for the batch scripts in audio_device_controller.batch.
+    """
+
+    def test_parse(self):
+        """
+        Test parsing a script with all kinds of steps.
+
+        :return: None
+        """
+
+        from audio_device_controller.batch import parse_script, BatchStep
+
+        steps = parse_script("power_on; wait 2s; select_source\n"
+                             "# Evening\n"
+                             "wait 500 ms; wait 1.5m;standby at 23:00  # Night\n")
+
+        self.assertEqual(steps, [BatchStep("power_on", 0, None),
+                                 BatchStep("wait", 2.0, None),
+                                 BatchStep("select_source", 0, None),
+                                 BatchStep("wait", 0.5, None),
+                                 BatchStep("wait", 90.0, None),
+                                 BatchStep("standby", 0, (23, 0, 0))])
+
+    def test_parse_errors(self):
+        """
+        Test that invalid steps are rejected before anything runs.
+
+        :return: None
+        """
+
+        from audio_device_controller.batch import parse_script, BatchError
+
+        for script in ["reboot", "wait", "wait 2 days", "standby at 25:00", "standby at noon", "power_on now"]:
+            with self.assertRaises(BatchError):
+                parse_script(script)
+
+    def test_run(self):
+        """
+        Test that the steps run in order against the controller, waiting as scheduled.
+
+        :return: None
+        """
+
+        from datetime import datetime
+        from audio_device_controller.batch import parse_script, run_script
+        from audio_device_controller.core import AudioDeviceController
+
+        controller = Mock(spec=AudioDeviceController)
+        sleep = Mock()
+        controller.attach_mock(sleep, "sleep")
+
+        run_script(parse_script("power_on; wait 2s; select_source; standby at 23:00"), controller,
+                   sleep=sleep, now=lambda: datetime(2026, 10, 19, 22, 30))
+
+        self.assertEqual(controller.mock_calls, [call.power_on(), call.sleep(2.0), call.select_source(),
+                                                 call.sleep(1800.0), call.standby()])
@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+
+class TokenBucketTest(unittest.TestCase):
+    """
+    Unit tests for the TokenBucket class in audio_device_controller.bus.
+    """
+
+    def test_take(self):
+        """
+        Test bursts and refill of the bucket.
+
+        :return: None
+        """
+
+        from audio_device_controller.bus import TokenBucket
+
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 0.5)
+
+        now[0] = 0.25
+        self.assertAlmostEqual(bucket.take(), 0.25)
+
+        now[0] = 10.0
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertTrue(bucket.take() > 0)
+
+
+class BusSchedulerTest(unittest.TestCase):
+    """
+    Unit tests for the BusScheduler class in audio_device_controller.bus.
+    """
+
+    def test_priority(self):
+        """
+        Test that waiting power commands go before queries queued earlier.
+
+        :return: None
+        """
+
+        from audio_device_controller.bus import BusScheduler, PRIORITY_POWER, PRIORITY_QUERY
+
+        bus = BusScheduler(rate=10, burst=1)
+        sent = []
+
+        self.assertEqual(bus.run(PRIORITY_POWER, sent.append, "first"), None)
+
+        query = threading.Thread(target=bus.run, args=(PRIORITY_QUERY, sent.append, "query"))
+        power = threading.Thread(target=bus.run, args=(PRIORITY_POWER, sent.append, "power"))
+        query.start()
+        time.sleep(0.01)
+        power.start()
+        time.sleep(0.01)
+        self.assertEqual(bus.queue_depth, 2)
+
+        query.join()
+        power.join()
+
+        self.assertEqual(sent, ["first", "power", "query"])
+
+        stats = bus.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["power"]["sent"], 2)
+        self.assertEqual(stats["query"]["sent"], 1)
+        self.assertTrue(stats["query"]["max_wait"] > stats["power"]["max_wait"] > 0)
@@ -1,4 +1,5 @@
 import unittest
+from datetime import timedelta
 from unittest.mock import patch, Mock
 import audio_device_controller
 
@@ -316,6 +317,33 @@ class SessionHandlerTest(unittest.TestCase):
 
                 self.assertTrue(self.match_internal_state(session, "LongPause"))
 
+    def test_activity(self):
+        """
+        Test that the activity of the session reflects the pause timer and the time since it was last active.
+
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+            with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+                session.active(True)
+                self.assertEqual(session.activity(), (True, None, 0.0))
+
+                session.pause(10)
+                active, timer_left, idle = session.activity()
+                self.assertTrue(active)
+                self.assertTrue(0 < timer_left <= 10)
+
+                session.active(False)
+                active, timer_left, idle = session.activity()
+                self.assertEqual((active, timer_left), (False, None))
+                self.assertTrue(0 <= idle < 5)
+
     def test_pause_active_prev_pause(self):
         """
         Test pause command when session is active and there was a previous pause.
@@ -365,6 +393,384 @@ class SessionHandlerTest(unittest.TestCase):
 
                 self.assertTrue(self.match_internal_state(session, "Inactive"))
 
+    def test_stale_timer_ignored(self):
+        """
+        Test a pause timer that fired right before play() cancelled it.
+
+        Its standby is processed after play() and must be ignored.
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+            with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+                session.active(True)
+                session.pause(10)
+                generation = mock_timer.call_args[1]["args"][0]
+
+                session.play()
+                session._send_standby(generation)
+                mock_dev_ctrl.standby.assert_not_called()
+
+                self.assertTrue(self.match_internal_state(session, "Playing"))
+
+    def test_command_failure(self):
+        """
+        Test that a failed command doesn't stop the session: the device keeps its power state, and the pause
+        timer ends without raising.
+
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController, CecError
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+            mock_dev_ctrl.standby.side_effect = CecError("CEC worker did not complete standby in 5.0 s, restarted")
+
+            with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+                session.active(True)
+                session.pause(10)
+                generation = mock_timer.call_args[1]["args"][0]
+
+                session._send_standby(generation)
+                self.assertTrue(self.match_internal_state(session, "Playing"))
+
+                # Sent again on the next transition that needs it.
+                mock_dev_ctrl.standby.side_effect = None
+                session.active(False)
+                self.assertEqual(mock_dev_ctrl.standby.call_count, 2)
+                self.assertTrue(self.match_internal_state(session, "Inactive"))
+
+    def test_submit_from_threads(self):
+        """
+        Test that messages submitted from several threads are all processed by the session owner.
+
+        :return: None
+        """
+
+        from threading import Thread
+        from audio_device_controller.core import AudioDeviceController
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+        with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+            session.active(True)
+
+            threads = [Thread(target=session.play) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            future = session.submit("active", False)
+            self.assertIsNone(future.result(timeout=5))
+
+            metrics = session.metrics()
+            self.assertEqual(metrics["play"]["count"], 10)
+            self.assertEqual(metrics["active"]["count"], 2)
+            self.assertEqual(metrics["queue_depth"], 0)
+            mock_dev_ctrl.power_on.assert_called_once_with()
+            mock_dev_ctrl.standby.assert_called_once_with()
+
+    def test_initialize_without_waiting(self):
+        """
+        Test that the messages submitted while the initialization is pending are buffered, not waited for.
+
+        :return: None
+        """
+
+        from threading import Event
+        from audio_device_controller.core import AudioDeviceController
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+        release = Event()
+        mock_dev_ctrl.initialize.side_effect = lambda: release.wait(5)
+
+        session = audio_device_controller.core.Session(mock_dev_ctrl)
+        init = session.initialize(wait=False)
+        session.active(True)
+        session.play()
+
+        self.assertFalse(init.done())
+        mock_dev_ctrl.power_on.assert_not_called()
+
+        release.set()
+        self.assertIsNone(init.result(timeout=5))
+        session.pause(60)
+        self.assertTrue(self.match_internal_state(session, "ShortPause"))
+        mock_dev_ctrl.power_on.assert_called_once_with()
+
+        session.cleanup()
+
+    def test_snapshot_restore(self):
+        """
+        Test that the state is saved on cleanup and restored on initialize, without powering on again.
+
+        The pause timer is re-armed with the time it had left.
+        :return: None
+        """
+
+        import os
+        import shutil
+        import tempfile
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "state")
+
+        try:
+            with patch("threading.Timer") as mock_timer:
+                mock_timer.return_value = mock_timer
+
+                from audio_device_controller.core import AudioDeviceController
+                mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+                with audio_device_controller.core.Session(mock_dev_ctrl, snapshot_path=path) as session:
+                    session.active(True)
+                    session.pause(600)
+
+                mock_dev_ctrl.reset_mock()
+                mock_timer.reset_mock()
+
+                with audio_device_controller.core.Session(mock_dev_ctrl, snapshot_path=path) as session:
+                    self.assertTrue(self.match_internal_state(session, "ShortPause"))
+                    mock_dev_ctrl.power_on.assert_not_called()
+
+                    remaining = mock_timer.call_args[0][0]
+                    self.assertTrue(590 < remaining <= 600)
+
+                    session.play()
+                    mock_dev_ctrl.power_on.assert_not_called()
+                    self.assertTrue(self.match_internal_state(session, "Playing"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_snapshot_elapsed(self):
+        """
+        Test that the time elapsed since the snapshot was saved is discounted from the pause timer.
+
+        :return: None
+        """
+
+        import os
+        import shutil
+        import tempfile
+        from audio_device_controller.snapshot import save_snapshot, load_snapshot
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "state")
+
+        try:
+            self.assertIsNone(load_snapshot(path))
+
+            with patch("audio_device_controller.snapshot.time") as mock_time:
+                mock_time.return_value = 1000.0
+                save_snapshot(path, True, True, 60.0)
+
+                mock_time.return_value = 1045.0
+                self.assertEqual(tuple(load_snapshot(path)), (True, True, 15.0, 1000.0))
+
+                mock_time.return_value = 2000.0
+                self.assertEqual(load_snapshot(path).pause_remaining, 0.0)
+
+            save_snapshot(path, False, False, None)
+            self.assertIsNone(load_snapshot(path).pause_remaining)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_scheduled_actions(self):
+        """
+        Test that scheduled actions run on the session timers and respect the session state.
+
+        A scheduled standby doesn't interrupt playback, but ends a pause right away.
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+            with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+                session.schedule_daily((23, 0, 0), "standby")
+                session.schedule_daily((18, 0, 0), "power_on")
+                self.assertTrue(0 <= mock_timer.call_args[0][0] < 24 * 3600)
+                self.assertEqual(mock_timer.call_args[0][1], session._send_scheduled)
+                self.assertEqual(mock_timer.start.call_count, 2)
+
+                # Window starts, the session becomes active: no second power on.
+                session.submit("scheduled", (18, 0, 0), "power_on").result()
+                mock_dev_ctrl.power_on.assert_called_once_with()
+                session.active(True)
+                session.play()
+                mock_dev_ctrl.power_on.assert_called_once_with()
+
+                # Playing, the standby is skipped.
+                session.submit("scheduled", (23, 0, 0), "standby").result()
+                mock_dev_ctrl.standby.assert_not_called()
+
+                session.pause(600)
+                session.submit("scheduled", (23, 0, 0), "standby").result()
+                mock_dev_ctrl.standby.assert_called_once_with()
+                self.assertTrue(self.match_internal_state(session, "LongPause"))
+
+                # Re-armed for the next day every time.
+                self.assertEqual(mock_timer.start.call_count, 6)
+
+            self.assertEqual(session._schedules, {})
+
+            with self.assertRaises(ValueError):
+                session.schedule_daily((23, 0, 0), "reboot")
+
+    def test_power_on_window(self):
+        """
+        Test that the device is kept on within a power on window, and put on standby when it ends.
+
+        :return: None
+        """
+
+        until = {(18, 0, 0): 3600, (22, 0, 0): 4 * 3600}
+
+        with patch("threading.Timer") as mock_timer, \
+                patch("audio_device_controller.core.seconds_until", side_effect=lambda at: until[at]):
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+            with audio_device_controller.core.Session(mock_dev_ctrl) as session:
+                # Outside the window, only the timers are armed.
+                session.schedule_window((18, 0, 0), (22, 0, 0))
+                self.assertEqual(mock_timer.start.call_count, 2)
+                mock_dev_ctrl.power_on.assert_not_called()
+
+                session.submit("scheduled", (18, 0, 0), "window_start").result()
+                mock_dev_ctrl.power_on.assert_called_once_with()
+
+                # Neither the pause timer nor deactivating put the device on standby.
+                session.active(True)
+                session.play()
+                session.pause(600)
+                session._send_standby(session._pause_generation)
+                session.active(False)
+                mock_dev_ctrl.standby.assert_not_called()
+
+                session.submit("scheduled", (22, 0, 0), "window_end").result()
+                mock_dev_ctrl.standby.assert_called_once_with()
+
+                # Scheduled again within the window, the device is powered on right away.
+                until[(18, 0, 0)] = 23 * 3600
+                session.schedule_window((18, 0, 0), (22, 0, 0))
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 2)
+
+            self.assertEqual(session._schedules, {})
+
+    def test_prewarm(self):
+        """
+        Test that the device is powered on ahead of a predicted session, and put back on standby if it doesn't
+        come, while a session that comes keeps it on.
+
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController
+            from audio_device_controller.predictor import UsagePredictor
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+            predictor = Mock(spec=UsagePredictor)
+            predictor.lead = 120
+            predictor.hold = 900
+            predictor.next_start.side_effect = lambda now: now + timedelta(hours=1)
+            predictor.observe.return_value = True
+
+            with audio_device_controller.core.Session(mock_dev_ctrl, predictor=predictor) as session:
+                self.assertAlmostEqual(mock_timer.call_args[0][0], 3600 - 120, delta=1)
+                self.assertEqual(mock_timer.call_args[1]["args"], ("prewarm",))
+
+                # A play on another output is not a session of this device.
+                session.play()
+                predictor.observe.assert_not_called()
+
+                # Nobody comes: powered on, then the timer puts it on standby.
+                session.submit("prewarm").result()
+                mock_dev_ctrl.power_on.assert_called_once_with()
+                self.assertEqual(mock_timer.call_args_list[-2][0][0], 1020)
+                session._send_standby()
+                mock_dev_ctrl.standby.assert_called_once_with()
+                self.assertTrue(self.match_internal_state(session, "Inactive"))
+
+                # The session comes: no second power on, and the pre-warm timer is cancelled.
+                session.submit("prewarm").result()
+                session.active(True)
+                session.play()
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 2)
+                self.assertTrue(self.match_internal_state(session, "Playing"))
+                predictor.observe.assert_called_once()
+
+            self.assertIsNone(session._prewarm_timer)
+
+    def test_verified_power(self):
+        """
+        Test that power transitions are verified, sent again within the retry budget, and that standby is not
+        sent to a device already in standby.
+
+        :return: None
+        """
+
+        with patch("threading.Timer") as mock_timer:
+            mock_timer.return_value = mock_timer
+
+            from audio_device_controller.core import AudioDeviceController, POWER_ON, POWER_STANDBY
+            from audio_device_controller.verify import PowerVerifier
+            mock_dev_ctrl = Mock(spec=AudioDeviceController)
+            mock_dev_ctrl.power_status.return_value = POWER_STANDBY
+            verifier = PowerVerifier(delay=2.0, retries=1, window=600.0, attempts=5, clock=lambda: 0.0)
+
+            def verify():
+                self.assertEqual(mock_timer.call_args[0][1], session.submit)
+                session.submit(*mock_timer.call_args[1]["args"]).result()
+
+            with audio_device_controller.core.Session(mock_dev_ctrl, verifier=verifier) as session:
+                session.active(True)
+                self.assertEqual(mock_timer.call_args[0][0], 2.0)
+
+                # Still in standby: sent again, and verified later.
+                verify()
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 2)
+                self.assertEqual(mock_timer.call_args[0][0], 4.0)
+
+                # Still in standby, no budget left: the session takes the device as off.
+                verify()
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 2)
+                self.assertTrue(self.match_internal_state(session, "LongPause"))
+                adopted = session.transitions()[-1]
+                self.assertEqual((adopted.source, adopted.event, adopted.target, adopted.actions),
+                                 ("active|dev_on", "device_off", "active", []))
+
+                # The next play powers on again, this time it works.
+                session.play()
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 3)
+                mock_dev_ctrl.power_status.return_value = POWER_ON
+                verify()
+                self.assertEqual(mock_dev_ctrl.power_on.call_count, 3)
+
+                # Once verified, no other verification is armed.
+                starts = mock_timer.start.call_count
+                verify()
+                self.assertEqual(mock_timer.start.call_count, starts)
+
+                # Standby is not sent to a device already in standby.
+                mock_dev_ctrl.power_status.return_value = POWER_STANDBY
+                session.active(False)
+                mock_dev_ctrl.standby.assert_not_called()
+                self.assertTrue(self.match_internal_state(session, "Inactive"))
+
 
 class DeviceControllerCecTest(unittest.TestCase):
     """
@@ -402,6 +808,71 @@ class DeviceControllerCecTest(unittest.TestCase):
 
         self.controller.cleanup()
 
+    def test_power_status(self):
+        """
+        Test that the power status reported by libcec is mapped, transitions counting as their target.
+
+        :return: None
+        """
+
+        import cec
+        from audio_device_controller.core import POWER_ON, POWER_STANDBY
+
+        for status, expected in [(cec.CEC_POWER_STATUS_ON, POWER_ON),
+                                 (cec.CEC_POWER_STATUS_IN_TRANSITION_STANDBY_TO_ON, POWER_ON),
+                                 (cec.CEC_POWER_STATUS_STANDBY, POWER_STANDBY),
+                                 (cec.CEC_POWER_STATUS_IN_TRANSITION_ON_TO_STANDBY, POWER_STANDBY),
+                                 (cec.CEC_POWER_STATUS_UNKNOWN, None)]:
+            self.mock_lib.GetDevicePowerStatus.return_value = status
+            self.assertEqual(self.controller.power_status(), expected)
+
+        self.mock_lib.GetDevicePowerStatus.assert_called_with(cec.CECDEVICE_AUDIOSYSTEM)
+
+    def test_send(self):
+        """
+        Test that commands sent in the background resolve with their acknowledgement, in order.
+
+        :return: None
+        """
+
+        self.mock_lib.AudioEnable.return_value = True
+        self.mock_lib.StandbyDevices.return_value = False
+
+        power_on = self.controller.send("power_on")
+        standby = self.controller.send("standby", timeout=5)
+
+        result = power_on.result(timeout=5)
+        self.assertEqual(result.command, "power_on")
+        self.assertTrue(result.acked)
+        self.assertFalse(standby.result(timeout=5).acked)
+        self.assertGreaterEqual(standby.result().elapsed, result.elapsed)
+
+        with self.assertRaises(ValueError):
+            self.controller.send("reboot")
+
+    def test_send_timeout(self):
+        """
+        Test that a command that takes too long fails its future, and a failing command fails it too.
+
+        :return: None
+        """
+
+        from threading import Event
+        from audio_device_controller.core import CecError
+
+        release = Event()
+        self.mock_lib.AudioEnable.side_effect = lambda enable: release.wait(5)
+        self.mock_lib.StandbyDevices.side_effect = CecError("cec-client is unresponsive")
+
+        power_on = self.controller.send("power_on", timeout=0.05)
+        with self.assertRaises(CecError) as context:
+            power_on.result(timeout=5)
+        self.assertTrue("timed out" in context.exception.message)
+
+        release.set()
+        with self.assertRaises(CecError):
+            self.controller.send("standby").result(timeout=5)
+
     def test_power_on(self):
         """
         Test single command power_on.
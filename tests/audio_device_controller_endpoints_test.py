@@ -0,0 +1,78 @@
+import unittest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class EndpointPoolTest(unittest.TestCase):
+    """
+    Unit tests for the EndpointPool class in audio_device_controller.endpoints.
+    """
+
+    def setUp(self):
+        from audio_device_controller.endpoints import EndpointPool
+
+        self.clock = FakeClock()
+        self.pool = EndpointPool(["primary", "replica"], probe_interval=30.0, clock=self.clock)
+
+    def test_preferred_first(self):
+        """
+        Test that the first endpoint is used until the others are measured, and the others are probed.
+
+        :return: None
+        """
+
+        from audio_device_controller.endpoints import EndpointPool
+
+        self.assertEqual(self.pool.choose(), "primary")
+        self.pool.record("primary", 0.1, True)
+        self.assertEqual(self.pool.choose(), "primary")
+        self.assertEqual(self.pool.ranked(), ["primary", "replica"])
+        self.assertEqual(self.pool.due_probe(), "replica")
+
+        self.pool.record("replica", 0.1, True)
+        self.assertIsNone(self.pool.due_probe())
+        self.clock.now = 30.0
+        self.assertEqual(self.pool.due_probe(), "replica")
+
+        with self.assertRaises(ValueError):
+            EndpointPool([])
+
+    def test_failover(self):
+        """
+        Test that polls move to another endpoint when the current one fails or slows down, and only when it's
+        clearly better.
+
+        :return: None
+        """
+
+        self.pool.record("primary", 0.1, True)
+        self.pool.record("replica", 0.2, True)
+        self.assertEqual(self.pool.choose(), "primary")
+
+        # Errors raise the score of the primary over the replica.
+        self.pool.record("primary", 5.0, False)
+        self.assertEqual(self.pool.choose(), "replica")
+        self.assertIsNone(self.pool.due_probe())
+        self.clock.now = 30.0
+        self.assertEqual(self.pool.due_probe(), "primary")
+        self.assertEqual(self.pool.ranked(), ["replica", "primary"])
+
+        # The primary recovers, but the replica is kept while they're similar.
+        for _ in range(20):
+            self.pool.record("primary", 0.15, True)
+        self.assertEqual(self.pool.choose(), "replica")
+
+        # The replica slows down.
+        for _ in range(10):
+            self.pool.record("replica", 1.0, True)
+        self.assertEqual(self.pool.choose(), "primary")
+
+        stats = self.pool.stats()
+        self.assertAlmostEqual(stats["primary"]["latency"], 0.15, 2)
+        self.assertLess(stats["primary"]["error_rate"], 0.02)
@@ -14,20 +14,30 @@ class EventHandlerTest(unittest.TestCase):
         :return: None
         """
         import audio_device_controller
+        from audio_device_controller.paths import compile_path, compile_list_path
 
         self.mock_session                         = Mock(spec=audio_device_controller.core.Session)
         self.mock_config                          = Mock(spec=audio_device_controller.events.ConfigOptions)
         self.mock_config.rest_url                 = "http://localhost:4444/test"
+        self.mock_config.rest_urls                = [self.mock_config.rest_url]
         self.mock_config.rest_success_code        = 200
         self.mock_config.rest_not_found_code      = 404
         self.mock_config.events                   = "Events"
         self.mock_config.pb_notif                 = "Notification"
+        self.mock_config.events_accessor          = compile_list_path("Events")
+        self.mock_config.pb_notif_accessor        = compile_path("Notification")
         self.mock_config.pb_notif_stop            = 0
         self.mock_config.pb_notif_play            = 1
         self.mock_config.pb_notif_pause           = 2
         self.mock_config.pb_notif_active_device   = 3
         self.mock_config.pb_notif_inactive_device = 4
         self.mock_config.power_off_delay_mins     = 10
+        self.mock_config.cursor_param             = ""
+        self.mock_config.cursor_field             = ""
+        self.mock_config.timestamp_accessor       = None
+        self.mock_config.slo                      = {}
+        self.mock_config.event_id_accessor        = None
+        self.mock_config.event_order_accessor     = None
 
         self.ev_handler = audio_device_controller.events.EventHandler(self.mock_session, self.mock_config)
         self.mock_session.active(True)
@@ -155,6 +165,94 @@ class EventHandlerTest(unittest.TestCase):
         self.assertTrue(self.mock_session.pause.call_count is 0)
         self.assertTrue(self.mock_session.active.call_count is 0)
 
+    def test_nested_events(self):
+        """
+        Tests that events and notification types are found through the configured paths.
+
+        :return: None
+        """
+
+        from audio_device_controller.paths import compile_path, compile_list_path
+
+        self.mock_config.events            = "data.items"
+        self.mock_config.events_accessor   = compile_list_path("data.items")
+        self.mock_config.pb_notif_accessor = compile_path("playback.state")
+
+        json = {"data": {"items": [{"playback": {"state": self.mock_config.pb_notif_play}},
+                                   {"playback": {}},
+                                   {"playback": {"state": self.mock_config.pb_notif_pause}}]}}
+        self.ev_handler.process_json_response(json)
+        self.mock_session.play.assert_called_once_with()
+        self.mock_session.pause.assert_called_once_with(600)
+
+        import audio_device_controller.events
+        with self.assertRaises(audio_device_controller.events.EventError) as context:
+            self.ev_handler.process_json_response({"data": {}})
+        self.assertTrue("block data.items not found" in str(context.exception))
+
+    def test_repeated_events(self):
+        """
+        Tests that events already processed, by id, and events older than the last one processed, by sequence,
+        are skipped.
+
+        :return: None
+        """
+
+        from audio_device_controller.paths import compile_path
+
+        self.mock_config.event_id_accessor    = compile_path("Id")
+        self.mock_config.event_order_accessor = compile_path("Seq")
+        self.mock_config.dedup_size           = 2
+
+        play = self.mock_config.pb_notif_play
+        self.ev_handler.process_json_response({"Events": [{"Id": "a", "Seq": 1, "Notification": play},
+                                                          {"Id": "b", "Seq": 2, "Notification": play}]})
+        self.assertEqual(self.mock_session.play.call_count, 2)
+
+        # The same response again, and an event that arrives late.
+        self.ev_handler.process_json_response({"Events": [{"Id": "a", "Seq": 1, "Notification": play},
+                                                          {"Id": "b", "Seq": 2, "Notification": play},
+                                                          {"Id": "c", "Seq": 0, "Notification": play}]})
+        self.assertEqual(self.mock_session.play.call_count, 2)
+
+        # Only the last ids are remembered, and events without the fields are never skipped.
+        self.ev_handler.process_json_response({"Events": [{"Id": "d", "Seq": 3, "Notification": play},
+                                                          {"Id": "e", "Seq": 3, "Notification": play},
+                                                          {"Id": "a", "Seq": 4, "Notification": play},
+                                                          {"Notification": play},
+                                                          {"Notification": play}]})
+        self.assertEqual(self.mock_session.play.call_count, 7)
+
+    def test_traced_events(self):
+        """
+        Test that every playback event gets a trace through the session, started at its server timestamp.
+
+        :return: None
+        """
+
+        import audio_device_controller.events
+        from audio_device_controller import tracing
+        from audio_device_controller.core import AudioDeviceController, Session
+        from audio_device_controller.paths import compile_path
+
+        self.mock_config.timestamp_accessor = compile_path("Sent")
+        tracer = tracing.Tracer({"total": 0.0})
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+        with Session(mock_dev_ctrl) as session:
+            ev_handler = audio_device_controller.events.EventHandler(session, self.mock_config, tracer=tracer)
+            with self.assertLogs("audio_device_controller.tracing", "WARNING"):
+                ev_handler.process_json_response({"Events": [{"Notification": 3, "Sent": 1.0},
+                                                             {"Notification": 9}]}, 2.0)
+
+        summary = tracer.summary()
+        self.assertEqual(summary["ack"]["count"], 1)
+        self.assertEqual(summary["receive"]["count"], 1)
+        self.assertEqual(summary["receive"]["max"], 1.0)
+        self.assertEqual(summary["dispatch"]["count"], 2)
+        self.assertEqual(summary["total"]["slo_violations"], 2)
+        self.assertIsNone(tracing.current())
+
     def test_listen_for_events_200(self):
         """
         Tests the event listening functionality in the handler in case of healthy response.
@@ -216,6 +314,95 @@ class EventHandlerTest(unittest.TestCase):
                 self.assertTrue(self.mock_session.play.call_count is 0)
                 self.assertTrue(self.mock_session.active.call_count is 0)
 
+    def test_listen_for_events_failover(self):
+        """
+        Test that a poll fails over to the next endpoint when one times out or responds with an error, and that
+        the validators of an endpoint are not sent to another one.
+
+        :return: None
+        """
+
+        import audio_device_controller.events
+        from audio_device_controller.endpoints import EndpointPool
+        from requests.exceptions import Timeout
+
+        self.mock_config.rest_urls = ["http://primary/ev", "http://replica/ev"]
+        self.ev_handler = audio_device_controller.events.EventHandler(
+            self.mock_session, self.mock_config, endpoints=EndpointPool(self.mock_config.rest_urls,
+                                                                        probe_interval=0.0))
+
+        ok = Mock()
+        ok.status_code = 200
+        ok.headers = {"ETag": "\"r1\""}
+        ok.json.return_value = {"Events": [{"Notification": self.mock_config.pb_notif_play}]}
+        error = Mock()
+        error.status_code = 503
+
+        with patch("requests.get") as get_mock:
+            get_mock.side_effect = [Timeout(), ok]
+            with patch.object(self.ev_handler, "_probe"):
+                with self.assertLogs("audio_device_controller.events", "WARNING"):
+                    self.ev_handler.listen_for_events(5)
+
+            self.assertEqual([args[0] for args, _ in get_mock.call_args_list],
+                             ["http://primary/ev", "http://replica/ev"])
+            self.mock_session.play.assert_called_once_with()
+
+            # The replica keeps being polled with its validators, and when it fails the primary has none.
+            get_mock.reset_mock()
+            get_mock.side_effect = [error, error]
+            with patch.object(self.ev_handler, "_probe"):
+                with self.assertRaises(audio_device_controller.events.EventError) as context:
+                    self.ev_handler.listen_for_events(5)
+
+            self.assertTrue("status code: 503" in context.exception.message)
+            (replica_url,), replica_kwargs = get_mock.call_args_list[0]
+            (primary_url,), primary_kwargs = get_mock.call_args_list[1]
+            self.assertEqual((replica_url, primary_url), ("http://replica/ev", "http://primary/ev"))
+            self.assertEqual(replica_kwargs["headers"]["If-None-Match"], "\"r1\"")
+            self.assertFalse("If-None-Match" in primary_kwargs["headers"])
+
+            # Endpoints not polled are probed in the background.
+            get_mock.reset_mock()
+            get_mock.side_effect = None
+            get_mock.return_value = ok
+            self.ev_handler.listen_for_events(5)
+            self.ev_handler._prober.join(5)
+            self.assertEqual(get_mock.call_count, 2)
+            self.assertEqual(get_mock.call_args_list[1][1]["timeout"], 5.0)
+
+    def test_enter_initialize_failed(self):
+        """
+        Test that the session is initialized without waiting, and that its failure is raised by the next listen.
+
+        :return: None
+        """
+
+        from concurrent.futures import Future
+        from audio_device_controller.core import CecError
+
+        self.mock_config.schedule = []
+        self.mock_config.power_on_windows = []
+        init = Future()
+        self.mock_session.initialize.return_value = init
+
+        with patch("requests.Session") as mock_http:
+            mock_http.return_value.get.return_value.status_code = 304
+
+            with self.ev_handler as handler:
+                self.mock_session.initialize.assert_called_once_with(wait=False)
+                self.mock_config.read_from_file.assert_called_once_with()
+
+                handler.listen_for_events(-1)
+                mock_http.return_value.get.assert_called_once()
+
+                init.set_exception(CecError("No adapters found"))
+                with self.assertRaises(CecError):
+                    handler.listen_for_events(-1)
+                handler.listen_for_events(-1)
+
+            mock_http.return_value.close.assert_called_once_with()
+
     def test_listen_for_events_400(self):
         """
         Tests that the event listener works as intended in case there's a problem reaching the endpoint.
@@ -230,6 +417,115 @@ class EventHandlerTest(unittest.TestCase):
                 self.ev_handler.listen_for_events(-1)
             self.assertTrue("responded with status code" in str(context.exception))
 
+    def test_listen_for_events_conditional(self):
+        """
+        Tests that requests are conditional on the last response, and that 304 means no events.
+
+        :return: None
+        """
+
+        with patch("requests.get") as get_mock:
+            get_mock.return_value.status_code = self.mock_config.rest_success_code
+            get_mock.return_value.headers = {"ETag": "\"v1\"", "Last-Modified": "Wed, 21 Oct 2026 07:28:00 GMT"}
+            get_mock.return_value.json.return_value = {
+                self.mock_config.events: [{self.mock_config.pb_notif: self.mock_config.pb_notif_play}]}
+
+            self.ev_handler.listen_for_events(-1)
+            self.assertFalse("If-None-Match" in get_mock.call_args[1]["headers"])
+            self.assertFalse("If-Modified-Since" in get_mock.call_args[1]["headers"])
+            self.mock_session.play.assert_called_once_with()
+
+            get_mock.return_value.status_code = 304
+            self.ev_handler.listen_for_events(-1)
+            self.assertEqual(get_mock.call_args[1]["headers"]["If-None-Match"], "\"v1\"")
+            self.assertEqual(get_mock.call_args[1]["headers"]["If-Modified-Since"], "Wed, 21 Oct 2026 07:28:00 GMT")
+            self.mock_session.play.assert_called_once_with()
+            self.assertEqual(get_mock.return_value.json.call_count, 1)
+
+    def test_listen_for_events_cursor(self):
+        """
+        Tests that the cursor is advanced to the last event of each batch processed.
+
+        :return: None
+        """
+
+        self.mock_config.cursor_param = "since"
+        self.mock_config.cursor_field = "id"
+
+        with patch("requests.get") as get_mock:
+            get_mock.return_value.status_code = self.mock_config.rest_success_code
+            get_mock.return_value.headers = {}
+            get_mock.return_value.json.return_value = {
+                self.mock_config.events: [{"id": 7, self.mock_config.pb_notif: self.mock_config.pb_notif_play},
+                                          {"id": 8, self.mock_config.pb_notif: self.mock_config.pb_notif_pause}]}
+
+            self.ev_handler.listen_for_events(5)
+            self.assertFalse("params" in get_mock.call_args[1])
+            self.assertEqual(get_mock.call_args[1]["timeout"], 5)
+
+            get_mock.return_value.json.return_value = {self.mock_config.events: []}
+            self.ev_handler.listen_for_events(5)
+            self.assertEqual(get_mock.call_args[1]["params"], {"since": 8})
+
+            self.ev_handler.listen_for_events(5)
+            self.assertEqual(get_mock.call_args[1]["params"], {"since": 8})
+
+    def test_listen_for_events_binary(self):
+        """
+        Tests that MessagePack and CBOR responses are decoded according to their Content-Type.
+
+        :return: None
+        """
+
+        from importlib.util import find_spec
+        if find_spec("msgpack") is None or find_spec("cbor2") is None:
+            self.skipTest("msgpack or cbor2 not installed")
+
+        import cbor2
+        import msgpack
+
+        payload = {self.mock_config.events: [{self.mock_config.pb_notif: self.mock_config.pb_notif_play}]}
+
+        with patch("requests.get") as get_mock:
+            get_mock.return_value.status_code = self.mock_config.rest_success_code
+
+            get_mock.return_value.headers = {"Content-Type": "application/msgpack"}
+            get_mock.return_value.content = msgpack.packb(payload)
+            self.ev_handler.listen_for_events(-1)
+            self.assertTrue("application/msgpack" in get_mock.call_args[1]["headers"]["Accept"])
+
+            get_mock.return_value.headers = {"Content-Type": "application/cbor; charset=binary"}
+            get_mock.return_value.content = cbor2.dumps(payload)
+            self.ev_handler.listen_for_events(-1)
+
+            self.assertEqual(self.mock_session.play.call_count, 2)
+            get_mock.return_value.json.assert_not_called()
+
+    def test_listen_for_events_binary_malformed(self):
+        """
+        Tests the errors when a binary response can't be decoded.
+
+        :return: None
+        """
+
+        import audio_device_controller.events
+
+        with patch("requests.get") as get_mock, patch("audio_device_controller.events.DECODERS",
+                                                      {"application/cbor": (Mock(side_effect=ImportError), "cbor2"),
+                                                       "application/msgpack": (Mock(side_effect=ValueError("x")),
+                                                                               "msgpack")}):
+            get_mock.return_value.status_code = self.mock_config.rest_success_code
+
+            get_mock.return_value.headers = {"Content-Type": "application/cbor"}
+            with self.assertRaises(audio_device_controller.events.EventError) as context:
+                self.ev_handler.listen_for_events(-1)
+            self.assertTrue("cbor2 is not installed" in str(context.exception))
+
+            get_mock.return_value.headers = {"Content-Type": "application/msgpack"}
+            with self.assertRaises(audio_device_controller.events.EventError) as context:
+                self.ev_handler.listen_for_events(-1)
+            self.assertTrue("Response malformed" in str(context.exception))
+
 
 class ConfigOptionsTest(unittest.TestCase):
     """
@@ -258,14 +554,20 @@ class ConfigOptionsTest(unittest.TestCase):
             mock_parser.return_value.has_option.side_effect = ["EventServer", "MediaFormat", "MediaFormat",
                                                                "MediaFormat", "MediaFormat", "MediaFormat",
                                                                "MediaFormat", "MediaFormat", "DeviceControl"]
-            mock_parser.return_value.get.side_effect = ["http://localhost:5555/ev", "Events", "Notification"]
-            mock_parser.return_value.getint.side_effect = [0, 1, 2, 3, 4, 10]
+            mock_parser.return_value.get.side_effect = ["http://localhost:5555/ev",
+                                                        "http://replica:5555/ev?fields=a,b", "since", "id",
+                                                        "Events", "Notification", "23:00", "18:00-22:00",
+                                                        "Sent", "total=500, ack=250", "Id", "Seq"]
+            mock_parser.return_value.getint.side_effect = [0, 1, 2, 3, 4, 10, 256]
 
             self.config_options.read_from_file()
             self.assertTrue(mock_parser.return_value.read.call_count is 1)
 
             # Parser has been queried about the right things.
             calls = [call("EventServer", "rest_url", fallback=""),
+                     call("EventServer", "rest_url_fallback", fallback=""),
+                     call("EventServer", "cursor_param", fallback=""),
+                     call("EventServer", "cursor_field", fallback=""),
                      call("MediaFormat", "events", fallback=""),
                      call("MediaFormat", "pb_notif", fallback="")]
             mock_parser.return_value.get.assert_has_calls(calls)
@@ -280,7 +582,11 @@ class ConfigOptionsTest(unittest.TestCase):
 
             # Stored values match the provided data.
             self.assertTrue(self.config_options.rest_url is "http://localhost:5555/ev")
+            self.assertEqual(self.config_options.rest_urls, ["http://localhost:5555/ev",
+                                                             "http://replica:5555/ev?fields=a,b"])
             self.assertTrue(self.config_options.rest_success_code is 200)
+            self.assertEqual(self.config_options.cursor_param, "since")
+            self.assertEqual(self.config_options.cursor_field, "id")
             self.assertTrue(self.config_options.events is "Events")
             self.assertTrue(self.config_options.pb_notif is "Notification")
             self.assertTrue(self.config_options.pb_notif_stop is 0)
@@ -289,6 +595,46 @@ class ConfigOptionsTest(unittest.TestCase):
             self.assertTrue(self.config_options.pb_notif_active_device is 3)
             self.assertTrue(self.config_options.pb_notif_inactive_device is 4)
             self.assertTrue(self.config_options.power_off_delay_mins is 10)
+            self.assertEqual(self.config_options.events_accessor({"Events": [{"Notification": 1}]}),
+                             [{"Notification": 1}])
+            self.assertEqual(self.config_options.pb_notif_accessor({"Notification": 1}), 1)
+            self.assertEqual(self.config_options.schedule, [((23, 0, 0), "standby")])
+            self.assertEqual(self.config_options.power_on_windows, [((18, 0, 0), (22, 0, 0))])
+            self.assertEqual(self.config_options.timestamp_accessor({"Sent": 12.5}), 12.5)
+            self.assertEqual(self.config_options.slo, {"total": 0.5, "ack": 0.25})
+            self.assertEqual(self.config_options.event_id_accessor({"Id": "a"}), "a")
+            self.assertEqual(self.config_options.event_order_accessor({"Seq": 7}), 7)
+            self.assertEqual(self.config_options.dedup_size, 256)
+
+    def test_read_urls(self):
+        """
+        Test that rest_url_fallback holds a list of URLs separated by whitespace, and commas are kept.
+
+        :return: None
+        """
+
+        from audio_device_controller.events import ConfigOptions
+
+        self.assertEqual(ConfigOptions._read_urls(""), [])
+        self.assertEqual(ConfigOptions._read_urls("\nhttp://a/ev?f=x,y\n  http://b/ev "),
+                         ["http://a/ev?f=x,y", "http://b/ev"])
+
+    def test_invalid_schedule(self):
+        """
+        Test that invalid scheduled actions are rejected.
+
+        :return: None
+        """
+
+        from audio_device_controller.events import ConfigOptions
+
+        self.assertEqual(ConfigOptions._read_schedule(""), [])
+        self.assertEqual(ConfigOptions._read_windows(""), [])
+        with self.assertRaises(ValueError):
+            ConfigOptions._read_schedule("23")
+        for window in ["18:00", "18:00-24:00"]:
+            with self.assertRaises(ValueError):
+                ConfigOptions._read_windows(window)
 
     def test_file_not_found(self):
         """
@@ -0,0 +1,97 @@
+import threading
+import unittest
+from unittest.mock import Mock
+
+
+class HookRegistryTest(unittest.TestCase):
+    """
+    Unit tests for the HookRegistry class in audio_device_controller.hooks.
+    """
+
+    def setUp(self):
+        from audio_device_controller.hooks import HookRegistry
+
+        self.hooks = HookRegistry(workers=2, timeout=0.05, backlog=2)
+        self.addCleanup(self.hooks.shutdown)
+
+    def test_session_transitions(self):
+        """
+        Test that the hooks are called before and after the transitions of a session, filtered by event.
+
+        :return: None
+        """
+
+        from audio_device_controller.core import AudioDeviceController, Session
+        from audio_device_controller.hooks import HOOK_BEFORE, HOOK_AFTER
+
+        calls = []
+        self.hooks.register(HOOK_BEFORE, lambda transition: calls.append(("before", transition)), name="all")
+        self.hooks.register(HOOK_AFTER, lambda transition: calls.append(("after", transition.event)),
+                            event="play", name="play")
+
+        with Session(Mock(spec=AudioDeviceController), hooks=self.hooks) as session:
+            session.active(True)
+            session.play()
+        self.hooks.shutdown()
+
+        before = [transition for when, transition in calls if when == "before"]
+        self.assertEqual([(transition.event, transition.source, transition.target, transition.actions)
+                          for transition in before],
+                         [("activate", "inactive", "active|dev_on", ["power_on"]),
+                          ("play", "active|dev_on", "active|dev_on", [])])
+        self.assertEqual([event for when, event in calls if when == "after"], ["play"])
+        self.assertEqual(self.hooks.stats()["play"]["calls"], 1)
+
+        with self.assertRaises(ValueError):
+            self.hooks.register("during", print)
+
+    def test_isolation(self):
+        """
+        Test that a failing hook is logged, and a hung one is reported, holds one thread and skips the calls
+        over its backlog, without delaying the caller or the other hooks.
+
+        :return: None
+        """
+
+        from audio_device_controller.hooks import HOOK_AFTER
+        from audio_device_controller.transitions import Transition
+
+        started = threading.Event()
+        release = threading.Event()
+        done = threading.Event()
+
+        def hung(transition):
+            started.set()
+            release.wait(5)
+
+        def failing(transition):
+            raise RuntimeError("lights off")
+
+        self.hooks.register(HOOK_AFTER, hung)
+        self.hooks.register(HOOK_AFTER, failing)
+        counted = self.hooks.register(HOOK_AFTER, lambda transition: done.set(), name="counted")
+
+        transition = Transition(0.0, "inactive", "activate", "active|dev_on", ["power_on"])
+        with self.assertLogs("audio_device_controller.hooks", "WARNING") as logs:
+            self.hooks.run(HOOK_AFTER, transition)
+            self.assertTrue(started.wait(5))
+            for _ in range(3):
+                self.hooks.run(HOOK_AFTER, transition)
+            self.assertTrue(done.wait(5))
+
+            # The hung hook has one call running and two queued, the last one is skipped.
+            threading.Event().wait(0.1)
+            stats = self.hooks.stats()
+
+        self.assertEqual(stats["hung"], {"calls": 1, "failures": 0, "timeouts": 1, "skipped": 1})
+        self.assertGreaterEqual(stats["failing"]["failures"], 1)
+        self.assertTrue(any("Hook failing failed" in line for line in logs.output))
+
+        self.hooks.unregister(counted)
+        self.assertEqual(set(self.hooks.stats()), {"hung", "failing"})
+
+        release.set()
+        self.hooks.shutdown()
+        self.assertEqual(self.hooks.stats()["hung"]["calls"], 3)
+        failing_stats = self.hooks.stats()["failing"]
+        self.assertEqual(failing_stats["failures"] + failing_stats["skipped"], 4)
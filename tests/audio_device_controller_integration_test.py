@@ -67,7 +67,7 @@ class SystemTestCore(unittest.TestCase):
 
         from audio_device_controller.events import ConfigOptions
 
-        with patch("requests.get") as get_mock:
+        with patch("requests.Session.get") as get_mock:
             config = ConfigOptions()
             config.read_from_file()
 
@@ -87,3 +87,28 @@ class SystemTestCore(unittest.TestCase):
         
             mock_lib.AudioEnable.assert_called_once_with(True)
             mock_lib.StandbyDevices.assert_called_once_with()
+
+    @patch("cec.libcec_configuration")
+    @patch("cec.ICECAdapter")
+    def test_batch(self, mock_adapter, mock_config):
+
+        mock_config.return_value = mock_config
+        mock_lib = Mock()
+        mock_adapter.Create.return_value = mock_lib
+        mock_lib.DetectAdapters.return_value = [Mock()]
+        mock_lib.DetectAdapters.return_value[0].strComName = "adapter"
+        mock_lib.Open.return_value = True
+        mock_lib.GetDeviceOSDName.return_value = "Audio System"
+        mock_lib.PollDevice.return_value = True
+
+        import io
+        from audio_device_controller import audiodevcontroller
+
+        with patch("sys.stdin", io.StringIO("power_on; wait 10ms; standby")):
+            sys.argv[1:] = ["-batch", "-", "--debug"]
+            audiodevcontroller.entry()
+
+        # A single adapter session for all the commands.
+        mock_adapter.Create.assert_called_once_with(mock_config)
+        mock_lib.AudioEnable.assert_called_once_with(True)
+        mock_lib.StandbyDevices.assert_called_once_with()
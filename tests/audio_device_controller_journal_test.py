@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+
+class JournalTest(unittest.TestCase):
+    """
+    Unit tests for the Journal class in audio_device_controller.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory for the journal files.
+
+        :return: None
+        """
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "journal.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_and_read(self):
+        """
+        Test that records are read back in order, with their kind, code and argument.
+
+        :return: None
+        """
+
+        from audio_device_controller.journal import Journal, KIND_EVENT, KIND_COMMAND, CMD_POWER_ON
+
+        with Journal(self.path, 8) as journal:
+            journal.event(3)
+            journal.command(CMD_POWER_ON)
+            journal.event("unknown")
+
+            # Readable while still in use.
+            records = Journal.read(self.path)
+
+        self.assertEqual([record.seq for record in records], [1, 2, 3])
+        self.assertEqual([(record.kind, record.code, record.arg) for record in records],
+                         [(KIND_EVENT, 0, 3), (KIND_COMMAND, CMD_POWER_ON, 0), (KIND_EVENT, 0, -1)])
+        self.assertTrue(records[0].time <= records[1].time <= records[2].time)
+
+    def test_circular(self):
+        """
+        Test that the journal keeps only the last records, and resumes after them when reopened.
+
+        :return: None
+        """
+
+        from audio_device_controller.journal import Journal
+
+        with Journal(self.path, 4) as journal:
+            for i in range(10):
+                journal.event(i)
+
+        with Journal(self.path, 4) as journal:
+            journal.event(10)
+
+        records = Journal.read(self.path)
+        self.assertEqual([record.arg for record in records], [7, 8, 9, 10])
+        self.assertEqual(os.path.getsize(self.path), 64 + 4 * 24)
+
+    def test_not_a_journal(self):
+        """
+        Test reading a file that is not a journal.
+
+        :return: None
+        """
+
+        from audio_device_controller.journal import Journal
+
+        with open(self.path, "wb") as not_journal:
+            not_journal.write(b"0123456789" * 10)
+
+        with self.assertRaises(ValueError):
+            Journal.read(self.path)
+
+    def test_session_and_handler(self):
+        """
+        Test that events received by the handler and commands sent by the session are journaled.
+
+        :return: None
+        """
+
+        import audio_device_controller.core
+        import audio_device_controller.events
+        from audio_device_controller.paths import compile_path, compile_list_path
+        from audio_device_controller.core import AudioDeviceController
+        from audio_device_controller.journal import (Journal, KIND_EVENT, KIND_COMMAND, CMD_INITIALIZE,
+                                                     CMD_POWER_ON)
+
+        mock_config = Mock(spec=audio_device_controller.events.ConfigOptions)
+        mock_config.events = "Events"
+        mock_config.pb_notif = "Notification"
+        mock_config.events_accessor = compile_list_path("Events")
+        mock_config.pb_notif_accessor = compile_path("Notification")
+        mock_config.pb_notif_active_device = 3
+        mock_config.event_id_accessor = None
+        mock_config.event_order_accessor = None
+
+        with Journal(self.path, 16) as journal:
+            session = audio_device_controller.core.Session(Mock(spec=AudioDeviceController), journal=journal)
+            ev_handler = audio_device_controller.events.EventHandler(session, mock_config, journal)
+
+            session.initialize()
+            ev_handler.process_json_response({"Events": [{"Notification": 3}]})
+            session.submit("play").result()
+
+        records = Journal.read(self.path)
+        self.assertEqual([(record.kind, record.code, record.arg) for record in records],
+                         [(KIND_COMMAND, CMD_INITIALIZE, 0), (KIND_EVENT, 0, 3), (KIND_COMMAND, CMD_POWER_ON, 0)])
@@ -0,0 +1,133 @@
+import unittest
+
+
+class FakeCecDevice:
+    """
+    Fake /dev/cecN answering the ioctls of the Linux CEC API, with an audio system at logical address 5.
+    """
+
+    def __init__(self, audio_present=True):
+        self.audio_present = audio_present
+        self.power_status = 1
+        self.sent = []
+        self.closed = False
+
+    def open(self, path):
+        return 42
+
+    def close(self, fd):
+        self.closed = True
+
+    def ioctl(self, fd, request, buffer):
+        from audio_device_controller import linux_cec as lc
+
+        if request == lc.CEC_ADAP_G_CAPS:
+            buffer[:] = lc._CAPS.pack(b"vivid", b"vivid-000-vid-cap0", 1, 0x7f, 0)
+        elif request == lc.CEC_ADAP_G_LOG_ADDRS:
+            buffer[:] = lc._LOG_ADDRS.pack(b"\xff" * 4, 0, 0, 0, 0, 0, b"", b"", b"", b"", b"")
+        elif request == lc.CEC_ADAP_S_LOG_ADDRS:
+            # The first logical address of the requested type: tv, record, tuner, playback, audio system.
+            fields = list(lc._LOG_ADDRS.unpack(bytes(buffer)))
+            fields[0] = bytes([(0, 1, 3, 4, 5)[fields[8][0]]]) + b"\xff\xff\xff"
+            buffer[:] = lc._LOG_ADDRS.pack(*fields)
+        elif request == lc.CEC_ADAP_G_PHYS_ADDR:
+            buffer[:] = lc._U16.pack(0x1000)
+        elif request == lc.CEC_S_MODE:
+            pass
+        elif request == lc.CEC_TRANSMIT:
+            fields = list(lc._MSG.unpack(bytes(buffer)))
+            message = fields[6][:fields[2]]
+            self.sent.append(message)
+
+            acked = (message[0] & 0xf) == lc.ADDR_BROADCAST or self.audio_present
+            fields[9] = lc.CEC_TX_STATUS_OK if acked else 0x20
+            if fields[7] == lc.OP_SET_OSD_NAME and acked:
+                reply = bytes([0x54, lc.OP_SET_OSD_NAME]) + b"Audio System"
+                fields[2], fields[6], fields[8] = len(reply), reply, lc.CEC_RX_STATUS_OK
+            elif fields[7] == lc.OP_REPORT_POWER_STATUS and acked:
+                reply = bytes([0x54, lc.OP_REPORT_POWER_STATUS, self.power_status])
+                fields[2], fields[6], fields[8] = len(reply), reply, lc.CEC_RX_STATUS_OK
+            buffer[:] = lc._MSG.pack(*fields)
+        else:
+            raise OSError(25, "Inappropriate ioctl for device")
+
+
+class AudioDeviceControllerLinuxCecTest(unittest.TestCase):
+    """
+    Unit tests for the AudioDeviceControllerLinuxCec class in audio_device_controller.linux_cec.
+    """
+
+    @staticmethod
+    def new_controller(device):
+        from audio_device_controller.bus import BusScheduler
+        from audio_device_controller.linux_cec import AudioDeviceControllerLinuxCec
+
+        return AudioDeviceControllerLinuxCec("/dev/cec0", bus=BusScheduler(rate=1000, burst=10),
+                                             ioctl=device.ioctl, open_device=device.open,
+                                             close_device=device.close)
+
+    def test_layout(self):
+        """
+        Test the sizes of the kernel structures and the ioctl request codes against linux/cec.h.
+
+        :return: None
+        """
+
+        from audio_device_controller import linux_cec as lc
+
+        self.assertEqual((lc._CAPS.size, lc._LOG_ADDRS.size, lc._MSG.size), (76, 92, 56))
+        self.assertEqual(lc.CEC_ADAP_G_CAPS, 0xc04c6100)
+        self.assertEqual(lc.CEC_ADAP_G_PHYS_ADDR, 0x80026101)
+        self.assertEqual(lc.CEC_ADAP_G_LOG_ADDRS, 0x805c6103)
+        self.assertEqual(lc.CEC_ADAP_S_LOG_ADDRS, 0xc05c6104)
+        self.assertEqual(lc.CEC_TRANSMIT, 0xc0386105)
+        self.assertEqual(lc.CEC_S_MODE, 0x40046109)
+
+    def test_commands(self):
+        """
+        Test that the controller claims a playback address and sends the same messages as libcec.
+
+        :return: None
+        """
+
+        device = FakeCecDevice()
+
+        with self.new_controller(device) as controller:
+            self.assertEqual(device.sent, [b"\x45", b"\x45\x46"])
+
+            controller.power_on()
+            self.assertEqual(device.sent[-1], b"\x45\x70\x10\x00")
+
+            controller.standby()
+            self.assertEqual(device.sent[-1], b"\x4f\x36")
+
+            from audio_device_controller.core import POWER_ON, POWER_STANDBY
+            self.assertEqual(controller.power_status(), POWER_STANDBY)
+            self.assertEqual(device.sent[-1], b"\x45\x8f")
+            device.power_status = 2
+            self.assertEqual(controller.power_status(), POWER_ON)
+
+        self.assertTrue(device.closed)
+
+    def test_initialize_errors(self):
+        """
+        Test that a missing device, or a missing audio device, raise a CecError.
+
+        :return: None
+        """
+
+        from audio_device_controller.core import CecError
+
+        with self.assertRaises(CecError) as context:
+            self.new_controller(FakeCecDevice(audio_present=False)).initialize()
+        self.assertTrue("audio device" in context.exception.message)
+
+        device = FakeCecDevice()
+
+        def missing(path):
+            raise FileNotFoundError(2, "No such file or directory")
+
+        device.open = missing
+        with self.assertRaises(CecError) as context:
+            self.new_controller(device).initialize()
+        self.assertTrue("/dev/cec0" in context.exception.message)
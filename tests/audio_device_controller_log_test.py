@@ -0,0 +1,79 @@
+import io
+import json
+import logging
+import unittest
+
+
+class LogTest(unittest.TestCase):
+    """
+    Unit tests for the logging helpers in audio_device_controller.log.
+    """
+
+    def setUp(self):
+        """
+        Saves the level of the root logger, start_logging() changes it.
+
+        :return: None
+        """
+
+        self.level = logging.getLogger().level
+
+    def tearDown(self):
+        logging.getLogger().setLevel(self.level)
+
+    def test_json_lines(self):
+        """
+        Test that records are written as JSON lines by the listener, with the extra values as fields.
+
+        :return: None
+        """
+
+        from audio_device_controller.log import start_logging, stop_logging
+
+        listener = start_logging("DEBUG", json_lines=True)
+        stream = io.StringIO()
+        listener.handlers[0].setStream(stream)
+
+        logging.getLogger("audio_device_controller.test").info("Event %s", 3, extra={"trace": "abc"})
+        stop_logging(listener)
+
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(entry["msg"], "Event 3")
+        self.assertEqual(entry["lvl"], "INFO")
+        self.assertEqual(entry["log"], "audio_device_controller.test")
+        self.assertEqual(entry["trace"], "abc")
+
+    def test_lazy_formatting(self):
+        """
+        Test that arguments are only formatted when the level is enabled, and never on the calling thread.
+
+        :return: None
+        """
+
+        from audio_device_controller.log import start_logging, stop_logging
+
+        formatted = []
+
+        class Argument:
+            def __init__(self, name):
+                self.name = name
+
+            def __str__(self):
+                import threading
+                formatted.append((self.name, threading.current_thread()))
+                return self.name
+
+        listener = start_logging("INFO")
+        stream = io.StringIO()
+        listener.handlers[0].setStream(stream)
+
+        logger = logging.getLogger("audio_device_controller.test")
+        logger.debug("Not enabled %s", Argument("debug"))
+        logger.info("Enabled %s", Argument("info"))
+        stop_logging(listener)
+
+        import threading
+        self.assertEqual([name for name, _ in formatted if name == "debug"], [])
+        self.assertTrue(any(name == "info" and thread is not threading.current_thread()
+                            for name, thread in formatted))
+        self.assertTrue("Enabled info" in stream.getvalue())
@@ -0,0 +1,133 @@
+import threading
+import unittest
+from time import monotonic, sleep
+
+
+class WakeupLoopTest(unittest.TestCase):
+    """
+    Unit tests for the WakeupLoop class in audio_device_controller.lowpower.
+    """
+
+    SLACK = 0.5
+
+    def setUp(self):
+        from audio_device_controller.lowpower import WakeupLoop
+
+        self.loop = WakeupLoop(slack=self.SLACK)
+        self.addCleanup(self.loop.close)
+
+        # Start right after a deadline of the slack grid, so the timers of a test share the next one.
+        sleep(self.SLACK - monotonic() % self.SLACK + 0.01)
+
+    def test_coalesced_timers(self):
+        """
+        Test that timers close together fire in the same wakeup, in order, and cancelled ones don't fire.
+
+        :return: None
+        """
+
+        fired = []
+        timers = {}
+        for interval, name in [(0.15, "b"), (0.05, "a"), (0.1, "cancelled"), (0.6, "c")]:
+            timers[name] = self.loop.timer(interval, fired.append, args=(name,))
+            timers[name].start()
+        timers["cancelled"].cancel()
+
+        self.loop.run_for(0.2)
+        self.assertEqual(fired, ["a", "b"])
+        self.assertEqual(self.loop.stats()["wakeups"], 1)
+
+        self.loop.run_for(0.3)
+        self.assertEqual(fired, ["a", "b", "c"])
+
+        stats = self.loop.stats()
+        self.assertEqual(stats["wakeups"], 2)
+        self.assertEqual(stats["timers"], 3)
+        self.assertGreater(stats["wakeups_per_second"], 0)
+        self.assertTrue("Wakeups: 2" in self.loop.report())
+
+    def test_timer_from_other_thread(self):
+        """
+        Test that a timer started by another thread while the loop waits fires without waiting for the end of
+        the wait.
+
+        :return: None
+        """
+
+        fired = []
+        starter = threading.Timer(0.05, lambda: self.loop.timer(0.1, lambda: fired.append(monotonic())).start())
+
+        started = monotonic()
+        starter.start()
+        self.loop.run_for(1.0)
+
+        self.assertEqual(len(fired), 1)
+        self.assertLess(fired[0] - started, 0.9)
+        self.assertGreaterEqual(monotonic() - started, 0.9)
+
+        starter.join()
+
+    def test_session_timers(self):
+        """
+        Test that the pause timer of a session runs on the loop.
+
+        :return: None
+        """
+
+        from unittest.mock import Mock
+        from audio_device_controller.core import AudioDeviceController, Session
+
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+        with Session(mock_dev_ctrl, timer_factory=self.loop.timer) as session:
+            session.active(True)
+            session.pause(0.05)
+            mock_dev_ctrl.standby.assert_not_called()
+
+            self.loop.run_for(0.6)
+            mock_dev_ctrl.standby.assert_called_once_with()
+
+    def test_timers_during_blocked_poll(self):
+        """
+        Test that a poll blocked until its timeout delays the pause timer by the timeout and the slack at most.
+
+        :return: None
+        """
+
+        from unittest.mock import Mock
+        from audio_device_controller.audiodevcontroller import listen
+        from audio_device_controller.core import AudioDeviceController, Session
+
+        handler = Mock()
+        handler.listen_for_events.side_effect = sleep
+        fired = []
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+        mock_dev_ctrl.standby.side_effect = lambda: fired.append(monotonic())
+
+        with Session(mock_dev_ctrl, timer_factory=self.loop.timer) as session:
+            session.active(True)
+            started = monotonic()
+            session.pause(0.05)
+
+            listen(handler, 1, lambda: 0.1, self.loop, polls=1)
+
+        handler.listen_for_events.assert_called_once_with(1)
+        self.assertEqual(len(fired), 1)
+        self.assertLess(fired[0] - started, 1 + self.SLACK)
+
+    def test_needs_bounded_polls(self):
+        """
+        Test that the loop is rejected without a timeout of the polls and an interval between them.
+
+        :return: None
+        """
+
+        import sys
+        from unittest.mock import patch
+        from audio_device_controller import audiodevcontroller
+
+        for arguments in [["-low_wakeup", "1", "-poll_min", "1"], ["-low_wakeup", "1", "-event_timeout", "10"]]:
+            with patch.object(sys, "argv", ["audio-device-controller", "-event_listener"] + arguments), \
+                    patch("audio_device_controller.audiodevcontroller.run") as mock_run, \
+                    self.assertRaises(SystemExit):
+                audiodevcontroller.entry()
+            mock_run.assert_not_called()
@@ -0,0 +1,160 @@
+import gc
+import logging
+import os
+import unittest
+from unittest.mock import patch, Mock
+
+
+# Events driven through the soak test, raise it for a long run, e.g. SOAK_EVENTS=3000000.
+SOAK_EVENTS = int(os.environ.get("SOAK_EVENTS", "10000"))
+
+
+class FakeCecLib:
+    """
+    Stand-in for the libcec adapter, without the call recording of a Mock so it doesn't grow.
+    """
+
+    def DetectAdapters(self):
+        adapter = Mock()
+        adapter.strComName = "adapter"
+        return [adapter]
+
+    def Open(self, name):
+        return True
+
+    def PollDevice(self, address):
+        return True
+
+    def GetDeviceOSDName(self, address):
+        return "Audio System"
+
+    def AudioEnable(self, enable):
+        return True
+
+    def StandbyDevices(self):
+        return True
+
+
+class MemoryMonitorTest(unittest.TestCase):
+    """
+    Unit tests for audio_device_controller.memory and a soak test of the event path.
+    """
+
+    def test_report(self):
+        """
+        Test that the report shows where the memory grew.
+
+        :return: None
+        """
+
+        from audio_device_controller.memory import MemoryMonitor
+
+        monitor = MemoryMonitor(top=5)
+        monitor.start()
+        try:
+            retained = [bytearray(1024) for _ in range(256)]
+
+            self.assertGreater(monitor.growth(), 256 * 1024)
+            report = monitor.report()
+            self.assertTrue(report.startswith("Traced memory:"))
+            self.assertTrue("memory_test.py" in report)
+
+            del retained
+            self.assertLess(monitor.growth(), 64 * 1024)
+        finally:
+            monitor.stop()
+
+    def test_report_on_signal(self):
+        """
+        Test that the report is logged by the reporter thread when the signal is received.
+
+        :return: None
+        """
+
+        import os
+        import signal
+        import time
+        from audio_device_controller.memory import MemoryMonitor
+
+        monitor = MemoryMonitor(top=5)
+        monitor.start()
+        previous = monitor.install(signal.SIGUSR2)
+        try:
+            with self.assertLogs("audio_device_controller.memory", "INFO") as logs:
+                os.kill(os.getpid(), signal.SIGUSR2)
+                for _ in range(50):
+                    if logs.records:
+                        break
+                    time.sleep(0.1)
+
+            self.assertTrue(logs.records[0].getMessage().startswith("Traced memory:"))
+            self.assertNotEqual(logs.records[0].threadName, "MainThread")
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+            monitor.stop()
+
+        self.assertIsNone(monitor._reporter)
+
+    @patch("cec.libcec_configuration")
+    @patch("cec.ICECAdapter")
+    def test_soak(self, mock_adapter, mock_config):
+        """
+        Test that the memory of the event path stays bounded: after a warm-up, driving the events through the
+        event handler, the session and the CEC controller doesn't retain memory.
+
+        :return: None
+        """
+
+        import audio_device_controller.events
+        from audio_device_controller.bus import BusScheduler
+        from audio_device_controller.core import AudioDeviceControllerCec, Session
+        from audio_device_controller.memory import MemoryMonitor
+        from audio_device_controller.paths import compile_path, compile_list_path
+        from audio_device_controller.tracing import Tracer
+
+        mock_adapter.Create.return_value = FakeCecLib()
+
+        config = Mock(spec=audio_device_controller.events.ConfigOptions)
+        config.events_accessor = compile_list_path("Events")
+        config.pb_notif_accessor = compile_path("Notification")
+        config.pb_notif_stop = 0
+        config.pb_notif_play = 1
+        config.pb_notif_pause = 2
+        config.pb_notif_active_device = 3
+        config.pb_notif_inactive_device = 4
+        config.power_off_delay_mins = 10
+        config.cursor_field = ""
+        config.timestamp_accessor = None
+        config.event_id_accessor = None
+        config.event_order_accessor = None
+
+        # A listening session: the device is powered on, paused and resumed, and put on standby.
+        response = {"Events": [{"Notification": n} for n in (3, 1, 2, 1, 2, 0, 1, 4)]}
+        responses = SOAK_EVENTS // len(response["Events"])
+        warm_up = max(responses // 10, 100)
+
+        # Records kept by the test runner's log capture would count as growth.
+        package_logger = logging.getLogger("audio_device_controller")
+        level = package_logger.level
+        package_logger.setLevel(logging.WARNING)
+        self.addCleanup(package_logger.setLevel, level)
+
+        controller = AudioDeviceControllerCec(bus=BusScheduler(rate=1e9, burst=1e9))
+        with Session(controller, history_size=64) as session:
+            handler = audio_device_controller.events.EventHandler(session, config, tracer=Tracer(capacity=64))
+
+            for _ in range(warm_up):
+                handler.process_json_response(response)
+
+            monitor = MemoryMonitor()
+            monitor.start()
+            try:
+                for _ in range(responses - warm_up):
+                    handler.process_json_response(response)
+
+                gc.collect()
+                growth = monitor.growth()
+            finally:
+                monitor.stop()
+
+        self.assertLess(growth, 64 * 1024, "Retained %d bytes after %d events" % (growth, SOAK_EVENTS))
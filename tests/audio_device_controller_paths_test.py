@@ -0,0 +1,64 @@
+import unittest
+
+
+class PathsTest(unittest.TestCase):
+    """
+    Unit tests for the path expressions in audio_device_controller.paths.
+    """
+
+    def test_parse(self):
+        """
+        Test the parsing of path expressions into steps.
+
+        :return: None
+        """
+
+        from audio_device_controller.paths import parse_path, WILDCARD
+
+        self.assertEqual(parse_path("Events"), ["Events"])
+        self.assertEqual(parse_path("\"Events\""), ["\"Events\""])
+        self.assertEqual(parse_path("data.items[*].playback.state"), ["data", "items", WILDCARD, "playback", "state"])
+        self.assertEqual(parse_path("data[0][ 1 ]"), ["data", 0, 1])
+        self.assertEqual(parse_path("a\\.b.c"), ["a.b", "c"])
+
+        with self.assertRaises(ValueError):
+            parse_path("data[x]")
+        with self.assertRaises(ValueError):
+            parse_path("data[0")
+
+    def test_compile(self):
+        """
+        Test the accessors of single values, with and without wildcards.
+
+        :return: None
+        """
+
+        from audio_device_controller.paths import compile_path
+
+        data = {"data": {"items": [{"playback": {"state": 1}}, {"other": 0}, {"playback": {"state": 2}}]}}
+
+        self.assertEqual(compile_path("data.items[0].playback.state")(data), 1)
+        self.assertEqual(compile_path("data.items[*].playback.state")(data), [1, 2])
+        self.assertEqual(compile_path("data.items[*]")(data), data["data"]["items"])
+
+        with self.assertRaises(KeyError):
+            compile_path("data.events")(data)
+        with self.assertRaises(IndexError):
+            compile_path("data.items[5]")(data)
+        with self.assertRaises(TypeError):
+            compile_path("data.items.playback")(data)
+
+    def test_list_path(self):
+        """
+        Test that list paths imply [*] at the end, and that documents can be built back from them.
+
+        :return: None
+        """
+
+        from audio_device_controller.paths import compile_list_path, build_document, build_list_document
+
+        document = build_list_document("data.items", build_document("playback.state", 3))
+        self.assertEqual(document, {"data": {"items": [{"playback": {"state": 3}}]}})
+        self.assertEqual(compile_list_path("data.items")(document), [{"playback": {"state": 3}}])
+        self.assertEqual(compile_list_path("data.items[*]")(document), [{"playback": {"state": 3}}])
+        self.assertEqual(build_list_document("data.items[*]", 3), {"data": {"items": [3]}})
@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import Mock
+
+
+class PollSchedulerTest(unittest.TestCase):
+    """
+    Unit tests for the PollScheduler class in audio_device_controller.polling.
+    """
+
+    def setUp(self):
+        from audio_device_controller.core import Session
+        from audio_device_controller.polling import PollScheduler
+
+        self.session = Mock(spec=Session)
+        self.scheduler = PollScheduler(min_interval=1.0, max_interval=31.0, idle_after=600.0, timer_window=60.0)
+
+    def interval(self, active, timer_left, idle):
+        self.session.activity.return_value = (active, timer_left, idle)
+        return self.scheduler.interval(self.session)
+
+    def test_active(self):
+        """
+        Test that polls are at the minimum interval while the session is active or its timer is about to fire.
+
+        :return: None
+        """
+
+        self.assertEqual(self.interval(True, None, 0.0), 1.0)
+        self.assertEqual(self.interval(True, 300.0, 0.0), 1.0)
+        self.assertEqual(self.interval(False, 30.0, 600.0), 1.0)
+
+    def test_idle(self):
+        """
+        Test that polls slow down to the maximum interval as the session stays inactive, without sleeping past
+        the window of the pause timer.
+
+        :return: None
+        """
+
+        from audio_device_controller.polling import PollScheduler
+
+        self.assertEqual(self.interval(False, None, 0.0), 1.0)
+        self.assertEqual(self.interval(False, None, 300.0), 16.0)
+        self.assertEqual(self.interval(False, None, 600.0), 31.0)
+        self.assertEqual(self.interval(False, None, 86400.0), 31.0)
+        self.assertEqual(self.interval(False, 70.0, 86400.0), 10.0)
+
+        with self.assertRaises(ValueError):
+            PollScheduler(min_interval=10.0, max_interval=1.0)
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime, timedelta
+
+
+class UsagePredictorTest(unittest.TestCase):
+    """
+    Unit tests for the UsagePredictor class in audio_device_controller.predictor.
+    """
+
+    def test_learn_weekly_habit(self):
+        """
+        Test that a session starting every week at the same time is predicted, and others aren't.
+
+        :return: None
+        """
+
+        from audio_device_controller.predictor import UsagePredictor
+
+        predictor = UsagePredictor(slot_minutes=15, threshold=0.5, decay=0.8, lead=120)
+        monday = datetime(2024, 1, 1, 20, 5)
+
+        for week in range(6):
+            start = monday + timedelta(weeks=week)
+            self.assertTrue(predictor.observe(start))
+            self.assertFalse(predictor.observe(start + timedelta(minutes=20)))   # Same session.
+        predictor.observe(monday + timedelta(days=2, hours=-12))                # Once, on a Wednesday.
+
+        now = monday + timedelta(weeks=6, days=-1)
+        self.assertGreater(predictor.likelihood(monday + timedelta(weeks=6)), 0.6)
+        self.assertLess(predictor.likelihood(monday + timedelta(weeks=6, days=2, hours=-12)), 0.5)
+        self.assertEqual(predictor.next_start(now), datetime(2024, 2, 12, 20, 0))
+
+        # Too close to power on in time, the next one is a week later.
+        self.assertEqual(predictor.next_start(datetime(2024, 2, 12, 19, 59)), datetime(2024, 2, 19, 20, 0))
+
+        # The habit fades out.
+        self.assertLess(predictor.likelihood(monday + timedelta(weeks=12)), 0.5)
+        self.assertIsNone(predictor.next_start(monday + timedelta(weeks=12)))
+
+    def test_save_load(self):
+        """
+        Test that the scores are kept across runs, only with the same slots.
+
+        :return: None
+        """
+
+        import os
+        import shutil
+        import tempfile
+        from audio_device_controller.predictor import UsagePredictor
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "usage")
+        start = datetime(2024, 1, 1, 20, 5)
+
+        try:
+            predictor = UsagePredictor(path=path)
+            for week in range(4):
+                predictor.observe(start + timedelta(weeks=week))
+
+            self.assertEqual(UsagePredictor(path=path).likelihood(start), predictor.likelihood(start))
+            self.assertEqual(UsagePredictor(slot_minutes=30, path=path).likelihood(start), 0)
+
+            with self.assertRaises(ValueError):
+                UsagePredictor(slot_minutes=7)
+        finally:
+            shutil.rmtree(directory)
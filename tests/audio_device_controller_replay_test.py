@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+
+class ReplayTest(unittest.TestCase):
+    """
+    Unit tests for the replay of traces in audio_device_controller.
+    """
+
+    def setUp(self):
+        """
+        Initialization for test cases.
+
+        :return: None
+        """
+
+        import audio_device_controller.events
+        from audio_device_controller.paths import compile_path, compile_list_path
+
+        self.directory = tempfile.mkdtemp()
+
+        self.mock_config                          = Mock(spec=audio_device_controller.events.ConfigOptions)
+        self.mock_config.events                   = "Events"
+        self.mock_config.pb_notif                 = "Notification"
+        self.mock_config.events_accessor          = compile_list_path("Events")
+        self.mock_config.pb_notif_accessor        = compile_path("Notification")
+        self.mock_config.pb_notif_stop            = 0
+        self.mock_config.pb_notif_play            = 1
+        self.mock_config.pb_notif_pause           = 2
+        self.mock_config.pb_notif_active_device   = 3
+        self.mock_config.pb_notif_inactive_device = 4
+        self.mock_config.power_off_delay_mins     = 10
+        self.mock_config.event_id_accessor        = None
+        self.mock_config.event_order_accessor     = None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_capture(self, lines):
+        """
+        Writes a JSON-lines capture with the given entries.
+
+        :return: Path of the capture.
+        """
+
+        path = os.path.join(self.directory, "capture.jsonl")
+        with open(path, "w") as capture:
+            for line in lines:
+                capture.write(json.dumps(line) + "\n")
+
+        return path
+
+    def test_capture(self):
+        """
+        Test replaying a capture: pause timers expire on the time of the trace.
+
+        :return: None
+        """
+
+        from audio_device_controller.replay import load_trace, replay
+
+        path = self.write_capture([{"time": 100.0, "response": {"Events": [{"Notification": 3}]}},
+                                   {"time": 101.0, "response": {"Events": [{"Notification": 1}]}},
+                                   {"time": 200.0, "response": {"Events": [{"Notification": 2}]}},
+                                   {"Ev": []}])
+
+        trace = load_trace(path, self.mock_config)
+        self.assertEqual([time for time, _ in trace], [0.0, 1.0, 100.0, 100.0])
+
+        result = replay(trace, self.mock_config)
+        self.assertEqual(result.commands, [(0.0, "power_on"), (0.0, "select_source"), (700.0, "standby")])
+        self.assertEqual(result.responses, 4)
+        self.assertEqual(result.errors, 1)
+        self.assertTrue(result.throughput > 0)
+
+    def test_journal(self):
+        """
+        Test replaying the events recorded in a journal.
+
+        :return: None
+        """
+
+        from audio_device_controller.journal import Journal, CMD_POWER_ON
+        from audio_device_controller.replay import load_trace, replay
+
+        path = os.path.join(self.directory, "journal.bin")
+        with Journal(path, 16) as journal:
+            journal.event(3)
+            journal.command(CMD_POWER_ON)
+            journal.event(4)
+
+        trace = load_trace(path, self.mock_config)
+        self.assertEqual([response for _, response in trace],
+                         [{"Events": [{"Notification": 3}]}, {"Events": [{"Notification": 4}]}])
+
+        result = replay(trace, self.mock_config, speed=1000)
+        self.assertEqual([command for _, command in result.commands], ["power_on", "select_source", "standby"])
@@ -0,0 +1,36 @@
+import unittest
+
+
+class ScheduleTest(unittest.TestCase):
+    """
+    Unit tests for the times of the day in audio_device_controller.schedule.
+    """
+
+    def test_parse_time_of_day(self):
+        """
+        Test parsing times of the day, with and without seconds, and that invalid ones raise ValueError.
+
+        :return: None
+        """
+
+        from audio_device_controller.schedule import parse_time_of_day
+
+        self.assertEqual(parse_time_of_day("23:00"), (23, 0, 0))
+        self.assertEqual(parse_time_of_day(" 07:30:15 "), (7, 30, 15))
+
+        for text in ["23", "noon", "24:00", "12:60", "12:00:60", "1:2:3:4"]:
+            with self.assertRaises(ValueError):
+                parse_time_of_day(text)
+
+    def test_seconds_until(self):
+        """
+        Test that times of the day already past today are scheduled for tomorrow.
+
+        :return: None
+        """
+
+        from datetime import datetime
+        from audio_device_controller.schedule import seconds_until
+
+        self.assertEqual(seconds_until((23, 0, 0), datetime(2026, 10, 19, 23, 0)), 0)
+        self.assertEqual(seconds_until((7, 0, 0), datetime(2026, 10, 19, 23, 0)), 8 * 3600)
@@ -0,0 +1,100 @@
+import unittest
+
+
+class TracingTest(unittest.TestCase):
+    """
+    Unit tests for audio_device_controller.tracing.
+    """
+
+    def test_segments(self):
+        """
+        Test that the segments of a trace are the time between its consecutive stages.
+
+        :return: None
+        """
+
+        from audio_device_controller import tracing
+
+        tracer = tracing.Tracer({"ack": 0.1, "total": 1.0})
+        trace = tracer.start(10.0, server_time=9.5)
+        trace.mark("decode", 10.25)
+        trace.mark("send", 10.5)
+        trace.mark("ack", 10.75)
+
+        self.assertEqual(trace.segments(), [("receive", 0.5), ("decode", 0.25), ("send", 0.25), ("ack", 0.25),
+                                            ("total", 1.25)])
+
+        with self.assertLogs("audio_device_controller.tracing", "WARNING") as logs:
+            tracer.finish(trace)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(tracer.summary()["ack"]["slo_violations"], 1)
+        self.assertEqual(tracer.summary()["decode"]["slo_violations"], 0)
+        self.assertTrue("total" in tracer.report())
+
+    def test_debug_disabled(self):
+        """
+        Test that the segments of a trace are not formatted when debug logging is off.
+
+        :return: None
+        """
+
+        from unittest.mock import patch
+        from audio_device_controller import tracing
+
+        tracer = tracing.Tracer()
+        trace = tracer.start(10.0)
+        trace.mark("dispatch", 10.25)
+
+        with patch("audio_device_controller.tracing.logger") as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            tracer.finish(trace)
+
+        mock_logger.debug.assert_not_called()
+        self.assertEqual(tracer.summary()["dispatch"]["count"], 1)
+
+    def test_percentiles(self):
+        """
+        Test the percentiles of the summary, only the last durations are kept.
+
+        :return: None
+        """
+
+        from audio_device_controller import tracing
+
+        self.assertEqual(tracing.percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.5), 5)
+        self.assertEqual(tracing.percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.9), 9)
+        self.assertEqual(tracing.percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.99), 10)
+        self.assertEqual(tracing.percentile([7], 0.5), 7)
+
+        tracer = tracing.Tracer(capacity=100)
+        for i in range(200):
+            trace = tracer.start(0.0)
+            trace.mark("dispatch", i / 1000)
+            tracer.finish(trace)
+
+        summary = tracer.summary()["dispatch"]
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 0.149)
+        self.assertEqual(summary["max"], 0.199)
+
+    def test_current_trace(self):
+        """
+        Test that marks only go to the trace active in the thread.
+
+        :return: None
+        """
+
+        from threading import Thread
+        from audio_device_controller import tracing
+
+        trace = tracing.Trace(1)
+        previous = tracing.activate(trace)
+        thread = Thread(target=tracing.mark, args=("send",))
+        thread.start()
+        thread.join()
+        tracing.mark("enqueue")
+        tracing.activate(previous)
+        tracing.mark("ack")
+
+        self.assertEqual([stage for stage, _ in trace.marks], ["enqueue"])
+        self.assertIsNone(tracing.current())
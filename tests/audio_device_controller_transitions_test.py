@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import Mock
+
+
+class TransitionTableTest(unittest.TestCase):
+    """
+    Unit tests for the transition table in audio_device_controller.transitions.
+    """
+
+    def test_table_complete(self):
+        """
+        Test that every state has a transition for every event, and stays in range.
+
+        :return: None
+        """
+
+        from audio_device_controller import transitions as t
+
+        self.assertEqual(len(t.TRANSITIONS), t.N_STATES * t.N_EVENTS)
+        for next_state, actions in t.TRANSITIONS:
+            self.assertTrue(0 <= next_state < t.N_STATES)
+
+    def test_known_transitions(self):
+        """
+        Test the transitions of the usual playback session.
+
+        :return: None
+        """
+
+        from audio_device_controller import transitions as t
+
+        self.assertEqual(t.lookup(0, t.EV_ACTIVATE), (t.ACTIVE | t.DEV_ON, t.A_POWER_ON))
+        self.assertEqual(t.lookup(0, t.EV_PLAY), (0, 0))
+        self.assertEqual(t.lookup(0, t.EV_PAUSE), (0, 0))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON, t.EV_PAUSE),
+                         (t.ACTIVE | t.DEV_ON | t.TIMER_ARMED, t.A_ARM_TIMER))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON | t.TIMER_ARMED, t.EV_PLAY),
+                         (t.ACTIVE | t.DEV_ON, t.A_CANCEL_TIMER))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON | t.TIMER_ARMED, t.EV_TIMER),
+                         (t.ACTIVE, t.A_STANDBY | t.A_CANCEL_TIMER))
+        self.assertEqual(t.lookup(t.ACTIVE, t.EV_PLAY), (t.ACTIVE | t.DEV_ON, t.A_POWER_ON))
+        self.assertEqual(t.lookup(t.DEV_ON, t.EV_ACTIVATE), (t.ACTIVE | t.DEV_ON, 0))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON, t.EV_SCHEDULED_STANDBY), (t.ACTIVE | t.DEV_ON, 0))
+        self.assertEqual(t.lookup(t.DEV_ON, t.EV_SCHEDULED_STANDBY), (0, t.A_STANDBY))
+        self.assertEqual(t.lookup(0, t.EV_SCHEDULED_POWER_ON), (t.DEV_ON, t.A_POWER_ON))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON | t.TIMER_ARMED, t.EV_DEACTIVATE),
+                         (0, t.A_STANDBY | t.A_CANCEL_TIMER))
+        self.assertEqual(t.lookup(0, t.EV_PREWARM), (t.DEV_ON | t.TIMER_ARMED, t.A_POWER_ON | t.A_ARM_TIMER))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON, t.EV_PREWARM), (t.ACTIVE | t.DEV_ON, 0))
+        self.assertEqual(t.lookup(t.DEV_ON | t.TIMER_ARMED, t.EV_TIMER), (0, t.A_STANDBY | t.A_CANCEL_TIMER))
+        self.assertEqual(t.lookup(t.DEV_ON | t.TIMER_ARMED, t.EV_ACTIVATE), (t.ACTIVE | t.DEV_ON, t.A_CANCEL_TIMER))
+
+    def test_power_on_window(self):
+        """
+        Test that within a power on window nothing puts the device on standby, until the window ends.
+
+        :return: None
+        """
+
+        from audio_device_controller import transitions as t
+
+        forced = t.DEV_ON | t.FORCED_ON
+        self.assertEqual(t.lookup(0, t.EV_WINDOW_START), (forced, t.A_POWER_ON))
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON, t.EV_WINDOW_START), (t.ACTIVE | forced, 0))
+        self.assertEqual(t.lookup(t.ACTIVE | forced, t.EV_DEACTIVATE), (forced, 0))
+        self.assertEqual(t.lookup(t.ACTIVE | forced | t.TIMER_ARMED, t.EV_TIMER), (t.ACTIVE | forced, t.A_CANCEL_TIMER))
+        self.assertEqual(t.lookup(forced, t.EV_SCHEDULED_STANDBY), (forced, 0))
+        self.assertEqual(t.lookup(forced, t.EV_WINDOW_END), (0, t.A_STANDBY))
+        self.assertEqual(t.lookup(t.ACTIVE | forced, t.EV_WINDOW_END), (t.ACTIVE | t.DEV_ON, 0))
+        self.assertEqual(t.lookup(t.ACTIVE | forced | t.TIMER_ARMED, t.EV_WINDOW_END),
+                         (t.ACTIVE, t.A_STANDBY | t.A_CANCEL_TIMER))
+        self.assertEqual(t.state_name(forced), "dev_on|forced_on")
+
+    def test_device_status(self):
+        """
+        Test that the power status reported by the device only changes the power bit, without actions.
+
+        :return: None
+        """
+
+        from audio_device_controller import transitions as t
+
+        self.assertEqual(t.lookup(t.ACTIVE | t.DEV_ON | t.TIMER_ARMED, t.EV_DEVICE_OFF),
+                         (t.ACTIVE | t.TIMER_ARMED, 0))
+        self.assertEqual(t.lookup(t.ACTIVE, t.EV_DEVICE_ON), (t.ACTIVE | t.DEV_ON, 0))
+        self.assertEqual(t.lookup(0, t.EV_DEVICE_OFF), (0, 0))
+
+
+class TransitionLogTest(unittest.TestCase):
+    """
+    Unit tests for the TransitionLog ring buffer.
+    """
+
+    def test_wraparound(self):
+        """
+        Test that only the last transitions are kept, oldest first.
+
+        :return: None
+        """
+
+        from audio_device_controller import transitions as t
+
+        log = t.TransitionLog(4)
+        for i in range(10):
+            log.record(float(i), 0, t.EV_PLAY, 0, 0)
+
+        self.assertEqual(len(log), 4)
+        self.assertEqual(log.total, 10)
+        self.assertEqual([entry.time for entry in log.entries()], [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual([entry.time for entry in log.entries(last=2)], [8.0, 9.0])
+
+    def test_session_history(self):
+        """
+        Test that the session records every event it processes, including the ignored ones.
+
+        :return: None
+        """
+
+        import audio_device_controller.core
+        from audio_device_controller.core import AudioDeviceController
+        mock_dev_ctrl = Mock(spec=AudioDeviceController)
+
+        with audio_device_controller.core.Session(mock_dev_ctrl, history_size=8) as session:
+            session.play()
+            session.active(True)
+            session.active(False)
+
+            history = session.transitions()
+            self.assertEqual([entry.event for entry in history], ["play", "activate", "deactivate"])
+            self.assertEqual(history[1].source, "inactive")
+            self.assertEqual(history[1].target, "active|dev_on")
+            self.assertEqual(history[1].actions, ["power_on"])
+            self.assertEqual(history[2].actions, ["standby"])
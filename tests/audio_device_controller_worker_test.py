@@ -0,0 +1,183 @@
+import os
+import time
+import unittest
+
+
+class FakeController:
+    """
+    Controller run in the worker: standby hangs while the marker file exists, and power_on kills the process.
+    """
+
+    def __init__(self, marker):
+        self._marker = marker
+
+    def initialize(self):
+        with open(self._marker + ".init", "a") as init:
+            init.write("x")
+
+    def cleanup(self):
+        pass
+
+    def power_on(self):
+        os._exit(1)
+
+    def select_source(self):
+        return True
+
+    def standby(self):
+        while os.path.exists(self._marker):
+            time.sleep(0.05)
+        return False
+
+    def power_status(self):
+        return "on"
+
+
+class HangingController(FakeController):
+    """
+    Controller run in the worker: power_on hangs while the marker file exists.
+    """
+
+    def power_on(self):
+        while os.path.exists(self._marker):
+            time.sleep(0.05)
+        return True
+
+
+class AudioDeviceControllerProcessTest(unittest.TestCase):
+    """
+    Unit tests for the AudioDeviceControllerProcess class in audio_device_controller.worker.
+    """
+
+    def setUp(self):
+        import functools
+        import shutil
+        import tempfile
+        from audio_device_controller.worker import AudioDeviceControllerProcess
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.marker = os.path.join(self.directory, "hang")
+
+        self.controller = AudioDeviceControllerProcess(functools.partial(FakeController, self.marker),
+                                                       deadline=1.0, context="fork")
+
+    def initializations(self):
+        with open(self.marker + ".init") as init:
+            return len(init.read())
+
+    def test_commands(self):
+        """
+        Test that the commands run in the worker and return their values.
+
+        :return: None
+        """
+
+        from audio_device_controller.core import POWER_ON
+
+        with self.controller as controller:
+            self.assertTrue(controller.select_source())
+            self.assertFalse(controller.standby())
+            self.assertEqual(controller.power_status(), POWER_ON)
+            self.assertEqual(controller.send("select_source").result(timeout=5).acked, True)
+
+        self.assertEqual(self.controller.restarts, 0)
+        self.assertEqual(self.initializations(), 1)
+
+    def test_restart(self):
+        """
+        Test that a hung or dead worker fails the command within its deadline, and is restarted and initialized
+        again for the next one.
+
+        :return: None
+        """
+
+        from audio_device_controller.core import CecError
+
+        with self.controller as controller:
+            open(self.marker, "w").close()
+            started = time.monotonic()
+            with self.assertRaises(CecError) as context:
+                controller.standby()
+            self.assertLess(time.monotonic() - started, 3)
+            self.assertTrue("restarted" in context.exception.message)
+
+            os.remove(self.marker)
+            self.assertFalse(controller.standby())
+            self.assertEqual(self.initializations(), 2)
+
+            with self.assertRaises(CecError):
+                controller.power_on()
+            self.assertTrue(controller.select_source())
+
+        self.assertEqual(self.controller.restarts, 2)
+        self.assertEqual(self.initializations(), 3)
+
+    def test_listener_survives_hang(self):
+        """
+        Test that a command hanging in the worker doesn't stop the event listener: the event is processed, the
+        device keeps its power state, and the next event sends the command again.
+
+        :return: None
+        """
+
+        import functools
+        from unittest.mock import Mock
+        from audio_device_controller.core import Session
+        from audio_device_controller.events import ConfigOptions, EventHandler
+        from audio_device_controller.paths import compile_path, compile_list_path
+        from audio_device_controller.worker import AudioDeviceControllerProcess
+
+        config = Mock(spec=ConfigOptions)
+        config.events_accessor          = compile_list_path("Events")
+        config.pb_notif_accessor        = compile_path("N")
+        config.pb_notif_stop            = 0
+        config.pb_notif_play            = 1
+        config.pb_notif_pause           = 2
+        config.pb_notif_active_device   = 3
+        config.pb_notif_inactive_device = 4
+        config.power_off_delay_mins     = 10
+        config.cursor_field             = ""
+        config.event_id_accessor        = None
+        config.event_order_accessor     = None
+
+        controller = AudioDeviceControllerProcess(functools.partial(HangingController, self.marker),
+                                                  deadline=0.5, context="fork")
+
+        with Session(controller) as session:
+            handler = EventHandler(session, config)
+
+            open(self.marker, "w").close()
+            handler.process_json_response({"Events": [{"N": 3}]})
+            self.assertEqual(session.transitions()[-1].target, "active")
+
+            os.remove(self.marker)
+            handler.process_json_response({"Events": [{"N": 1}]})
+            self.assertEqual(session.transitions()[-1].target, "active|dev_on")
+
+        self.assertEqual(controller.restarts, 1)
+
+    def test_stop_abandons_unkillable(self):
+        """
+        Test that stopping a child that doesn't end is bounded, and the child is abandoned.
+
+        :return: None
+        """
+
+        from unittest.mock import Mock, patch
+
+        process = Mock()
+        process.pid = 1234
+        process.is_alive.return_value = True
+        connection = Mock()
+        self.controller._process, self.controller._connection = process, connection
+
+        with patch("audio_device_controller.worker.logger") as mock_logger:
+            self.controller._stop(kill=True)
+
+        self.assertEqual(process.kill.call_count, 2)
+        self.assertEqual([call[0] for call in process.join.call_args_list], [(1.0,), (1.0,)])
+        process.terminate.assert_not_called()
+        mock_logger.error.assert_called_once_with("CEC worker %d did not end, abandoning it", 1234)
+        connection.close.assert_called_once_with()
+        self.assertIsNone(self.controller._process)